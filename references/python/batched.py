@@ -0,0 +1,121 @@
+"""
+Array (batched) builds of the signaling reference functions.
+
+The reference functions index their inputs as y[k] and c[k] and are
+otherwise plain arithmetic, so they already work on a whole population if
+y is passed as a (57, N) array, with one cell per column, and c as either a
+(167,) or a (167, N) array. Only their scalar branches (clamps, conditional
+square roots and the arctan guard) need to become element-wise. Instead of
+keeping a second copy of the model, the batched functions are built from
+the reference source by rewriting those branches into np.where /
+np.maximum / np.minimum calls; generate_kernels.py does the rewrite and its
+output, generated_kernels.py, is committed.
+"""
+
+import time
+
+import numpy as np
+
+import generated_kernels
+import integrators
+import metrics
+import utils
+
+_get_pka_signalling = generated_kernels.get_pka_signalling
+_get_effective_fraction = generated_kernels.get_effective_fraction
+
+
+def get_pka_signalling(y: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """
+    Batched get_pka_signalling.
+
+    Args:
+        y (np.ndarray): (N, 57) signaling states, one cell per row.
+        c (np.ndarray): (167,) constants shared by all cells or (N, 167).
+
+    Returns:
+        np.ndarray: (N, 57) derivatives.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    c = np.asarray(c, dtype=np.float64)
+    if metrics.ENABLED:
+        metrics.count("rhs_calls", y.shape[0])
+        metrics.record_clamps(y)
+    return _get_pka_signalling(y.T, c.T).T
+
+
+def get_effective_fraction(
+    y: np.ndarray, c: np.ndarray, output=None, original_output=False
+) -> np.ndarray:
+    """
+    Batched get_effective_fraction.
+
+    Args:
+        y (np.ndarray): (N, 57) signaling states.
+        c (np.ndarray): (167,) or (N, 167) constants.
+        output (np.ndarray, optional): (N, 8) or, with original_output False,
+            (N, 7) output array.
+        original_output (bool): Use the original MATLAB output order.
+
+    Returns:
+        np.ndarray: The (N, 8) or (N, 7) effective fractions.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    c = np.asarray(c, dtype=np.float64)
+    if output is None:
+        output = np.empty((y.shape[0], 8 if original_output else 7))
+    _get_effective_fraction(y.T, c.T, output.T, original_output)
+    return output
+
+
+def update_fraction_parameters(
+    runSignalingPathway: bool,
+    dt: float,
+    X0: np.ndarray,
+    const_signaling: np.ndarray,
+    integrator: str = "euler",
+) -> np.ndarray:
+    """
+    Batched utils.update_fraction_parameters.
+
+    Args:
+        runSignalingPathway (bool): Advance the signaling states.
+        dt (float or np.ndarray): Time step in ms, shared or (N,) per cell.
+        X0 (np.ndarray): (N, 57) states, updated in place.
+        const_signaling (np.ndarray): (167,) or (N, 167) constants.
+        integrator (str): "euler" or "qssa".
+
+    Returns:
+        np.ndarray: (N, 8) fractions in names_signalling order.
+    """
+    if integrator not in ("euler", "qssa"):
+        raise ValueError(f"Integrator '{integrator}' is not recognized.")
+    c = np.asarray(const_signaling, dtype=np.float64)
+    dt = np.asarray(dt, dtype=np.float64)
+    if metrics.ENABLED:
+        start = time.perf_counter()
+        if runSignalingPathway:
+            metrics.record_clamps(X0)
+    fraction = np.zeros((X0.shape[0], len(utils.names_signalling)))
+    if runSignalingPathway:
+        dX = _get_pka_signalling(X0.T, c.T).T
+        if integrator == "qssa":
+            integrators.qssa_update_batch(X0, dX, c, dt)
+        else:
+            X0 += dX * (dt[:, None] if dt.ndim else dt)
+        get_effective_fraction(X0, c, output=fraction[:, :-1])
+        cT = c.T
+        # Concentration of uninhibited PP1 in the cytosolic compartment
+        pp1_PP1f_cyt_sum = cT[37] - cT[36] + X0[:, 38]
+        PP1f_cyt = 0.5 * (
+            np.sqrt(pp1_PP1f_cyt_sum**2.0 + 4.0 * cT[37] * cT[36]) - pp1_PP1f_cyt_sum
+        )
+        fraction[:, -1] = cT[35] / cT[4] + cT[34] / cT[5] + PP1f_cyt / cT[6]
+    else:
+        get_effective_fraction(X0, c, output=fraction[:, :-1])
+        fraction[:, -1] = 0.13698
+    if metrics.ENABLED:
+        seconds = time.perf_counter() - start
+        n = X0.shape[0]
+        metrics.record_update(float(np.mean(dt)), runSignalingPathway, seconds, n)
+    return fraction
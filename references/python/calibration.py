@@ -0,0 +1,283 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import getConstantsPKASignalling
+import getEffectiveFraction
+import get_starting_state
+import sensitivity
+import steady_state
+
+# Order of the calibration targets (original MATLAB getEffectiveFraction order)
+names_targets = (
+    "fICaL_PKA",
+    "fIKs_PKA",
+    "fPLB_PKA",
+    "fTnI_PKA",
+    "fINa_PKA",
+    "fINaK_PKA",
+    "fRyR_PKA",
+    "fIKur_PKA",
+)
+
+
+def _evaluate_candidate(args):
+    """Steady-state fractions for one constants vector (runs in a worker)."""
+    c, y_guess = args
+    start = time.perf_counter()
+    fractions = np.full(len(names_targets), np.nan)
+    try:
+        with np.errstate(all="ignore"):
+            y, _ = steady_state.find_steady_state(c, y_guess)
+        getEffectiveFraction.get_effective_fraction(
+            y=y, c=c, output=fractions, original_output=True
+        )
+    except (RuntimeError, np.linalg.LinAlgError):
+        y = None
+    return fractions, y, time.perf_counter() - start
+
+
+class Calibration:
+    """
+    Fits a subset of the constants to target steady-state effective fractions.
+
+    Candidates are multiplicative scale factors for the selected constants.
+    Each candidate is evaluated by solving for the steady state directly
+    (steady_state.find_steady_state) rather than integrating in time, batches
+    of candidates are spread over a process pool, and every evaluated point is
+    cached so that a repeated candidate is never simulated twice.
+
+    The selected entries of the constants vector are scaled as they are;
+    derived constants computed from them in get_constants_pka_signalling are
+    not recomputed.
+
+    Args:
+        indices (array-like): Indices of the constants to calibrate.
+        targets (dict or array-like): Target fractions, either a mapping from
+            names_targets to values or an array of 8 values with NaN for
+            unconstrained outputs.
+        iso_conc (float): Isoproterenol concentration of the baseline constants.
+        baseline (np.ndarray, optional): Baseline constants; overrides iso_conc.
+        weights (array-like, optional): Weight of each of the 8 outputs.
+        y0 (np.ndarray, optional): Initial state fixing the conserved totals.
+        n_workers (int): Number of worker processes used by fit; 1 evaluates
+            serially.
+    """
+
+    def __init__(
+        self,
+        indices,
+        targets,
+        iso_conc: float = 0.0,
+        baseline=None,
+        weights=None,
+        y0=None,
+        n_workers: int = 1,
+    ):
+        if baseline is None:
+            baseline = getConstantsPKASignalling.get_constants_pka_signalling(
+                iso_conc
+            )
+        self.baseline = np.array(baseline, dtype=np.float64)
+        self.indices = np.asarray(indices, dtype=np.intp)
+
+        self.targets = np.full(len(names_targets), np.nan)
+        if isinstance(targets, dict):
+            for name, value in targets.items():
+                self.targets[names_targets.index(name)] = value
+        else:
+            self.targets[:] = targets
+        self.weights = np.ones(len(names_targets))
+        if weights is not None:
+            self.weights[:] = weights
+        self.weights[np.isnan(self.targets)] = 0.0
+
+        if y0 is None:
+            y0 = get_starting_state.get_starting_state_signalling()
+        self.y0 = np.array(y0, dtype=np.float64)
+        self.n_workers = n_workers
+
+        self.cache = {}
+        self.eval_times = []
+        self.cache_hits = 0
+        self._warm_state = self.y0
+        self._pool = None
+
+    def constants(self, scales: np.ndarray) -> np.ndarray:
+        """Constants vector for one vector of scale factors."""
+        c = self.baseline.copy()
+        c[self.indices] *= scales
+        return c
+
+    def objective(self, fractions: np.ndarray) -> float:
+        """Weighted sum of squared deviations from the targets."""
+        if not np.all(np.isfinite(fractions[self.weights > 0.0])):
+            return np.inf
+        diff = np.where(self.weights > 0.0, fractions - self.targets, 0.0)
+        return float(np.sum(self.weights * diff * diff))
+
+    def evaluate(self, scales: np.ndarray) -> np.ndarray:
+        """
+        Objective values for a batch of candidates.
+
+        Args:
+            scales (np.ndarray): (M, len(indices)) scale factors.
+
+        Returns:
+            np.ndarray: (M,) objective values; failed solves give inf.
+        """
+        return self.evaluate_log(np.log(np.asarray(scales, dtype=np.float64)))
+
+    def evaluate_log(self, x: np.ndarray) -> np.ndarray:
+        """
+        Objective values for a batch of candidates in log(scale) space.
+
+        The cache is keyed on x itself, so candidates that are equal in log
+        space always hit, however np.exp rounds them.
+
+        Args:
+            x (np.ndarray): (M, len(indices)) log scale factors.
+
+        Returns:
+            np.ndarray: (M,) objective values; failed solves give inf.
+        """
+        x = np.atleast_2d(np.asarray(x, dtype=np.float64))
+        keys = [row.tobytes() for row in x]
+
+        # Unique candidates not yet in the cache
+        todo = {}
+        for key, row in zip(keys, x):
+            if key in self.cache:
+                self.cache_hits += 1
+            elif key not in todo:
+                todo[key] = row
+            else:
+                self.cache_hits += 1
+
+        if todo:
+            # Steady states share the conserved totals of y0, so the current
+            # best steady state is a valid and much closer starting point
+            tasks = [
+                (self.constants(np.exp(row)), self._warm_state) for row in todo.values()
+            ]
+            if self._pool is not None:
+                results = self._pool.map(_evaluate_candidate, tasks)
+            else:
+                results = map(_evaluate_candidate, tasks)
+            for key, (fractions, y, elapsed) in zip(todo, results):
+                self.cache[key] = (self.objective(fractions), fractions, y)
+                self.eval_times.append(elapsed)
+
+        return np.array([self.cache[key][0] for key in keys])
+
+    def fit(
+        self,
+        max_iter: int = 30,
+        dampings: tuple = (1e-4, 1e-2, 1.0, 1e2),
+        bounds: tuple = (0.1, 10.0),
+        tol: float = 1e-12,
+        x0=None,
+    ) -> dict:
+        """
+        Minimizes the objective with a batched Levenberg-Marquardt search.
+
+        Parameters are searched in log(scale) space. Each iteration takes the
+        residual Jacobian from the steady-state sensitivities at the current
+        point (sensitivity.sensitivity_at_steady_state), builds one trial step
+        per damping value and evaluates all trial steps as one batch on the
+        worker pool. The best trial is accepted if it lowers the objective;
+        otherwise the iteration is rejected and the dampings are increased
+        tenfold.
+
+        Args:
+            max_iter (int): Maximum number of iterations, accepted or
+                rejected.
+            dampings (tuple): Damping factors tried in parallel each iteration.
+            bounds (tuple): Lower and upper bounds on the scale factors.
+            tol (float): Stop once the objective falls below this value.
+            x0 (array-like, optional): Initial scale factors; defaults to 1.
+
+        Returns:
+            dict: Best scale factors, constants, fractions, objective value,
+                number of accepted steps ("n_iterations") and of rejected
+                iterations ("n_rejected"), and evaluation statistics.
+        """
+        log_lo, log_hi = np.log(bounds[0]), np.log(bounds[1])
+        x = np.zeros(len(self.indices)) if x0 is None else np.log(x0)
+        x = np.clip(x, log_lo, log_hi)
+        dampings = np.asarray(dampings, dtype=np.float64)
+        rows = self.weights > 0.0
+        sqrt_w = np.sqrt(self.weights[rows])
+
+        if self.n_workers > 1:
+            self._pool = ProcessPoolExecutor(max_workers=self.n_workers)
+        try:
+            value = self.evaluate_log(x)[0]
+            if not np.isfinite(value):
+                raise RuntimeError("No steady state at the initial point.")
+            n_accepted = 0
+            n_rejected = 0
+            for _ in range(max_iter):
+                if value < tol:
+                    break
+                _, fractions, y = self.cache[x.tobytes()]
+                self._warm_state = y
+                c = self.constants(np.exp(x))
+
+                S = sensitivity.sensitivity_at_steady_state(y, c)
+                # d residual / d log(scale) = d f / d c * c
+                J = sqrt_w[:, None] * S[rows][:, self.indices] * c[self.indices]
+                r = sqrt_w * (fractions[rows] - self.targets[rows])
+                JtJ = J.T @ J
+                g = J.T @ r
+                diag = np.maximum(np.diag(JtJ), 1e-12)
+
+                trials = np.array(
+                    [
+                        np.clip(
+                            x - np.linalg.solve(JtJ + mu * np.diag(diag), g),
+                            log_lo,
+                            log_hi,
+                        )
+                        for mu in dampings
+                    ]
+                )
+                values = self.evaluate_log(trials)
+                best = np.argmin(values)
+                if values[best] < value:
+                    x, value = trials[best], values[best]
+                    n_accepted += 1
+                    if best == 0:
+                        dampings = dampings / 10.0
+                else:
+                    n_rejected += 1
+                    dampings = dampings * 10.0
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+        scales = np.exp(x)
+        _, fractions, _ = self.cache[x.tobytes()]
+        return {
+            "scales": scales,
+            "constants": self.constants(scales),
+            "fractions": fractions,
+            "objective": float(value),
+            "n_iterations": n_accepted,
+            "n_rejected": n_rejected,
+            **self.stats(),
+        }
+
+    def stats(self) -> dict:
+        """Number of simulations, cache hits and time per objective evaluation."""
+        times = np.array(self.eval_times)
+        return {
+            "n_evaluations": len(times),
+            "cache_hits": self.cache_hits,
+            "time_per_evaluation": float(times.mean()) if len(times) else 0.0,
+            "time_per_evaluation_median": float(np.median(times))
+            if len(times)
+            else 0.0,
+        }
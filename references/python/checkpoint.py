@@ -0,0 +1,169 @@
+import json
+import struct
+
+import numpy as np
+
+import get_starting_state
+
+# File layout (all integers little-endian):
+#   8 bytes   magic b"GBASCKPT"
+#   uint32    format version
+#   uint32    header length in bytes
+#   ...       UTF-8 JSON header
+#   ...       data blocks, each a C-ordered little-endian float64 array
+#             starting at a 64-byte aligned offset
+# The header holds the simulation time, free-form metadata and, for every
+# field, its shape, byte offset, whether its leading dimension runs over
+# cells and optional column names.
+MAGIC = b"GBASCKPT"
+FORMAT_VERSION = 1
+_ALIGN = 64
+_DTYPE = np.dtype("<f8")
+
+# Default column names of the standard fields
+FIELD_NAMES = {
+    "ep": get_starting_state.names,
+}
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def save_checkpoint(
+    path, time: float, metadata=None, names=None, per_cell=None, **fields
+):
+    """
+    Writes a binary checkpoint of the coupled EP and signaling state.
+
+    Typical fields are ``signalling`` (N, 57) in the
+    get_starting_state_signalling layout, ``ep`` (N, 93) in the
+    get_starting_state.names layout and ``constants`` (N, 167), but any
+    float arrays may be stored. All fields are written as float64.
+
+    Only per-cell fields are sliced by load_checkpoint(cells=...); shared
+    arrays, such as a single (167,) constants vector, are restored whole.
+
+    Args:
+        path (str or os.PathLike): Destination file.
+        time (float): Current simulation time.
+        metadata (dict, optional): JSON-serialisable extra information.
+        names (dict, optional): Column names per field, overriding FIELD_NAMES.
+        per_cell (iterable of str, optional): Fields whose leading dimension
+            runs over cells. Defaults to the fields with two or more
+            dimensions.
+        **fields: Named arrays to store.
+    """
+    names = {**FIELD_NAMES, **(names or {})}
+    arrays = {}
+    entries = {}
+    if per_cell is None:
+        per_cell = [key for key, value in fields.items() if np.ndim(value) >= 2]
+    per_cell = set(per_cell)
+    for key in per_cell:
+        if key not in fields:
+            raise ValueError(f"Per-cell field '{key}' is not recognized.")
+    n_cells = {np.shape(fields[key])[0] for key in per_cell if np.ndim(fields[key])}
+    if len(n_cells) > 1 or any(np.ndim(fields[key]) == 0 for key in per_cell):
+        raise ValueError("Per-cell fields must share their leading dimension.")
+    for key, value in fields.items():
+        array = np.ascontiguousarray(value, dtype=_DTYPE)
+        arrays[key] = array
+        entries[key] = {"shape": list(array.shape), "per_cell": key in per_cell}
+        if key in names and array.ndim >= 1 and len(names[key]) == array.shape[-1]:
+            entries[key]["names"] = list(names[key])
+
+    header = {"time": float(time), "metadata": metadata or {}, "fields": entries}
+    # Offsets depend on the header length, which depends on the offsets;
+    # reserve room for 20-digit offsets and pad the JSON with spaces.
+    for entry in entries.values():
+        entry["offset"] = 0
+    prefix = len(MAGIC) + 8
+    data_start = _aligned(prefix + len(json.dumps(header)) + 20 * len(entries))
+    offset = data_start
+    for key, array in arrays.items():
+        entries[key]["offset"] = offset
+        offset = _aligned(offset + array.nbytes)
+    header_bytes = json.dumps(header).encode("utf-8")
+    header_bytes += b" " * (data_start - prefix - len(header_bytes))
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<II", FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        position = data_start
+        for key, array in arrays.items():
+            f.write(b"\0" * (entries[key]["offset"] - position))
+            array.tofile(f)
+            position = entries[key]["offset"] + array.nbytes
+
+
+def read_checkpoint_header(path) -> dict:
+    """
+    Reads and validates the header of a checkpoint file.
+
+    Args:
+        path (str or os.PathLike): Checkpoint file.
+
+    Returns:
+        dict: The decoded header, including the format version.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"'{path}' is not a checkpoint file.")
+        version, length = struct.unpack("<II", f.read(8))
+        if version > FORMAT_VERSION:
+            raise ValueError(
+                f"Checkpoint format version {version} is newer than the "
+                f"supported version {FORMAT_VERSION}."
+            )
+        header = json.loads(f.read(length).decode("utf-8"))
+    header["version"] = version
+    return header
+
+
+def load_checkpoint(path, fields=None, cells=None, mmap: bool = True) -> tuple:
+    """
+    Restores a checkpoint written by save_checkpoint.
+
+    With mmap=True and no cell selection the returned arrays are read-only
+    memory maps, so restoring is independent of the population size until
+    the data is touched. Selecting cells reads only the requested rows.
+
+    Args:
+        path (str or os.PathLike): Checkpoint file.
+        fields (iterable of str, optional): Fields to restore; defaults to all.
+        cells (slice, int array or bool mask, optional): Rows (cells) to
+            restore from every per-cell field. Other fields are restored
+            whole.
+        mmap (bool): Return memory maps instead of in-memory arrays.
+
+    Returns:
+        tuple: The simulation time, a dict of the restored arrays and the
+            header.
+    """
+    header = read_checkpoint_header(path)
+    entries = header["fields"]
+    if fields is None:
+        fields = list(entries)
+
+    out = {}
+    for key in fields:
+        if key not in entries:
+            raise KeyError(f"Field '{key}' is not in the checkpoint.")
+        shape = tuple(entries[key]["shape"])
+        if int(np.prod(shape)) == 0:
+            out[key] = np.empty(shape, dtype=_DTYPE)
+            continue
+        array = np.memmap(
+            path, dtype=_DTYPE, mode="r", offset=entries[key]["offset"], shape=shape
+        )
+        # Files without the flag treat fields of two or more dimensions as
+        # per-cell, like save_checkpoint's default
+        per_cell = entries[key].get("per_cell", len(shape) >= 2)
+        if cells is not None and per_cell:
+            array = np.array(array[cells])
+        elif not mmap:
+            array = np.array(array)
+        out[key] = array
+    return header["time"], out, header
@@ -0,0 +1,140 @@
+"""
+Deduplicated population stepping.
+
+Populations often contain many cells with identical signaling constants,
+for example cells at the same iso concentration that differ only in their
+EP model. If such cells also share their signaling state, they follow the
+same trajectory. DeduplicatedPopulation keys every cell on its constants
+row (and, by default, its state row), steps only one representative per
+unique key and scatters the results back through the index map.
+
+Rows are compared bitwise, so only exactly equal rows are merged.
+
+out_of_core.ChunkedExecutor(..., deduplicate=True) applies this to every
+block it streams through memory. Other drivers can wrap their (N, 167)
+constants and (N, 57) states the same way: build a DeduplicatedPopulation,
+step it, and copy its states back.
+"""
+
+import numpy as np
+
+import batched
+import metrics
+import utils
+
+try:
+    import utils_jit
+except ImportError:
+    utils_jit = None
+
+
+def unique_rows(array: np.ndarray) -> tuple:
+    """
+    Bitwise unique rows of a 2-D array.
+
+    Args:
+        array (np.ndarray): (N, M) array.
+
+    Returns:
+        tuple: Index of the first occurrence of every unique row, in order
+            of first occurrence, and the (N,) inverse map from cells to
+            unique rows.
+    """
+    array = np.ascontiguousarray(array)
+    keys = array.view(np.dtype((np.void, array.dtype.itemsize * array.shape[1])))
+    _, first, inverse = np.unique(keys.ravel(), return_index=True, return_inverse=True)
+    # Renumber the unique rows by first occurrence instead of byte order
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return first[order], rank[inverse.ravel()]
+
+
+class DeduplicatedPopulation:
+    """
+    A population stepped once per unique (constants, state) key.
+
+    Args:
+        constants (np.ndarray): (N, 167) constants.
+        states (np.ndarray): (N, 57) signaling states.
+        hash_states (bool): Include the state rows in the key. With False
+            only the constants are compared, which assumes that cells with
+            equal constants have equal states, e.g. because all cells
+            started from the same state; the state of the first cell of
+            every group is used.
+    """
+
+    def __init__(self, constants, states, hash_states: bool = True):
+        constants = np.asarray(constants, dtype=np.float64)
+        states = np.asarray(states, dtype=np.float64)
+        if constants.shape[0] != states.shape[0]:
+            raise ValueError("States and constants differ in their number of cells.")
+        keys = np.hstack([constants, states]) if hash_states else constants
+        self.representatives, self.index = unique_rows(keys)
+        self.constants = np.ascontiguousarray(constants[self.representatives])
+        self.unique_states = np.ascontiguousarray(states[self.representatives])
+        self.unique_fractions = None
+        self.hash_states = hash_states
+        self.steps_taken = 0
+
+    @property
+    def n_cells(self) -> int:
+        return self.index.shape[0]
+
+    @property
+    def n_unique(self) -> int:
+        return self.representatives.shape[0]
+
+    def step(self, dt: float, n_steps: int = 1, jit: bool = True) -> np.ndarray:
+        """
+        Advances the unique states by n_steps with forward Euler.
+
+        Args:
+            dt (float): Time step in ms.
+            n_steps (int): Number of steps.
+            jit (bool): Use the utils_jit batch kernel if numba is installed,
+                otherwise batched.update_fraction_parameters.
+
+        Returns:
+            np.ndarray: (N, 8) fractions of every cell after the last step.
+        """
+        if jit and utils_jit is not None:
+            update = utils_jit.update_fraction_parameters_batch
+        else:
+            update = batched.update_fraction_parameters
+        for _ in range(n_steps):
+            self.unique_fractions = update(True, dt, self.unique_states, self.constants)
+        self.steps_taken += n_steps
+        if metrics.ENABLED:
+            saved = n_steps * (self.n_cells - self.n_unique)
+            metrics.count("dedup_evaluations_saved", saved)
+        return self.fractions
+
+    @property
+    def fractions(self) -> np.ndarray:
+        """(N, 8) fractions after the last step, scattered to every cell."""
+        if self.unique_fractions is None:
+            return np.full((self.n_cells, len(utils.names_signalling)), np.nan)
+        return self.unique_fractions[self.index]
+
+    @property
+    def states(self) -> np.ndarray:
+        """(N, 57) states, scattered to every cell."""
+        return self.unique_states[self.index]
+
+    def stats(self) -> dict:
+        """
+        Deduplication statistics.
+
+        Returns:
+            dict: Number of cells and unique keys, dedup ratio (cells per
+                unique key) and the signaling evaluations done and saved.
+        """
+        return {
+            "cells": self.n_cells,
+            "unique": self.n_unique,
+            "dedup_ratio": self.n_cells / max(self.n_unique, 1),
+            "hash_states": self.hash_states,
+            "evaluations": self.steps_taken * self.n_unique,
+            "evaluations_saved": self.steps_taken * (self.n_cells - self.n_unique),
+        }
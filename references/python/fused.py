@@ -0,0 +1,109 @@
+"""
+Fused signaling step: derivative, forward Euler update and fractions.
+
+get_pka_signalling reads every state into a local variable before it
+computes the first derivative, so each ``ydot[k] = expr`` can become the
+in-place update ``y[k] += dt * (expr)``. The fused step is generated from
+the reference source with that rewrite (see generate_kernels.py), so it
+needs no derivative array and no second pass over the state, and it returns
+algebraic intermediates of the RHS instead of the derivative.
+
+The Whole_cell_PP1 output is still recomputed after the update: the
+reference evaluates it at the updated Inhib1_P, while the RHS's PP1f_cyt
+belongs to the state before the step. The latter is available as the
+"PP1f_cyt" intermediate.
+"""
+
+
+import numpy as np
+
+import generated_kernels
+import getEffectiveFraction
+import metrics
+import utils
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+INTERMEDIATES = generated_kernels.INTERMEDIATES
+
+euler_step = generated_kernels.euler_step
+
+
+def _make_fused_update(step, effective_fraction):
+    # Closure over the step and fraction functions, so the same body serves
+    # as the NumPy kernel and, closed over compiled functions, the numba one
+    def fused_update(dt, X0, const_signaling, fraction, intermediates):
+        aux = step(X0, const_signaling, dt)
+        for k in range(len(intermediates)):
+            intermediates[k] = aux[k]
+        effective_fraction(y=X0, c=const_signaling, output=fraction[:-1])
+        # Concentration of uninhibited PP1 in the cytosolic compartment, at
+        # the updated state
+        pp1_PP1f_cyt_sum = const_signaling[37] - const_signaling[36] + X0[38]
+        PP1f_cyt = 0.5 * (
+            np.sqrt(
+                pp1_PP1f_cyt_sum**2.0 + 4.0 * const_signaling[37] * const_signaling[36]
+            )
+            - pp1_PP1f_cyt_sum
+        )
+        fraction[-1] = (
+            const_signaling[35] / const_signaling[4]
+            + const_signaling[34] / const_signaling[5]
+            + PP1f_cyt / const_signaling[6]
+        )
+        return fraction
+
+    return fused_update
+
+
+_fused_update = _make_fused_update(
+    euler_step, getEffectiveFraction.get_effective_fraction
+)
+if numba is not None:
+    _fused_update_jit = numba.njit(
+        _make_fused_update(
+            numba.njit(euler_step),
+            numba.njit(getEffectiveFraction.get_effective_fraction),
+        )
+    )
+
+
+def update_fraction_parameters(
+    dt: float,
+    X0: np.ndarray,
+    const_signaling: np.ndarray,
+    fraction=None,
+    intermediates=None,
+    jit: bool = True,
+) -> np.ndarray:
+    """
+    Fused utils.update_fraction_parameters (forward Euler, signaling on).
+
+    Args:
+        dt (float): Time step in ms.
+        X0 (np.ndarray): Signaling state vector, updated in place.
+        const_signaling (np.ndarray): A vector of model parameters.
+        fraction (np.ndarray, optional): Output array of the 8 fractions.
+        intermediates (np.ndarray, optional): Receives the INTERMEDIATES at
+            the state before the step.
+        jit (bool): Use the numba build if numba is installed.
+
+    Returns:
+        np.ndarray: The fractions in names_signalling order.
+    """
+    if fraction is None:
+        fraction = np.zeros(len(utils.names_signalling))
+    if intermediates is None:
+        intermediates = np.empty(len(INTERMEDIATES))
+    if metrics.ENABLED:
+        start = metrics.begin_update(X0)
+    if jit and numba is not None:
+        _fused_update_jit(dt, X0, const_signaling, fraction, intermediates)
+    else:
+        _fused_update(dt, X0, const_signaling, fraction, intermediates)
+    if metrics.ENABLED:
+        metrics.end_update(dt, True, start)
+    return fraction
@@ -0,0 +1,257 @@
+"""
+Generates generated_kernels.py from the signaling reference functions.
+
+The reference functions index their inputs as y[k] and c[k] and are
+otherwise plain arithmetic, so they already work on a whole population if
+y is passed as a (57, N) array, with one cell per column, and c as either a
+(167,) or a (167, N) array. Only their scalar branches (clamps, conditional
+square roots and the arctan guard) need to become element-wise. Instead of
+keeping a hand-written second copy of the model, those branches are
+rewritten into np.where / np.maximum / np.minimum calls. np.where evaluates
+both branches, so the guarded variable is replaced by a safe value in the
+discarded one, e.g. ``np.sqrt(x) if x > 0.0 else 0.0`` becomes
+``np.where(x > 0.0, np.sqrt(np.where(x > 0.0, x, 1.0)), 0.0)``.
+
+The same source also yields the in-place forward Euler step of fused.py,
+in which every ``ydot[k] = expr`` becomes ``y[k] += dt * expr``.
+
+The output is committed, so nothing is parsed at import time. Rerun
+
+    python generate_kernels.py
+
+after changing getPKASignalling.py or getEffectiveFraction.py;
+tests/test_kernels.py checks that the committed file is current.
+"""
+
+import ast
+import inspect
+import os
+import textwrap
+
+import getEffectiveFraction
+import getPKASignalling
+
+OUTPUT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "generated_kernels.py"
+)
+
+# Algebraic intermediates of get_pka_signalling returned by the fused step
+INTERMEDIATES = (
+    "beta_cav_Gs_f",  # free Gs, caveolar
+    "beta_eca_Gs_f",  # free Gs, extracaveolar
+    "beta_cyt_Gs_f",  # free Gs, cytosolic
+    "beta_cav_Gi_f",  # free Gi, caveolar
+    "beta_eca_Gi_f",  # free Gi, extracaveolar
+    "PP1f_cyt",  # free (uninhibited) cytosolic PP1
+    "pka_cav_C",  # catalytic PKA subunit, caveolar
+    "pka_eca_C",  # catalytic PKA subunit, extracaveolar
+    "pka_cyt_C",  # catalytic PKA subunit, cytosolic
+)
+
+_BUILTINS = {"max": "maximum", "min": "minimum"}
+
+# Values that satisfy a comparison with zero, substituted for the guarded
+# variable in the branch np.where discards
+_SAFE = {ast.Gt: 1.0, ast.Lt: -1.0, ast.NotEq: 1.0}
+
+_HEADER = '''\
+# Generated by generate_kernels.py from getPKASignalling.py and
+# getEffectiveFraction.py. Do not edit; rerun the generator instead.
+"""
+Element-wise and in-place Euler builds of the signaling reference functions.
+"""
+
+import numpy as np
+'''
+
+
+def _np(attr: str) -> ast.Attribute:
+    module = ast.Name(id="np", ctx=ast.Load())
+    return ast.Attribute(value=module, attr=attr, ctx=ast.Load())
+
+
+def _name(node) -> str:
+    return node.id if isinstance(node, ast.Name) else ""
+
+
+def _single_assign(statements):
+    # The target name and value if statements are one plain assignment
+    if len(statements) == 1 and isinstance(statements[0], ast.Assign):
+        targets = statements[0].targets
+        if len(targets) == 1 and isinstance(targets[0], ast.Name):
+            return targets[0].id, statements[0].value
+    return None, None
+
+
+class _Substitute(ast.NodeTransformer):
+    """Replaces every load of a name with an expression."""
+
+    def __init__(self, name: str, value):
+        self.name = name
+        self.value = value
+
+    def visit_Name(self, node):
+        if node.id == self.name and isinstance(node.ctx, ast.Load):
+            return self.value
+        return node
+
+
+def _where(test, body, orelse) -> ast.Call:
+    # A guard "x > 0", "x < 0" or "x != 0" protects the body; evaluate it
+    # with a safe stand-in for x wherever the guard does not hold
+    if (
+        isinstance(test, ast.Compare)
+        and len(test.ops) == 1
+        and type(test.ops[0]) in _SAFE
+        and isinstance(test.left, ast.Name)
+        and isinstance(test.comparators[0], ast.Constant)
+        and test.comparators[0].value == 0
+        and _name(body) != test.left.id
+    ):
+        safe = ast.Constant(_SAFE[type(test.ops[0])])
+        guarded = ast.Call(
+            func=_np("where"), args=[test, test.left, safe], keywords=[]
+        )
+        body = _Substitute(test.left.id, guarded).visit(body)
+    return ast.Call(func=_np("where"), args=[test, body, orelse], keywords=[])
+
+
+class _ElementWise(ast.NodeTransformer):
+    """Rewrites scalar branches into element-wise NumPy expressions."""
+
+    def visit_IfExp(self, node):
+        self.generic_visit(node)
+        return _where(node.test, node.body, node.orelse)
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        if isinstance(node.func, ast.Name) and node.func.id in _BUILTINS:
+            node.func = _np(_BUILTINS[node.func.id])
+        return node
+
+    def _value(self, statements, name):
+        # Value assigned to name by an if/elif/else chain, or None
+        if not statements:
+            return ast.Name(id=name, ctx=ast.Load())
+        if len(statements) == 1 and isinstance(statements[0], ast.If):
+            branch = statements[0]
+            body = self._value(branch.body, name)
+            orelse = self._value(branch.orelse, name)
+            if body is None or orelse is None:
+                return None
+            return _where(self.visit(branch.test), body, orelse)
+        target, value = _single_assign(statements)
+        return self.visit(value) if target == name else None
+
+    def visit_If(self, node):
+        target, _ = _single_assign(node.body)
+        value = self._value([node], target) if target is not None else None
+        if value is None:
+            # Control flow on a scalar flag (e.g. original_output); keep it
+            self.generic_visit(node)
+            return node
+        return ast.copy_location(
+            ast.Assign(targets=[ast.Name(id=target, ctx=ast.Store())], value=value),
+            node,
+        )
+
+
+class _EulerInPlace(ast.NodeTransformer):
+    """Turns the RHS into an in-place forward Euler step."""
+
+    def visit_FunctionDef(self, node):
+        node.args.args.append(ast.arg(arg="dt"))
+        self.generic_visit(node)
+        return node
+
+    def visit_Assign(self, node):
+        target = node.targets[0]
+        if isinstance(target, ast.Name) and target.id == "ydot":
+            return None  # the derivative array is no longer needed
+        if isinstance(target, ast.Subscript) and _name(target.value) == "ydot":
+            target.value = ast.Name(id="y", ctx=ast.Load())
+            dt = ast.Name(id="dt", ctx=ast.Load())
+            step = ast.BinOp(dt, ast.Mult(), node.value)
+            return ast.copy_location(ast.AugAssign(target, ast.Add(), step), node)
+        return node
+
+    def visit_Return(self, node):
+        names = [ast.Name(id=name, ctx=ast.Load()) for name in INTERMEDIATES]
+        return ast.copy_location(ast.Return(ast.Tuple(names, ast.Load())), node)
+
+
+def transform_function(function, name: str, docstring: str, *transformers) -> str:
+    """
+    Source of a module-level function after rewriting it.
+
+    Args:
+        function: The function to rewrite.
+        name (str): Name of the new function.
+        docstring (str): Docstring replacing the original one.
+        *transformers (ast.NodeTransformer): Applied in order to the tree.
+
+    Returns:
+        str: The source of the new function.
+    """
+    tree = ast.parse(textwrap.dedent(inspect.getsource(function)))
+    for transformer in transformers:
+        tree = transformer.visit(tree)
+    node = tree.body[0]
+    node.name = name
+    if ast.get_docstring(node) is not None:
+        node.body.pop(0)
+    docstring = textwrap.indent(textwrap.dedent(docstring).strip("\n"), "    ")
+    node.body.insert(0, ast.Expr(ast.Constant(f"\n{docstring}\n    ")))
+    return ast.unparse(ast.fix_missing_locations(tree))
+
+
+def generate() -> str:
+    """The source of generated_kernels.py."""
+    functions = [
+        transform_function(
+            getPKASignalling.get_pka_signalling,
+            "get_pka_signalling",
+            """
+            Element-wise get_pka_signalling on (57, N) states, one cell per
+            column, and (167,) or (167, N) constants.
+            """,
+            _ElementWise(),
+        ),
+        transform_function(
+            getEffectiveFraction.get_effective_fraction,
+            "get_effective_fraction",
+            """
+            Element-wise get_effective_fraction on (57, N) states, (167,) or
+            (167, N) constants and an (8, N) or (7, N) output.
+            """,
+            _ElementWise(),
+        ),
+        transform_function(
+            getPKASignalling.get_pka_signalling,
+            "euler_step",
+            """
+            Forward Euler step of the signaling model, in place.
+
+            Args:
+                y (np.ndarray): Signaling state vector, updated in place.
+                c (np.ndarray): A vector of model parameters.
+                dt (float): Time step in ms.
+
+            Returns:
+                tuple: The INTERMEDIATES evaluated at the state before the step.
+            """,
+            _EulerInPlace(),
+        ),
+    ]
+    names = "".join(f'    "{name}",\n' for name in INTERMEDIATES)
+    constants = f"INTERMEDIATES = (\n{names})"
+    return "\n\n\n".join([_HEADER + "\n" + constants, *functions]) + "\n"
+
+
+def main():
+    with open(OUTPUT, "w") as f:
+        f.write(generate())
+
+
+if __name__ == "__main__":
+    main()
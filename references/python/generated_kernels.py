@@ -0,0 +1,598 @@
+# Generated by generate_kernels.py from getPKASignalling.py and
+# getEffectiveFraction.py. Do not edit; rerun the generator instead.
+"""
+Element-wise and in-place Euler builds of the signaling reference functions.
+"""
+
+import numpy as np
+
+INTERMEDIATES = (
+    "beta_cav_Gs_f",
+    "beta_eca_Gs_f",
+    "beta_cyt_Gs_f",
+    "beta_cav_Gi_f",
+    "beta_eca_Gi_f",
+    "PP1f_cyt",
+    "pka_cav_C",
+    "pka_eca_C",
+    "pka_cyt_C",
+)
+
+
+def get_pka_signalling(y: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """
+    Element-wise get_pka_signalling on (57, N) states, one cell per
+    column, and (167,) or (167, N) constants.
+    """
+    ydot = np.zeros_like(y)
+    beta_cav_Gs_aGTP = y[0]
+    beta_eca_Gs_aGTP = y[1]
+    beta_cyt_Gs_aGTP = y[2]
+    beta_cav_Gs_bg = y[3]
+    beta_eca_Gs_bg = y[4]
+    beta_cyt_Gs_bg = y[5]
+    beta_cav_Gs_aGDP = y[6]
+    beta_eca_Gs_aGDP = y[7]
+    beta_cyt_Gs_aGDP = y[8]
+    cAMP_cav = y[9]
+    cAMP_eca = y[10]
+    cAMP_cyt = y[11]
+    beta_cav_Rb1_pka_tot = y[12]
+    beta_eca_Rb1_pka_tot = y[13]
+    beta_cyt_Rb1_pka_tot = y[14]
+    beta_cav_Rb1_grk_tot = y[15]
+    beta_eca_Rb1_grk_tot = y[16]
+    beta_cyt_Rb1_grk_tot = y[17]
+    pka_cav_ARC = y[18]
+    pka_cav_A2RC = y[19]
+    pka_cav_A2R = y[20]
+    pka_cav_C = y[21]
+    pka_cav_PKIC = y[22]
+    pka_eca_ARC = y[23]
+    pka_eca_A2RC = y[24]
+    pka_eca_A2R = y[25]
+    pka_eca_C = y[26]
+    pka_eca_PKIC = y[27]
+    pka_cyt_ARC = y[28]
+    pka_cyt_A2RC = y[29]
+    pka_cyt_A2R = y[30]
+    pka_cyt_C = y[31]
+    pka_cyt_PKIC = y[32]
+    PDE3_P_cav = y[33]
+    PDE3_P_cyt = y[34]
+    PDE4_P_cav = y[35]
+    PDE4_P_eca = y[36]
+    PDE4_P_cyt = y[37]
+    inhib1_p = y[38]
+    ICaLp = y[39]
+    IKsp = y[40]
+    iup_f_plb = y[41]
+    f_tni = y[42]
+    ina_f_ina = y[43]
+    f_inak = y[44]
+    RyRp = y[45]
+    f_ikur = y[46]
+    iup_f_plb = np.where(iup_f_plb < 0.0, 0.0001, np.where(iup_f_plb > 1.0, 0.9999, iup_f_plb))
+    f_tni = np.where(f_tni < 0.0, 0.0001, np.where(f_tni > 1.0, 0.9999, f_tni))
+    ina_f_ina = np.where(ina_f_ina < 0.0, 0.0001, np.where(ina_f_ina > 1.0, 0.9999, ina_f_ina))
+    f_inak = np.where(f_inak < 0.0, 0.0001, np.where(f_inak > 1.0, 0.9999, f_inak))
+    f_ikur = np.where(f_ikur < 0.0, 0.0001, np.where(f_ikur > 1.0, 0.9999, f_ikur))
+    beta_cav_Rb2_pka_tot = y[47]
+    beta_cav_Rb2_grk_tot = y[48]
+    beta_cav_Gi_aGTP = y[49]
+    beta_cav_Gi_bg = y[50]
+    beta_cav_Gi_aGDP = y[51]
+    beta_eca_Rb2_pka_tot = y[52]
+    beta_eca_Rb2_grk_tot = y[53]
+    beta_eca_Gi_aGTP = y[54]
+    beta_eca_Gi_bg = y[55]
+    beta_eca_Gi_aGDP = y[56]
+    beta_cav_Rb1_np_tot = c[86] - beta_cav_Rb1_pka_tot - beta_cav_Rb1_grk_tot
+    beta_cav_Rb2_np_tot = c[88] - beta_cav_Rb2_pka_tot - beta_cav_Rb2_grk_tot
+    beta_cav_Gi_abg = c[62] * c[58] * c[4] - beta_cav_Gi_aGTP - beta_cav_Gi_aGDP
+    beta_cav_Gs_abg = c[60] * c[57] * c[4] - beta_cav_Gs_aGTP - beta_cav_Gs_aGDP
+    beta_cav_Gs_f_d = beta_cav_Gs_abg * c[92] / c[91]
+    beta_cav_Gs_f_b = (c[93] + c[90]) / c[91] + beta_cav_Rb1_np_tot + beta_cav_Rb2_np_tot - beta_cav_Gs_abg
+    beta_cav_Gs_f_c = (c[90] * (beta_cav_Rb1_np_tot - beta_cav_Gs_abg) + c[93] * (beta_cav_Rb2_np_tot - beta_cav_Gs_abg) + c[92]) / c[91]
+    beta_cav_Gs_f_rr = -beta_cav_Gs_f_d / 27.0 * beta_cav_Gs_f_b ** 3.0 - beta_cav_Gs_f_b * beta_cav_Gs_f_b * beta_cav_Gs_f_c * beta_cav_Gs_f_c / 108.0 + beta_cav_Gs_f_b * beta_cav_Gs_f_c * beta_cav_Gs_f_d / 6.0 + beta_cav_Gs_f_c ** 3.0 / 27.0 + beta_cav_Gs_f_d * beta_cav_Gs_f_d / 4.0
+    beta_cav_Gs_f_yr = np.where(beta_cav_Gs_f_rr > 0.0, np.sqrt(np.where(beta_cav_Gs_f_rr > 0.0, beta_cav_Gs_f_rr, 1.0)), 0.0) + beta_cav_Gs_f_d / 2.0 + beta_cav_Gs_f_b * beta_cav_Gs_f_c / 6.0 - beta_cav_Gs_f_b ** 3.0 / 27.0
+    beta_cav_Gs_f_yi = np.where(beta_cav_Gs_f_rr < 0.0, np.sqrt(-np.where(beta_cav_Gs_f_rr < 0.0, beta_cav_Gs_f_rr, -1.0)), 0.0)
+    beta_cav_Gs_f_mag = (beta_cav_Gs_f_yr * beta_cav_Gs_f_yr + beta_cav_Gs_f_yi * beta_cav_Gs_f_yi) ** (1.0 / 6.0)
+    beta_cav_Gs_f_arg = np.where(beta_cav_Gs_f_yr != 0, np.arctan(beta_cav_Gs_f_yi / np.where(beta_cav_Gs_f_yr != 0, beta_cav_Gs_f_yr, 1.0)) / 3.0, 0)
+    beta_cav_Gs_f_x = (beta_cav_Gs_f_c / 3.0 - beta_cav_Gs_f_b * beta_cav_Gs_f_b / 9.0) / (beta_cav_Gs_f_mag * beta_cav_Gs_f_mag)
+    beta_cav_Gs_f_r = beta_cav_Gs_f_mag * np.cos(beta_cav_Gs_f_arg) * (1.0 - beta_cav_Gs_f_x) - beta_cav_Gs_f_b / 3.0
+    beta_cav_Gs_f_i = beta_cav_Gs_f_mag * np.sin(beta_cav_Gs_f_arg) * (1.0 + beta_cav_Gs_f_x)
+    beta_cav_Gs_f = np.sqrt(beta_cav_Gs_f_r * beta_cav_Gs_f_r + beta_cav_Gs_f_i * beta_cav_Gs_f_i)
+    beta_cav_Rb1_f = beta_cav_Rb1_np_tot / (1.0 + c[0] / c[64] + beta_cav_Gs_f * (c[66] + c[0]) / (c[65] * c[66]))
+    beta_cav_LRb1 = c[0] * beta_cav_Rb1_f / c[64]
+    beta_cav_LRb1Gs = c[0] * beta_cav_Rb1_f * beta_cav_Gs_f / (c[65] * c[66])
+    beta_cav_Rb2_f = beta_cav_Rb2_np_tot / (1.0 + c[0] / c[71] + beta_cav_Gs_f * (c[68] + c[0]) / (c[70] * c[68]))
+    beta_cav_LRb2 = c[0] * beta_cav_Rb2_f / c[71]
+    beta_cav_Rb2Gs = beta_cav_Rb2_f * beta_cav_Gs_f / c[70]
+    beta_cav_Rb1Gs = beta_cav_Rb1_f * beta_cav_Gs_f / c[65]
+    beta_cav_LRb2Gs = c[0] * beta_cav_Rb2_f * beta_cav_Gs_f / (c[70] * c[68])
+    ydot[12] = 0.001 * (c[83] * pka_cav_C * beta_cav_Rb1_np_tot - c[84] * beta_cav_Rb1_pka_tot)
+    ydot[15] = 0.001 * (c[82] * c[85] * (beta_cav_LRb1 + beta_cav_LRb1Gs) - c[81] * beta_cav_Rb1_grk_tot)
+    ydot[47] = 0.001 * (c[83] * pka_cav_C * beta_cav_Rb2_np_tot - c[84] * beta_cav_Rb2_pka_tot)
+    ydot[48] = 0.001 * (c[82] * c[85] * (beta_cav_LRb2 + beta_cav_LRb2Gs) - c[81] * beta_cav_Rb2_grk_tot)
+    beta_eca_Gs_abg = c[59] * c[57] * c[5] - beta_eca_Gs_aGTP - beta_eca_Gs_aGDP
+    beta_eca_Rb2_np_tot = c[96] - beta_eca_Rb2_pka_tot - beta_eca_Rb2_grk_tot
+    beta_eca_Rb1_np_tot = c[97] - beta_eca_Rb1_pka_tot - beta_eca_Rb1_grk_tot
+    beta_eca_Gs_f_d = beta_eca_Gs_abg * c[100] / c[101]
+    beta_eca_Gs_f_c = (c[102] * (beta_eca_Rb1_np_tot - beta_eca_Gs_abg) + c[99] * (beta_eca_Rb2_np_tot - beta_eca_Gs_abg) + c[100]) / c[101]
+    beta_eca_Gs_f_b = (c[99] + c[102]) / c[101] + beta_eca_Rb1_np_tot + beta_eca_Rb2_np_tot - beta_eca_Gs_abg
+    beta_eca_Gs_f_rr = -beta_eca_Gs_f_d / 27.0 * beta_eca_Gs_f_b ** 3.0 - beta_eca_Gs_f_b * beta_eca_Gs_f_b * beta_eca_Gs_f_c * beta_eca_Gs_f_c / 108.0 + beta_eca_Gs_f_b * beta_eca_Gs_f_c * beta_eca_Gs_f_d / 6.0 + beta_eca_Gs_f_c ** 3.0 / 27.0 + beta_eca_Gs_f_d * beta_eca_Gs_f_d / 4.0
+    beta_eca_Gs_f_yi = np.where(beta_eca_Gs_f_rr < 0.0, np.sqrt(-np.where(beta_eca_Gs_f_rr < 0.0, beta_eca_Gs_f_rr, -1.0)), 0.0)
+    beta_eca_Gs_f_yr = np.where(beta_eca_Gs_f_rr > 0.0, np.sqrt(np.where(beta_eca_Gs_f_rr > 0.0, beta_eca_Gs_f_rr, 1.0)), 0.0) + beta_eca_Gs_f_d / 2.0 + beta_eca_Gs_f_b * beta_eca_Gs_f_c / 6.0 - beta_eca_Gs_f_b ** 3.0 / 27.0
+    beta_eca_Gs_f_mag = (beta_eca_Gs_f_yr * beta_eca_Gs_f_yr + beta_eca_Gs_f_yi * beta_eca_Gs_f_yi) ** (1.0 / 6.0)
+    beta_eca_Gs_f_arg = np.where(beta_eca_Gs_f_yr != 0, np.arctan(beta_eca_Gs_f_yi / np.where(beta_eca_Gs_f_yr != 0, beta_eca_Gs_f_yr, 1.0)) / 3.0, 0)
+    beta_eca_Gs_f_x = (beta_eca_Gs_f_c / 3.0 - beta_eca_Gs_f_b * beta_eca_Gs_f_b / 9.0) / (beta_eca_Gs_f_mag * beta_eca_Gs_f_mag)
+    beta_eca_Gs_f_i = beta_eca_Gs_f_mag * np.sin(beta_eca_Gs_f_arg) * (1.0 + beta_eca_Gs_f_x)
+    beta_eca_Gs_f_r = beta_eca_Gs_f_mag * np.cos(beta_eca_Gs_f_arg) * (1.0 - beta_eca_Gs_f_x) - beta_eca_Gs_f_b / 3.0
+    beta_eca_Gs_f = np.sqrt(beta_eca_Gs_f_r * beta_eca_Gs_f_r + beta_eca_Gs_f_i * beta_eca_Gs_f_i)
+    beta_eca_Rb1_f = beta_eca_Rb1_np_tot / (1.0 + c[0] / c[64] + beta_eca_Gs_f * (c[66] + c[0]) / (c[65] * c[66]))
+    beta_eca_Rb2_f = beta_eca_Rb2_np_tot / (1.0 + c[0] / c[71] + beta_eca_Gs_f * (c[68] + c[0]) / (c[70] * c[68]))
+    beta_eca_LRb1 = c[0] * beta_eca_Rb1_f / c[64]
+    beta_eca_LRb2 = c[0] * beta_eca_Rb2_f / c[71]
+    beta_eca_LRb2Gs = c[0] * beta_eca_Rb2_f * beta_eca_Gs_f / (c[70] * c[68])
+    beta_eca_LRb1Gs = c[0] * beta_eca_Rb1_f * beta_eca_Gs_f / (c[65] * c[66])
+    beta_eca_Rb2Gs = beta_eca_Rb2_f * beta_eca_Gs_f / c[70]
+    beta_eca_Rb1Gs = beta_eca_Rb1_f * beta_eca_Gs_f / c[65]
+    beta_eca_RGs_tot = beta_eca_Rb1Gs + c[95] * beta_eca_Rb2Gs
+    beta_eca_LRGs_tot = beta_eca_LRb1Gs + c[95] * beta_eca_LRb2Gs
+    beta_eca_Gi_abg = c[63] * c[58] * c[5] - beta_eca_Gi_aGTP - beta_eca_Gi_aGDP
+    beta_eca_Rb2_pka_f_c = -beta_eca_Rb2_pka_tot * c[69] * c[72]
+    beta_eca_Rb2_pka_f_b = beta_eca_Gi_abg * (c[0] + c[72]) - beta_eca_Rb2_pka_tot * (c[72] + c[0]) + c[69] * c[72] * (1.0 + c[0] / c[67])
+    sqrt_term = beta_eca_Rb2_pka_f_b * beta_eca_Rb2_pka_f_b - 4.0 * c[98] * beta_eca_Rb2_pka_f_c
+    beta_eca_Rb2_pka_f = (-beta_eca_Rb2_pka_f_b + np.sqrt(np.where(sqrt_term > 0, sqrt_term, 0))) / (2.0 * c[98])
+    ydot[13] = 0.001 * (c[83] * pka_eca_C * beta_eca_Rb1_np_tot - c[84] * beta_eca_Rb1_pka_tot)
+    ydot[16] = 0.001 * (c[82] * c[94] * (beta_eca_LRb1 + beta_eca_LRb1Gs) - c[81] * beta_eca_Rb1_grk_tot)
+    ydot[52] = 0.001 * (c[83] * pka_eca_C * beta_eca_Rb2_np_tot - c[84] * beta_eca_Rb2_pka_tot)
+    ydot[53] = 0.001 * (c[82] * c[94] * (beta_eca_LRb2 + beta_eca_LRb2Gs) - c[81] * beta_eca_Rb2_grk_tot)
+    beta_cyt_Gs_abg = c[61] * c[57] * c[6] - beta_cyt_Gs_aGTP - beta_cyt_Gs_aGDP
+    beta_cyt_Rb1_np_tot = c[103] - beta_cyt_Rb1_pka_tot - beta_cyt_Rb1_grk_tot
+    beta_cyt_Rb1_np_f_b = beta_cyt_Gs_abg * (c[66] + c[0]) - beta_cyt_Rb1_np_tot * (c[66] + c[0]) + c[65] * c[66] * (1.0 + c[0] / c[64])
+    beta_cyt_Rb1_np_f_c = -beta_cyt_Rb1_np_tot * c[66] * c[65]
+    sqrt_term = beta_cyt_Rb1_np_f_b * beta_cyt_Rb1_np_f_b - 4.0 * c[105] * beta_cyt_Rb1_np_f_c
+    Rb1_np_f = (-beta_cyt_Rb1_np_f_b + np.sqrt(np.where(sqrt_term > 0, sqrt_term, 0))) / (2.0 * c[105])
+    beta_cyt_Gs_f = beta_cyt_Gs_abg / (1.0 + Rb1_np_f / c[65] * (1.0 + c[0] / c[66]))
+    LRb1_np = c[0] * Rb1_np_f / c[64]
+    LRb1Gs_np = c[0] * Rb1_np_f * beta_cyt_Gs_f / (c[65] * c[66])
+    Rb1Gs_np = beta_cyt_Gs_f * Rb1_np_f / c[65]
+    ydot[14] = 0.001 * (c[83] * pka_cyt_C * beta_cyt_Rb1_np_tot - c[84] * beta_cyt_Rb1_pka_tot)
+    ydot[17] = 0.001 * (c[82] * c[104] * (LRb1_np + LRb1Gs_np) - c[81] * beta_cyt_Rb1_grk_tot)
+    beta_cav_RGs_tot = beta_cav_Rb1Gs + c[87] * beta_cav_Rb2Gs
+    beta_cav_LRGs_tot = beta_cav_LRb1Gs + c[87] * beta_cav_LRb2Gs
+    beta_cav_Rb2_pka_f_c = -beta_cav_Rb2_pka_tot * c[69] * c[72]
+    beta_cav_Rb2_pka_f_b = beta_cav_Gi_abg * (c[0] + c[72]) - beta_cav_Rb2_pka_tot * (c[72] + c[0]) + c[69] * c[72] * (1.0 + c[0] / c[67])
+    sqrt_term = beta_cav_Rb2_pka_f_b * beta_cav_Rb2_pka_f_b - 4.0 * c[89] * beta_cav_Rb2_pka_f_c
+    beta_cav_Rb2_pka_f = (-beta_cav_Rb2_pka_f_b + np.sqrt(np.where(sqrt_term > 0, sqrt_term, 0))) / (2.0 * c[89])
+    beta_cav_Gi_f = beta_cav_Gi_abg / (1.0 + beta_cav_Rb2_pka_f / c[69] * (1.0 + c[0] / c[72]))
+    beta_cav_Rb2Gi = beta_cav_Rb2_pka_f * beta_cav_Gi_f / c[69]
+    beta_cav_LRb2Gi = beta_cav_Rb2Gi * c[0] / c[72]
+    beta_eca_Gi_f = beta_eca_Gi_abg / (1.0 + beta_eca_Rb2_pka_f / c[69] * (1.0 + c[0] / c[72]))
+    beta_eca_Rb2Gi = beta_eca_Rb2_pka_f * beta_eca_Gi_f / c[69]
+    beta_eca_LRb2Gi = c[0] / c[72] * beta_eca_Rb2Gi
+    ydot[0] = 0.001 * (c[74] * beta_cav_RGs_tot + c[73] * beta_cav_LRGs_tot - c[77] * beta_cav_Gs_aGTP)
+    ydot[49] = 0.001 * (c[76] * beta_cav_Rb2Gi + c[75] * beta_cav_LRb2Gi - c[78] * beta_cav_Gi_aGTP)
+    ydot[1] = 0.001 * (c[74] * beta_eca_RGs_tot + c[73] * beta_eca_LRGs_tot - c[77] * beta_eca_Gs_aGTP)
+    ydot[54] = 0.001 * (c[76] * beta_eca_Rb2Gi + c[75] * beta_eca_LRb2Gi - c[78] * beta_eca_Gi_aGTP)
+    ydot[2] = 0.001 * (c[74] * Rb1Gs_np + c[73] * LRb1Gs_np - c[77] * beta_cyt_Gs_aGTP)
+    ydot[3] = 0.001 * (c[74] * beta_cav_RGs_tot + c[73] * beta_cav_LRGs_tot - c[79] * beta_cav_Gs_bg * beta_cav_Gs_aGDP)
+    ydot[50] = 0.001 * (c[76] * beta_cav_Rb2Gi + c[75] * beta_cav_LRb2Gi - c[80] * beta_cav_Gi_bg * beta_cav_Gi_aGDP)
+    ydot[4] = 0.001 * (c[74] * beta_eca_RGs_tot + c[73] * beta_eca_LRGs_tot - c[79] * beta_eca_Gs_bg * beta_eca_Gs_aGDP)
+    ydot[55] = 0.001 * (c[76] * beta_eca_Rb2Gi + c[75] * beta_eca_LRb2Gi - c[80] * beta_eca_Gi_bg * beta_eca_Gi_aGDP)
+    ydot[5] = 0.001 * (c[74] * Rb1Gs_np + c[73] * LRb1Gs_np - c[79] * beta_cyt_Gs_bg * beta_cyt_Gs_aGDP)
+    ydot[6] = 0.001 * (c[77] * beta_cav_Gs_aGTP - c[79] * beta_cav_Gs_bg * beta_cav_Gs_aGDP)
+    ydot[51] = 0.001 * (c[78] * beta_cav_Gi_aGTP - c[80] * beta_cav_Gi_bg * beta_cav_Gi_aGDP)
+    ydot[7] = 0.001 * (c[77] * beta_eca_Gs_aGTP - c[79] * beta_eca_Gs_bg * beta_eca_Gs_aGDP)
+    ydot[56] = 0.001 * (c[78] * beta_eca_Gi_aGTP - c[80] * beta_eca_Gi_bg * beta_eca_Gi_aGDP)
+    ydot[8] = 0.001 * (c[77] * beta_cyt_Gs_aGTP - c[79] * beta_cyt_Gs_bg * beta_cyt_Gs_aGDP)
+    pka_cav_RCf = c[11] - pka_cav_ARC - pka_cav_A2RC - pka_cav_A2R
+    ydot[18] = 0.001 * (c[18] * pka_cav_RCf * cAMP_cav - c[21] * pka_cav_ARC - c[19] * pka_cav_ARC * cAMP_cav + c[22] * pka_cav_A2RC)
+    ydot[19] = 0.001 * (c[19] * pka_cav_ARC * cAMP_cav - (c[22] + c[20]) * pka_cav_A2RC + c[23] * pka_cav_A2R * pka_cav_C)
+    ydot[20] = 0.001 * (c[20] * pka_cav_A2RC - c[23] * pka_cav_A2R * pka_cav_C)
+    ydot[21] = 0.001 * (c[20] * pka_cav_A2RC - c[23] * pka_cav_A2R * pka_cav_C + c[17] * pka_cav_PKIC - c[16] * (c[13] - pka_cav_PKIC) * pka_cav_C)
+    ydot[22] = 0.001 * (c[16] * (c[13] - pka_cav_PKIC) * pka_cav_C - c[17] * pka_cav_PKIC)
+    pka_eca_RCf = c[10] - pka_eca_ARC - pka_eca_A2RC - pka_eca_A2R
+    ydot[23] = 0.001 * (c[18] * pka_eca_RCf * cAMP_eca - c[24] * pka_eca_ARC - c[19] * pka_eca_ARC * cAMP_eca + c[25] * pka_eca_A2RC)
+    ydot[24] = 0.001 * (c[19] * pka_eca_ARC * cAMP_eca - (c[25] + c[20]) * pka_eca_A2RC + c[26] * pka_eca_A2R * pka_eca_C)
+    ydot[25] = 0.001 * (c[20] * pka_eca_A2RC - c[26] * pka_eca_A2R * pka_eca_C)
+    ydot[26] = 0.001 * (c[20] * pka_eca_A2RC - c[26] * pka_eca_A2R * pka_eca_C + c[17] * pka_eca_PKIC - c[16] * (c[14] - pka_eca_PKIC) * pka_eca_C)
+    ydot[27] = 0.001 * (c[16] * (c[14] - pka_eca_PKIC) * pka_eca_C - c[17] * pka_eca_PKIC)
+    pka_cyt_RCf = c[12] - pka_cyt_ARC - pka_cyt_A2RC - pka_cyt_A2R
+    ydot[28] = 0.001 * (c[18] * pka_cyt_RCf * cAMP_cyt - c[27] * pka_cyt_ARC - c[19] * pka_cyt_ARC * cAMP_cyt + c[28] * pka_cyt_A2RC)
+    ydot[29] = 0.001 * (c[19] * pka_cyt_ARC * cAMP_cyt - (c[28] + c[20]) * pka_cyt_A2RC + c[29] * pka_cyt_A2R * pka_cyt_C)
+    ydot[30] = 0.001 * (c[20] * pka_cyt_A2RC - c[29] * pka_cyt_A2R * pka_cyt_C)
+    ydot[31] = 0.001 * (c[20] * pka_cyt_A2RC - c[29] * pka_cyt_A2R * pka_cyt_C + c[17] * pka_cyt_PKIC - c[16] * (c[15] - pka_cyt_PKIC) * pka_cyt_C)
+    ydot[32] = 0.001 * (c[16] * (c[15] - pka_cyt_PKIC) * pka_cyt_C - c[17] * pka_cyt_PKIC)
+    pka_cav_dcAMP = -c[18] * pka_cav_RCf * cAMP_cav + c[21] * pka_cav_ARC - c[19] * pka_cav_ARC * cAMP_cav + c[22] * pka_cav_A2RC
+    pka_eca_dcAMP = -c[18] * pka_eca_RCf * cAMP_eca + c[24] * pka_eca_ARC - c[19] * pka_eca_ARC * cAMP_eca + c[25] * pka_eca_A2RC
+    pka_cyt_dcAMP = -c[18] * pka_cyt_RCf * cAMP_cyt + c[27] * pka_cyt_ARC - c[19] * pka_cyt_ARC * cAMP_cyt + c[28] * pka_cyt_A2RC
+    dcAMP_PDE2_cyt = c[51] * c[40] / (1.0 + c[43] / cAMP_cyt)
+    dcAMP_PDE2_eca = c[50] * c[40] / (1.0 + c[43] / cAMP_eca)
+    dcAMP_PDE2_cav = c[49] * c[40] / (1.0 + c[43] / cAMP_cav)
+    dcAMP_PDE3_cav = (c[52] + (c[46] - 1.0) * PDE3_P_cav) * c[41] / (1.0 + c[44] / cAMP_cav)
+    dcAMP_PDE4_cyt = (c[56] + (c[46] - 1.0) * PDE4_P_cyt) * c[42] / (1.0 + c[45] / cAMP_cyt)
+    dcAMP_PDE4_eca = (c[55] + (c[46] - 1.0) * PDE4_P_eca) * c[42] / (1.0 + c[45] / cAMP_eca)
+    dcAMP_PDE4_cav = (c[54] + (c[46] - 1.0) * PDE4_P_cav) * c[42] / (1.0 + c[45] / cAMP_cav)
+    dcAMP_PDE3_cyt = (c[53] + (c[46] - 1.0) * PDE3_P_cyt) * c[41] / (1.0 + c[44] / cAMP_cyt)
+    camp_cAMP_cyt_pde = dcAMP_PDE2_cyt + dcAMP_PDE3_cyt + dcAMP_PDE4_cyt
+    camp_cAMP_cyt_j1 = c[8] * (cAMP_cav - cAMP_cyt) / c[3]
+    camp_cAMP_cyt_j2 = c[9] * (cAMP_eca - cAMP_cyt) / c[3]
+    camp_cAMP_eca_pde = dcAMP_PDE2_eca + dcAMP_PDE4_eca
+    camp_cAMP_eca_j2 = c[9] * (cAMP_eca - cAMP_cyt) / c[2]
+    camp_cAMP_eca_j1 = c[7] * (cAMP_cav - cAMP_eca) / c[2]
+    camp_cAMP_cav_pde = dcAMP_PDE2_cav + dcAMP_PDE3_cav + dcAMP_PDE4_cav
+    camp_cAMP_cav_j2 = c[8] * (cAMP_cav - cAMP_cyt) / c[1]
+    camp_cAMP_cav_j1 = c[7] * (cAMP_cav - cAMP_eca) / c[1]
+    ac_kAC47_cyt_gsa = beta_cyt_Gs_aGTP ** c[106]
+    kAC47_cyt = c[115] * (c[113] + ac_kAC47_cyt_gsa / (c[109] + ac_kAC47_cyt_gsa))
+    ac_kAC56_cav_gsa = beta_cav_Gs_aGTP ** c[107]
+    gsi = beta_cav_Gs_aGTP ** c[108]
+    kAC56_cav = c[116] * (c[114] + ac_kAC56_cav_gsa / (c[110] + ac_kAC56_cav_gsa)) * (1.0 - (1.0 - c[117] * gsi / (c[112] + gsi)) * beta_cav_Gi_bg / (c[111] + beta_cav_Gi_bg))
+    ac_kAC47_eca_gsa = beta_eca_Gs_aGTP ** c[106]
+    kAC47_eca = c[115] * (c[113] + ac_kAC47_eca_gsa / (c[109] + ac_kAC47_eca_gsa))
+    ac_kAC56_cyt_gsa = beta_cyt_Gs_aGTP ** c[107]
+    kAC56_cyt = c[116] * (c[114] + ac_kAC56_cyt_gsa / (c[110] + ac_kAC56_cyt_gsa))
+    dcAMP_AC47_cyt = kAC47_cyt * c[118] * c[120]
+    dcAMP_AC56_cyt = kAC56_cyt * c[122] * c[120]
+    dcAMP_AC56_cav = kAC56_cav * c[119] * c[120]
+    dcAMP_AC47_eca = kAC47_eca * c[121] * c[120]
+    ydot[9] = 0.001 * (pka_cav_dcAMP + dcAMP_AC56_cav - camp_cAMP_cav_pde - camp_cAMP_cav_j1 - camp_cAMP_cav_j2)
+    ydot[10] = 0.001 * (pka_eca_dcAMP + dcAMP_AC47_eca - camp_cAMP_eca_pde + camp_cAMP_eca_j1 - camp_cAMP_eca_j2)
+    ydot[11] = 0.001 * (pka_cyt_dcAMP + dcAMP_AC47_cyt + dcAMP_AC56_cyt - camp_cAMP_cyt_pde + camp_cAMP_cyt_j1 + camp_cAMP_cyt_j2)
+    ydot[33] = 0.001 * (c[47] * pka_cav_C * (c[52] - PDE3_P_cav) - c[48] * PDE3_P_cav)
+    ydot[34] = 0.001 * (c[47] * pka_cyt_C * (c[53] - PDE3_P_cyt) - c[48] * PDE3_P_cyt)
+    ydot[35] = 0.001 * (c[47] * pka_cav_C * (c[54] - PDE4_P_cav) - c[48] * PDE4_P_cav)
+    ydot[36] = 0.001 * (c[47] * pka_eca_C * (c[55] - PDE4_P_eca) - c[48] * PDE4_P_eca)
+    ydot[37] = 0.001 * (c[47] * pka_cyt_C * (c[56] - PDE4_P_cyt) - c[48] * PDE4_P_cyt)
+    pp1_PP1f_cyt_sum = c[37] - c[36] + inhib1_p
+    PP1f_cyt = 0.5 * (np.sqrt(pp1_PP1f_cyt_sum ** 2.0 + 4.0 * c[37] * c[36]) - pp1_PP1f_cyt_sum)
+    di = c[38] - inhib1_p
+    ydot[38] = 0.001 * (c[30] * pka_cyt_C * di / (c[32] + di) - c[31] * c[39] * inhib1_p / (c[33] + inhib1_p))
+    ydot[41] = 0.001 * (c[131] * pka_cyt_C * (1.0 - iup_f_plb) / (c[133] + 1.0 - iup_f_plb) - c[132] * PP1f_cyt * iup_f_plb / (c[134] + iup_f_plb))
+    ydot[42] = 0.001 * (c[146] * pka_cyt_C * (1.0 - f_tni) / (c[148] + 1.0 - f_tni) - c[147] * c[39] * f_tni / (c[149] + f_tni))
+    ydot[43] = 0.001 * (c[129] * pka_cav_C * (1.0 - ina_f_ina) / (c[127] + 1.0 - ina_f_ina) - c[130] * c[35] * ina_f_ina / (c[128] + ina_f_ina))
+    ydot[44] = 0.001 * (c[123] * pka_cav_C * (1.0 - f_inak) / (c[125] + 1.0 - f_inak) - c[124] * c[35] * f_inak / (c[126] + f_inak))
+    ydot[46] = 0.001 * (c[135] * pka_eca_C * (1.0 - f_ikur) / (c[137] + 1.0 - f_ikur) - c[136] * c[34] * f_ikur / (c[138] + f_ikur))
+    iks_sig_IKsp_dif = c[145] - IKsp
+    ydot[40] = 0.001 * (c[139] * pka_eca_C * iks_sig_IKsp_dif / (c[141] + iks_sig_IKsp_dif) - c[140] * c[34] * IKsp / (c[142] + IKsp))
+    akap_sig_RyRp_dif = c[161] - RyRp
+    ydot[45] = 0.001 * (c[151] * pka_cav_C * akap_sig_RyRp_dif / (c[153] + akap_sig_RyRp_dif) - c[152] * c[35] * RyRp / (c[154] + RyRp))
+    akap_sig_ICaLp_dif = c[163] - ICaLp
+    ydot[39] = 0.001 * (c[156] * pka_cav_C * akap_sig_ICaLp_dif / (c[158] + akap_sig_ICaLp_dif) - c[157] * c[35] * ICaLp / (c[159] + ICaLp))
+    return ydot
+
+
+def get_effective_fraction(y: np.ndarray, c: np.ndarray, output: np.ndarray, original_output=False) -> np.ndarray:
+    """
+    Element-wise get_effective_fraction on (57, N) states, (167,) or
+    (167, N) constants and an (8, N) or (7, N) output.
+    """
+    icalp = y[39]
+    fp_ical = (icalp + c[162]) / c[155]
+    fp_ical = np.maximum(0.0001, fp_ical)
+    fp_ical = np.minimum(0.9999, fp_ical)
+    ical_f_hat_val = (fp_ical - c[165]) / (0.9273 - c[165])
+    ical_f_hat = np.minimum(1, np.maximum(ical_f_hat_val, 0))
+    iksp = y[40]
+    fp_iks = (iksp + c[144]) / c[143]
+    fp_iks = np.maximum(0.0001, fp_iks)
+    fp_iks = np.minimum(0.9999, fp_iks)
+    iks_f_hat_val = (fp_iks - c[166]) / (0.785 - c[166])
+    iks_f_hat = np.minimum(1, np.maximum(iks_f_hat_val, 0))
+    iup_f_plb = y[41]
+    iup_f_pka_val = (iup_f_plb - 0.6662) / (0.9945 - 0.6662)
+    iup_f_pka = np.minimum(1, np.maximum(iup_f_pka_val, 0))
+    f_tni = y[42]
+    calcium_fhat_val = (f_tni - 0.67352) / (0.99918 - 0.67352)
+    calcium_fhat = np.minimum(1, np.maximum(calcium_fhat_val, 0))
+    ina_f_ina = y[43]
+    ina_f_pka_val = (ina_f_ina - 0.23948) / (0.95014 - 0.23948)
+    ina_f_pka = np.minimum(1, np.maximum(ina_f_pka_val, 0))
+    f_inak = y[44]
+    inak_fhat_val = (f_inak - 0.12635) / (0.99801 - 0.12635)
+    inak_fhat = np.minimum(1, np.maximum(inak_fhat_val, 0))
+    ryrp = y[45]
+    fp_ryr = (ryrp + c[160]) / c[150]
+    fp_ryr = np.maximum(0.0001, fp_ryr)
+    fp_ryr = np.minimum(0.9999, fp_ryr)
+    irel_fhat_val = (fp_ryr - c[164]) / (0.9586 - c[164])
+    irel_fhat = np.minimum(1, np.maximum(irel_fhat_val, 0))
+    f_ikur = y[46]
+    ikur_fhat_val = (f_ikur - 0.058938) / (0.39375 - 0.058938)
+    ikur_fhat = np.minimum(1, np.maximum(ikur_fhat_val, 0))
+    fICaLP = ical_f_hat
+    fIKsP = iks_f_hat
+    fPLBP = iup_f_pka
+    fTnIP = calcium_fhat
+    fINaP = ina_f_pka
+    fINaKP = inak_fhat
+    fRyRP = irel_fhat
+    fIKurP = ikur_fhat
+    if original_output:
+        output[0] = fICaLP
+        output[1] = fIKsP
+        output[2] = fPLBP
+        output[3] = fTnIP
+        output[4] = fINaP
+        output[5] = fINaKP
+        output[6] = fRyRP
+        output[7] = fIKurP
+    else:
+        output[0] = fINaP
+        output[1] = fICaLP
+        output[2] = fINaKP
+        output[3] = fIKsP
+        output[4] = fPLBP
+        output[5] = fTnIP
+        output[6] = fTnIP
+    return output
+
+
+def euler_step(y: np.ndarray, c: np.ndarray, dt) -> np.ndarray:
+    """
+    Forward Euler step of the signaling model, in place.
+
+    Args:
+        y (np.ndarray): Signaling state vector, updated in place.
+        c (np.ndarray): A vector of model parameters.
+        dt (float): Time step in ms.
+
+    Returns:
+        tuple: The INTERMEDIATES evaluated at the state before the step.
+    """
+    beta_cav_Gs_aGTP = y[0]
+    beta_eca_Gs_aGTP = y[1]
+    beta_cyt_Gs_aGTP = y[2]
+    beta_cav_Gs_bg = y[3]
+    beta_eca_Gs_bg = y[4]
+    beta_cyt_Gs_bg = y[5]
+    beta_cav_Gs_aGDP = y[6]
+    beta_eca_Gs_aGDP = y[7]
+    beta_cyt_Gs_aGDP = y[8]
+    cAMP_cav = y[9]
+    cAMP_eca = y[10]
+    cAMP_cyt = y[11]
+    beta_cav_Rb1_pka_tot = y[12]
+    beta_eca_Rb1_pka_tot = y[13]
+    beta_cyt_Rb1_pka_tot = y[14]
+    beta_cav_Rb1_grk_tot = y[15]
+    beta_eca_Rb1_grk_tot = y[16]
+    beta_cyt_Rb1_grk_tot = y[17]
+    pka_cav_ARC = y[18]
+    pka_cav_A2RC = y[19]
+    pka_cav_A2R = y[20]
+    pka_cav_C = y[21]
+    pka_cav_PKIC = y[22]
+    pka_eca_ARC = y[23]
+    pka_eca_A2RC = y[24]
+    pka_eca_A2R = y[25]
+    pka_eca_C = y[26]
+    pka_eca_PKIC = y[27]
+    pka_cyt_ARC = y[28]
+    pka_cyt_A2RC = y[29]
+    pka_cyt_A2R = y[30]
+    pka_cyt_C = y[31]
+    pka_cyt_PKIC = y[32]
+    PDE3_P_cav = y[33]
+    PDE3_P_cyt = y[34]
+    PDE4_P_cav = y[35]
+    PDE4_P_eca = y[36]
+    PDE4_P_cyt = y[37]
+    inhib1_p = y[38]
+    ICaLp = y[39]
+    IKsp = y[40]
+    iup_f_plb = y[41]
+    f_tni = y[42]
+    ina_f_ina = y[43]
+    f_inak = y[44]
+    RyRp = y[45]
+    f_ikur = y[46]
+    if iup_f_plb < 0.0:
+        iup_f_plb = 0.0001
+    elif iup_f_plb > 1.0:
+        iup_f_plb = 0.9999
+    if f_tni < 0.0:
+        f_tni = 0.0001
+    elif f_tni > 1.0:
+        f_tni = 0.9999
+    if ina_f_ina < 0.0:
+        ina_f_ina = 0.0001
+    elif ina_f_ina > 1.0:
+        ina_f_ina = 0.9999
+    if f_inak < 0.0:
+        f_inak = 0.0001
+    elif f_inak > 1.0:
+        f_inak = 0.9999
+    if f_ikur < 0.0:
+        f_ikur = 0.0001
+    elif f_ikur > 1.0:
+        f_ikur = 0.9999
+    beta_cav_Rb2_pka_tot = y[47]
+    beta_cav_Rb2_grk_tot = y[48]
+    beta_cav_Gi_aGTP = y[49]
+    beta_cav_Gi_bg = y[50]
+    beta_cav_Gi_aGDP = y[51]
+    beta_eca_Rb2_pka_tot = y[52]
+    beta_eca_Rb2_grk_tot = y[53]
+    beta_eca_Gi_aGTP = y[54]
+    beta_eca_Gi_bg = y[55]
+    beta_eca_Gi_aGDP = y[56]
+    beta_cav_Rb1_np_tot = c[86] - beta_cav_Rb1_pka_tot - beta_cav_Rb1_grk_tot
+    beta_cav_Rb2_np_tot = c[88] - beta_cav_Rb2_pka_tot - beta_cav_Rb2_grk_tot
+    beta_cav_Gi_abg = c[62] * c[58] * c[4] - beta_cav_Gi_aGTP - beta_cav_Gi_aGDP
+    beta_cav_Gs_abg = c[60] * c[57] * c[4] - beta_cav_Gs_aGTP - beta_cav_Gs_aGDP
+    beta_cav_Gs_f_d = beta_cav_Gs_abg * c[92] / c[91]
+    beta_cav_Gs_f_b = (c[93] + c[90]) / c[91] + beta_cav_Rb1_np_tot + beta_cav_Rb2_np_tot - beta_cav_Gs_abg
+    beta_cav_Gs_f_c = (c[90] * (beta_cav_Rb1_np_tot - beta_cav_Gs_abg) + c[93] * (beta_cav_Rb2_np_tot - beta_cav_Gs_abg) + c[92]) / c[91]
+    beta_cav_Gs_f_rr = -beta_cav_Gs_f_d / 27.0 * beta_cav_Gs_f_b ** 3.0 - beta_cav_Gs_f_b * beta_cav_Gs_f_b * beta_cav_Gs_f_c * beta_cav_Gs_f_c / 108.0 + beta_cav_Gs_f_b * beta_cav_Gs_f_c * beta_cav_Gs_f_d / 6.0 + beta_cav_Gs_f_c ** 3.0 / 27.0 + beta_cav_Gs_f_d * beta_cav_Gs_f_d / 4.0
+    beta_cav_Gs_f_yr = (np.sqrt(beta_cav_Gs_f_rr) if beta_cav_Gs_f_rr > 0.0 else 0.0) + beta_cav_Gs_f_d / 2.0 + beta_cav_Gs_f_b * beta_cav_Gs_f_c / 6.0 - beta_cav_Gs_f_b ** 3.0 / 27.0
+    beta_cav_Gs_f_yi = np.sqrt(-beta_cav_Gs_f_rr) if beta_cav_Gs_f_rr < 0.0 else 0.0
+    beta_cav_Gs_f_mag = (beta_cav_Gs_f_yr * beta_cav_Gs_f_yr + beta_cav_Gs_f_yi * beta_cav_Gs_f_yi) ** (1.0 / 6.0)
+    beta_cav_Gs_f_arg = np.arctan(beta_cav_Gs_f_yi / beta_cav_Gs_f_yr) / 3.0 if beta_cav_Gs_f_yr != 0 else 0
+    beta_cav_Gs_f_x = (beta_cav_Gs_f_c / 3.0 - beta_cav_Gs_f_b * beta_cav_Gs_f_b / 9.0) / (beta_cav_Gs_f_mag * beta_cav_Gs_f_mag)
+    beta_cav_Gs_f_r = beta_cav_Gs_f_mag * np.cos(beta_cav_Gs_f_arg) * (1.0 - beta_cav_Gs_f_x) - beta_cav_Gs_f_b / 3.0
+    beta_cav_Gs_f_i = beta_cav_Gs_f_mag * np.sin(beta_cav_Gs_f_arg) * (1.0 + beta_cav_Gs_f_x)
+    beta_cav_Gs_f = np.sqrt(beta_cav_Gs_f_r * beta_cav_Gs_f_r + beta_cav_Gs_f_i * beta_cav_Gs_f_i)
+    beta_cav_Rb1_f = beta_cav_Rb1_np_tot / (1.0 + c[0] / c[64] + beta_cav_Gs_f * (c[66] + c[0]) / (c[65] * c[66]))
+    beta_cav_LRb1 = c[0] * beta_cav_Rb1_f / c[64]
+    beta_cav_LRb1Gs = c[0] * beta_cav_Rb1_f * beta_cav_Gs_f / (c[65] * c[66])
+    beta_cav_Rb2_f = beta_cav_Rb2_np_tot / (1.0 + c[0] / c[71] + beta_cav_Gs_f * (c[68] + c[0]) / (c[70] * c[68]))
+    beta_cav_LRb2 = c[0] * beta_cav_Rb2_f / c[71]
+    beta_cav_Rb2Gs = beta_cav_Rb2_f * beta_cav_Gs_f / c[70]
+    beta_cav_Rb1Gs = beta_cav_Rb1_f * beta_cav_Gs_f / c[65]
+    beta_cav_LRb2Gs = c[0] * beta_cav_Rb2_f * beta_cav_Gs_f / (c[70] * c[68])
+    y[12] += dt * (0.001 * (c[83] * pka_cav_C * beta_cav_Rb1_np_tot - c[84] * beta_cav_Rb1_pka_tot))
+    y[15] += dt * (0.001 * (c[82] * c[85] * (beta_cav_LRb1 + beta_cav_LRb1Gs) - c[81] * beta_cav_Rb1_grk_tot))
+    y[47] += dt * (0.001 * (c[83] * pka_cav_C * beta_cav_Rb2_np_tot - c[84] * beta_cav_Rb2_pka_tot))
+    y[48] += dt * (0.001 * (c[82] * c[85] * (beta_cav_LRb2 + beta_cav_LRb2Gs) - c[81] * beta_cav_Rb2_grk_tot))
+    beta_eca_Gs_abg = c[59] * c[57] * c[5] - beta_eca_Gs_aGTP - beta_eca_Gs_aGDP
+    beta_eca_Rb2_np_tot = c[96] - beta_eca_Rb2_pka_tot - beta_eca_Rb2_grk_tot
+    beta_eca_Rb1_np_tot = c[97] - beta_eca_Rb1_pka_tot - beta_eca_Rb1_grk_tot
+    beta_eca_Gs_f_d = beta_eca_Gs_abg * c[100] / c[101]
+    beta_eca_Gs_f_c = (c[102] * (beta_eca_Rb1_np_tot - beta_eca_Gs_abg) + c[99] * (beta_eca_Rb2_np_tot - beta_eca_Gs_abg) + c[100]) / c[101]
+    beta_eca_Gs_f_b = (c[99] + c[102]) / c[101] + beta_eca_Rb1_np_tot + beta_eca_Rb2_np_tot - beta_eca_Gs_abg
+    beta_eca_Gs_f_rr = -beta_eca_Gs_f_d / 27.0 * beta_eca_Gs_f_b ** 3.0 - beta_eca_Gs_f_b * beta_eca_Gs_f_b * beta_eca_Gs_f_c * beta_eca_Gs_f_c / 108.0 + beta_eca_Gs_f_b * beta_eca_Gs_f_c * beta_eca_Gs_f_d / 6.0 + beta_eca_Gs_f_c ** 3.0 / 27.0 + beta_eca_Gs_f_d * beta_eca_Gs_f_d / 4.0
+    beta_eca_Gs_f_yi = np.sqrt(-beta_eca_Gs_f_rr) if beta_eca_Gs_f_rr < 0.0 else 0.0
+    beta_eca_Gs_f_yr = (np.sqrt(beta_eca_Gs_f_rr) if beta_eca_Gs_f_rr > 0.0 else 0.0) + beta_eca_Gs_f_d / 2.0 + beta_eca_Gs_f_b * beta_eca_Gs_f_c / 6.0 - beta_eca_Gs_f_b ** 3.0 / 27.0
+    beta_eca_Gs_f_mag = (beta_eca_Gs_f_yr * beta_eca_Gs_f_yr + beta_eca_Gs_f_yi * beta_eca_Gs_f_yi) ** (1.0 / 6.0)
+    beta_eca_Gs_f_arg = np.arctan(beta_eca_Gs_f_yi / beta_eca_Gs_f_yr) / 3.0 if beta_eca_Gs_f_yr != 0 else 0
+    beta_eca_Gs_f_x = (beta_eca_Gs_f_c / 3.0 - beta_eca_Gs_f_b * beta_eca_Gs_f_b / 9.0) / (beta_eca_Gs_f_mag * beta_eca_Gs_f_mag)
+    beta_eca_Gs_f_i = beta_eca_Gs_f_mag * np.sin(beta_eca_Gs_f_arg) * (1.0 + beta_eca_Gs_f_x)
+    beta_eca_Gs_f_r = beta_eca_Gs_f_mag * np.cos(beta_eca_Gs_f_arg) * (1.0 - beta_eca_Gs_f_x) - beta_eca_Gs_f_b / 3.0
+    beta_eca_Gs_f = np.sqrt(beta_eca_Gs_f_r * beta_eca_Gs_f_r + beta_eca_Gs_f_i * beta_eca_Gs_f_i)
+    beta_eca_Rb1_f = beta_eca_Rb1_np_tot / (1.0 + c[0] / c[64] + beta_eca_Gs_f * (c[66] + c[0]) / (c[65] * c[66]))
+    beta_eca_Rb2_f = beta_eca_Rb2_np_tot / (1.0 + c[0] / c[71] + beta_eca_Gs_f * (c[68] + c[0]) / (c[70] * c[68]))
+    beta_eca_LRb1 = c[0] * beta_eca_Rb1_f / c[64]
+    beta_eca_LRb2 = c[0] * beta_eca_Rb2_f / c[71]
+    beta_eca_LRb2Gs = c[0] * beta_eca_Rb2_f * beta_eca_Gs_f / (c[70] * c[68])
+    beta_eca_LRb1Gs = c[0] * beta_eca_Rb1_f * beta_eca_Gs_f / (c[65] * c[66])
+    beta_eca_Rb2Gs = beta_eca_Rb2_f * beta_eca_Gs_f / c[70]
+    beta_eca_Rb1Gs = beta_eca_Rb1_f * beta_eca_Gs_f / c[65]
+    beta_eca_RGs_tot = beta_eca_Rb1Gs + c[95] * beta_eca_Rb2Gs
+    beta_eca_LRGs_tot = beta_eca_LRb1Gs + c[95] * beta_eca_LRb2Gs
+    beta_eca_Gi_abg = c[63] * c[58] * c[5] - beta_eca_Gi_aGTP - beta_eca_Gi_aGDP
+    beta_eca_Rb2_pka_f_c = -beta_eca_Rb2_pka_tot * c[69] * c[72]
+    beta_eca_Rb2_pka_f_b = beta_eca_Gi_abg * (c[0] + c[72]) - beta_eca_Rb2_pka_tot * (c[72] + c[0]) + c[69] * c[72] * (1.0 + c[0] / c[67])
+    sqrt_term = beta_eca_Rb2_pka_f_b * beta_eca_Rb2_pka_f_b - 4.0 * c[98] * beta_eca_Rb2_pka_f_c
+    beta_eca_Rb2_pka_f = (-beta_eca_Rb2_pka_f_b + np.sqrt(sqrt_term if sqrt_term > 0 else 0)) / (2.0 * c[98])
+    y[13] += dt * (0.001 * (c[83] * pka_eca_C * beta_eca_Rb1_np_tot - c[84] * beta_eca_Rb1_pka_tot))
+    y[16] += dt * (0.001 * (c[82] * c[94] * (beta_eca_LRb1 + beta_eca_LRb1Gs) - c[81] * beta_eca_Rb1_grk_tot))
+    y[52] += dt * (0.001 * (c[83] * pka_eca_C * beta_eca_Rb2_np_tot - c[84] * beta_eca_Rb2_pka_tot))
+    y[53] += dt * (0.001 * (c[82] * c[94] * (beta_eca_LRb2 + beta_eca_LRb2Gs) - c[81] * beta_eca_Rb2_grk_tot))
+    beta_cyt_Gs_abg = c[61] * c[57] * c[6] - beta_cyt_Gs_aGTP - beta_cyt_Gs_aGDP
+    beta_cyt_Rb1_np_tot = c[103] - beta_cyt_Rb1_pka_tot - beta_cyt_Rb1_grk_tot
+    beta_cyt_Rb1_np_f_b = beta_cyt_Gs_abg * (c[66] + c[0]) - beta_cyt_Rb1_np_tot * (c[66] + c[0]) + c[65] * c[66] * (1.0 + c[0] / c[64])
+    beta_cyt_Rb1_np_f_c = -beta_cyt_Rb1_np_tot * c[66] * c[65]
+    sqrt_term = beta_cyt_Rb1_np_f_b * beta_cyt_Rb1_np_f_b - 4.0 * c[105] * beta_cyt_Rb1_np_f_c
+    Rb1_np_f = (-beta_cyt_Rb1_np_f_b + np.sqrt(sqrt_term if sqrt_term > 0 else 0)) / (2.0 * c[105])
+    beta_cyt_Gs_f = beta_cyt_Gs_abg / (1.0 + Rb1_np_f / c[65] * (1.0 + c[0] / c[66]))
+    LRb1_np = c[0] * Rb1_np_f / c[64]
+    LRb1Gs_np = c[0] * Rb1_np_f * beta_cyt_Gs_f / (c[65] * c[66])
+    Rb1Gs_np = beta_cyt_Gs_f * Rb1_np_f / c[65]
+    y[14] += dt * (0.001 * (c[83] * pka_cyt_C * beta_cyt_Rb1_np_tot - c[84] * beta_cyt_Rb1_pka_tot))
+    y[17] += dt * (0.001 * (c[82] * c[104] * (LRb1_np + LRb1Gs_np) - c[81] * beta_cyt_Rb1_grk_tot))
+    beta_cav_RGs_tot = beta_cav_Rb1Gs + c[87] * beta_cav_Rb2Gs
+    beta_cav_LRGs_tot = beta_cav_LRb1Gs + c[87] * beta_cav_LRb2Gs
+    beta_cav_Rb2_pka_f_c = -beta_cav_Rb2_pka_tot * c[69] * c[72]
+    beta_cav_Rb2_pka_f_b = beta_cav_Gi_abg * (c[0] + c[72]) - beta_cav_Rb2_pka_tot * (c[72] + c[0]) + c[69] * c[72] * (1.0 + c[0] / c[67])
+    sqrt_term = beta_cav_Rb2_pka_f_b * beta_cav_Rb2_pka_f_b - 4.0 * c[89] * beta_cav_Rb2_pka_f_c
+    beta_cav_Rb2_pka_f = (-beta_cav_Rb2_pka_f_b + np.sqrt(sqrt_term if sqrt_term > 0 else 0)) / (2.0 * c[89])
+    beta_cav_Gi_f = beta_cav_Gi_abg / (1.0 + beta_cav_Rb2_pka_f / c[69] * (1.0 + c[0] / c[72]))
+    beta_cav_Rb2Gi = beta_cav_Rb2_pka_f * beta_cav_Gi_f / c[69]
+    beta_cav_LRb2Gi = beta_cav_Rb2Gi * c[0] / c[72]
+    beta_eca_Gi_f = beta_eca_Gi_abg / (1.0 + beta_eca_Rb2_pka_f / c[69] * (1.0 + c[0] / c[72]))
+    beta_eca_Rb2Gi = beta_eca_Rb2_pka_f * beta_eca_Gi_f / c[69]
+    beta_eca_LRb2Gi = c[0] / c[72] * beta_eca_Rb2Gi
+    y[0] += dt * (0.001 * (c[74] * beta_cav_RGs_tot + c[73] * beta_cav_LRGs_tot - c[77] * beta_cav_Gs_aGTP))
+    y[49] += dt * (0.001 * (c[76] * beta_cav_Rb2Gi + c[75] * beta_cav_LRb2Gi - c[78] * beta_cav_Gi_aGTP))
+    y[1] += dt * (0.001 * (c[74] * beta_eca_RGs_tot + c[73] * beta_eca_LRGs_tot - c[77] * beta_eca_Gs_aGTP))
+    y[54] += dt * (0.001 * (c[76] * beta_eca_Rb2Gi + c[75] * beta_eca_LRb2Gi - c[78] * beta_eca_Gi_aGTP))
+    y[2] += dt * (0.001 * (c[74] * Rb1Gs_np + c[73] * LRb1Gs_np - c[77] * beta_cyt_Gs_aGTP))
+    y[3] += dt * (0.001 * (c[74] * beta_cav_RGs_tot + c[73] * beta_cav_LRGs_tot - c[79] * beta_cav_Gs_bg * beta_cav_Gs_aGDP))
+    y[50] += dt * (0.001 * (c[76] * beta_cav_Rb2Gi + c[75] * beta_cav_LRb2Gi - c[80] * beta_cav_Gi_bg * beta_cav_Gi_aGDP))
+    y[4] += dt * (0.001 * (c[74] * beta_eca_RGs_tot + c[73] * beta_eca_LRGs_tot - c[79] * beta_eca_Gs_bg * beta_eca_Gs_aGDP))
+    y[55] += dt * (0.001 * (c[76] * beta_eca_Rb2Gi + c[75] * beta_eca_LRb2Gi - c[80] * beta_eca_Gi_bg * beta_eca_Gi_aGDP))
+    y[5] += dt * (0.001 * (c[74] * Rb1Gs_np + c[73] * LRb1Gs_np - c[79] * beta_cyt_Gs_bg * beta_cyt_Gs_aGDP))
+    y[6] += dt * (0.001 * (c[77] * beta_cav_Gs_aGTP - c[79] * beta_cav_Gs_bg * beta_cav_Gs_aGDP))
+    y[51] += dt * (0.001 * (c[78] * beta_cav_Gi_aGTP - c[80] * beta_cav_Gi_bg * beta_cav_Gi_aGDP))
+    y[7] += dt * (0.001 * (c[77] * beta_eca_Gs_aGTP - c[79] * beta_eca_Gs_bg * beta_eca_Gs_aGDP))
+    y[56] += dt * (0.001 * (c[78] * beta_eca_Gi_aGTP - c[80] * beta_eca_Gi_bg * beta_eca_Gi_aGDP))
+    y[8] += dt * (0.001 * (c[77] * beta_cyt_Gs_aGTP - c[79] * beta_cyt_Gs_bg * beta_cyt_Gs_aGDP))
+    pka_cav_RCf = c[11] - pka_cav_ARC - pka_cav_A2RC - pka_cav_A2R
+    y[18] += dt * (0.001 * (c[18] * pka_cav_RCf * cAMP_cav - c[21] * pka_cav_ARC - c[19] * pka_cav_ARC * cAMP_cav + c[22] * pka_cav_A2RC))
+    y[19] += dt * (0.001 * (c[19] * pka_cav_ARC * cAMP_cav - (c[22] + c[20]) * pka_cav_A2RC + c[23] * pka_cav_A2R * pka_cav_C))
+    y[20] += dt * (0.001 * (c[20] * pka_cav_A2RC - c[23] * pka_cav_A2R * pka_cav_C))
+    y[21] += dt * (0.001 * (c[20] * pka_cav_A2RC - c[23] * pka_cav_A2R * pka_cav_C + c[17] * pka_cav_PKIC - c[16] * (c[13] - pka_cav_PKIC) * pka_cav_C))
+    y[22] += dt * (0.001 * (c[16] * (c[13] - pka_cav_PKIC) * pka_cav_C - c[17] * pka_cav_PKIC))
+    pka_eca_RCf = c[10] - pka_eca_ARC - pka_eca_A2RC - pka_eca_A2R
+    y[23] += dt * (0.001 * (c[18] * pka_eca_RCf * cAMP_eca - c[24] * pka_eca_ARC - c[19] * pka_eca_ARC * cAMP_eca + c[25] * pka_eca_A2RC))
+    y[24] += dt * (0.001 * (c[19] * pka_eca_ARC * cAMP_eca - (c[25] + c[20]) * pka_eca_A2RC + c[26] * pka_eca_A2R * pka_eca_C))
+    y[25] += dt * (0.001 * (c[20] * pka_eca_A2RC - c[26] * pka_eca_A2R * pka_eca_C))
+    y[26] += dt * (0.001 * (c[20] * pka_eca_A2RC - c[26] * pka_eca_A2R * pka_eca_C + c[17] * pka_eca_PKIC - c[16] * (c[14] - pka_eca_PKIC) * pka_eca_C))
+    y[27] += dt * (0.001 * (c[16] * (c[14] - pka_eca_PKIC) * pka_eca_C - c[17] * pka_eca_PKIC))
+    pka_cyt_RCf = c[12] - pka_cyt_ARC - pka_cyt_A2RC - pka_cyt_A2R
+    y[28] += dt * (0.001 * (c[18] * pka_cyt_RCf * cAMP_cyt - c[27] * pka_cyt_ARC - c[19] * pka_cyt_ARC * cAMP_cyt + c[28] * pka_cyt_A2RC))
+    y[29] += dt * (0.001 * (c[19] * pka_cyt_ARC * cAMP_cyt - (c[28] + c[20]) * pka_cyt_A2RC + c[29] * pka_cyt_A2R * pka_cyt_C))
+    y[30] += dt * (0.001 * (c[20] * pka_cyt_A2RC - c[29] * pka_cyt_A2R * pka_cyt_C))
+    y[31] += dt * (0.001 * (c[20] * pka_cyt_A2RC - c[29] * pka_cyt_A2R * pka_cyt_C + c[17] * pka_cyt_PKIC - c[16] * (c[15] - pka_cyt_PKIC) * pka_cyt_C))
+    y[32] += dt * (0.001 * (c[16] * (c[15] - pka_cyt_PKIC) * pka_cyt_C - c[17] * pka_cyt_PKIC))
+    pka_cav_dcAMP = -c[18] * pka_cav_RCf * cAMP_cav + c[21] * pka_cav_ARC - c[19] * pka_cav_ARC * cAMP_cav + c[22] * pka_cav_A2RC
+    pka_eca_dcAMP = -c[18] * pka_eca_RCf * cAMP_eca + c[24] * pka_eca_ARC - c[19] * pka_eca_ARC * cAMP_eca + c[25] * pka_eca_A2RC
+    pka_cyt_dcAMP = -c[18] * pka_cyt_RCf * cAMP_cyt + c[27] * pka_cyt_ARC - c[19] * pka_cyt_ARC * cAMP_cyt + c[28] * pka_cyt_A2RC
+    dcAMP_PDE2_cyt = c[51] * c[40] / (1.0 + c[43] / cAMP_cyt)
+    dcAMP_PDE2_eca = c[50] * c[40] / (1.0 + c[43] / cAMP_eca)
+    dcAMP_PDE2_cav = c[49] * c[40] / (1.0 + c[43] / cAMP_cav)
+    dcAMP_PDE3_cav = (c[52] + (c[46] - 1.0) * PDE3_P_cav) * c[41] / (1.0 + c[44] / cAMP_cav)
+    dcAMP_PDE4_cyt = (c[56] + (c[46] - 1.0) * PDE4_P_cyt) * c[42] / (1.0 + c[45] / cAMP_cyt)
+    dcAMP_PDE4_eca = (c[55] + (c[46] - 1.0) * PDE4_P_eca) * c[42] / (1.0 + c[45] / cAMP_eca)
+    dcAMP_PDE4_cav = (c[54] + (c[46] - 1.0) * PDE4_P_cav) * c[42] / (1.0 + c[45] / cAMP_cav)
+    dcAMP_PDE3_cyt = (c[53] + (c[46] - 1.0) * PDE3_P_cyt) * c[41] / (1.0 + c[44] / cAMP_cyt)
+    camp_cAMP_cyt_pde = dcAMP_PDE2_cyt + dcAMP_PDE3_cyt + dcAMP_PDE4_cyt
+    camp_cAMP_cyt_j1 = c[8] * (cAMP_cav - cAMP_cyt) / c[3]
+    camp_cAMP_cyt_j2 = c[9] * (cAMP_eca - cAMP_cyt) / c[3]
+    camp_cAMP_eca_pde = dcAMP_PDE2_eca + dcAMP_PDE4_eca
+    camp_cAMP_eca_j2 = c[9] * (cAMP_eca - cAMP_cyt) / c[2]
+    camp_cAMP_eca_j1 = c[7] * (cAMP_cav - cAMP_eca) / c[2]
+    camp_cAMP_cav_pde = dcAMP_PDE2_cav + dcAMP_PDE3_cav + dcAMP_PDE4_cav
+    camp_cAMP_cav_j2 = c[8] * (cAMP_cav - cAMP_cyt) / c[1]
+    camp_cAMP_cav_j1 = c[7] * (cAMP_cav - cAMP_eca) / c[1]
+    ac_kAC47_cyt_gsa = beta_cyt_Gs_aGTP ** c[106]
+    kAC47_cyt = c[115] * (c[113] + ac_kAC47_cyt_gsa / (c[109] + ac_kAC47_cyt_gsa))
+    ac_kAC56_cav_gsa = beta_cav_Gs_aGTP ** c[107]
+    gsi = beta_cav_Gs_aGTP ** c[108]
+    kAC56_cav = c[116] * (c[114] + ac_kAC56_cav_gsa / (c[110] + ac_kAC56_cav_gsa)) * (1.0 - (1.0 - c[117] * gsi / (c[112] + gsi)) * beta_cav_Gi_bg / (c[111] + beta_cav_Gi_bg))
+    ac_kAC47_eca_gsa = beta_eca_Gs_aGTP ** c[106]
+    kAC47_eca = c[115] * (c[113] + ac_kAC47_eca_gsa / (c[109] + ac_kAC47_eca_gsa))
+    ac_kAC56_cyt_gsa = beta_cyt_Gs_aGTP ** c[107]
+    kAC56_cyt = c[116] * (c[114] + ac_kAC56_cyt_gsa / (c[110] + ac_kAC56_cyt_gsa))
+    dcAMP_AC47_cyt = kAC47_cyt * c[118] * c[120]
+    dcAMP_AC56_cyt = kAC56_cyt * c[122] * c[120]
+    dcAMP_AC56_cav = kAC56_cav * c[119] * c[120]
+    dcAMP_AC47_eca = kAC47_eca * c[121] * c[120]
+    y[9] += dt * (0.001 * (pka_cav_dcAMP + dcAMP_AC56_cav - camp_cAMP_cav_pde - camp_cAMP_cav_j1 - camp_cAMP_cav_j2))
+    y[10] += dt * (0.001 * (pka_eca_dcAMP + dcAMP_AC47_eca - camp_cAMP_eca_pde + camp_cAMP_eca_j1 - camp_cAMP_eca_j2))
+    y[11] += dt * (0.001 * (pka_cyt_dcAMP + dcAMP_AC47_cyt + dcAMP_AC56_cyt - camp_cAMP_cyt_pde + camp_cAMP_cyt_j1 + camp_cAMP_cyt_j2))
+    y[33] += dt * (0.001 * (c[47] * pka_cav_C * (c[52] - PDE3_P_cav) - c[48] * PDE3_P_cav))
+    y[34] += dt * (0.001 * (c[47] * pka_cyt_C * (c[53] - PDE3_P_cyt) - c[48] * PDE3_P_cyt))
+    y[35] += dt * (0.001 * (c[47] * pka_cav_C * (c[54] - PDE4_P_cav) - c[48] * PDE4_P_cav))
+    y[36] += dt * (0.001 * (c[47] * pka_eca_C * (c[55] - PDE4_P_eca) - c[48] * PDE4_P_eca))
+    y[37] += dt * (0.001 * (c[47] * pka_cyt_C * (c[56] - PDE4_P_cyt) - c[48] * PDE4_P_cyt))
+    pp1_PP1f_cyt_sum = c[37] - c[36] + inhib1_p
+    PP1f_cyt = 0.5 * (np.sqrt(pp1_PP1f_cyt_sum ** 2.0 + 4.0 * c[37] * c[36]) - pp1_PP1f_cyt_sum)
+    di = c[38] - inhib1_p
+    y[38] += dt * (0.001 * (c[30] * pka_cyt_C * di / (c[32] + di) - c[31] * c[39] * inhib1_p / (c[33] + inhib1_p)))
+    y[41] += dt * (0.001 * (c[131] * pka_cyt_C * (1.0 - iup_f_plb) / (c[133] + 1.0 - iup_f_plb) - c[132] * PP1f_cyt * iup_f_plb / (c[134] + iup_f_plb)))
+    y[42] += dt * (0.001 * (c[146] * pka_cyt_C * (1.0 - f_tni) / (c[148] + 1.0 - f_tni) - c[147] * c[39] * f_tni / (c[149] + f_tni)))
+    y[43] += dt * (0.001 * (c[129] * pka_cav_C * (1.0 - ina_f_ina) / (c[127] + 1.0 - ina_f_ina) - c[130] * c[35] * ina_f_ina / (c[128] + ina_f_ina)))
+    y[44] += dt * (0.001 * (c[123] * pka_cav_C * (1.0 - f_inak) / (c[125] + 1.0 - f_inak) - c[124] * c[35] * f_inak / (c[126] + f_inak)))
+    y[46] += dt * (0.001 * (c[135] * pka_eca_C * (1.0 - f_ikur) / (c[137] + 1.0 - f_ikur) - c[136] * c[34] * f_ikur / (c[138] + f_ikur)))
+    iks_sig_IKsp_dif = c[145] - IKsp
+    y[40] += dt * (0.001 * (c[139] * pka_eca_C * iks_sig_IKsp_dif / (c[141] + iks_sig_IKsp_dif) - c[140] * c[34] * IKsp / (c[142] + IKsp)))
+    akap_sig_RyRp_dif = c[161] - RyRp
+    y[45] += dt * (0.001 * (c[151] * pka_cav_C * akap_sig_RyRp_dif / (c[153] + akap_sig_RyRp_dif) - c[152] * c[35] * RyRp / (c[154] + RyRp)))
+    akap_sig_ICaLp_dif = c[163] - ICaLp
+    y[39] += dt * (0.001 * (c[156] * pka_cav_C * akap_sig_ICaLp_dif / (c[158] + akap_sig_ICaLp_dif) - c[157] * c[35] * ICaLp / (c[159] + ICaLp)))
+    return (beta_cav_Gs_f, beta_eca_Gs_f, beta_cyt_Gs_f, beta_cav_Gi_f, beta_eca_Gi_f, PP1f_cyt, pka_cav_C, pka_eca_C, pka_cyt_C)
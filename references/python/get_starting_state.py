@@ -97,8 +97,25 @@ names = (
     "fcaBPf",
 )
 
+# O(1) lookup of a state variable's position in the vectors of get_state
+name_to_index = {name: i for i, name in enumerate(names)}
 
-def get_starting_state_signalling() -> np.ndarray:
+# Keys of the states defined in this module
+BUILTIN_STATES = ("TW_endo", "TW_epi", "TW_mid", "signalling")
+
+# Kinds of initial states and their lengths: EP states in the layout of
+# names and signaling states in the get_pka_signalling layout
+N_SIGNALLING_STATES = 57
+STATE_KINDS = {"ep": len(names), "signalling": N_SIGNALLING_STATES}
+
+# Registry of initial states. Each entry is built (or registered) once and
+# stored as a read-only, C-contiguous float64 array, with its kind.
+_states = {}
+_kinds = {key: "ep" for key in BUILTIN_STATES if key != "signalling"}
+_kinds["signalling"] = "signalling"
+
+
+def _build_starting_state_signalling() -> np.ndarray:
     """
     Returns the common signaling state vector used in multiple models.
     """
@@ -165,7 +182,7 @@ def get_starting_state_signalling() -> np.ndarray:
     )
 
 
-def get_starting_state(model_code: str) -> dict[str, float]:
+def _build_starting_state(model_code: str) -> np.ndarray:
     """
     Returns the initial state vector (X0) for various cardiac cell models.
 
@@ -488,4 +505,178 @@ def get_starting_state(model_code: str) -> dict[str, float]:
     else:
         raise ValueError(f"Model code '{model_code}' is not recognized.")
 
-    return dict(zip(names, x0))
+    return x0
+
+
+def _freeze(state) -> np.ndarray:
+    state = np.array(state, dtype=np.float64, order="C")
+    if state.ndim != 1:
+        raise ValueError("Initial states must be one-dimensional.")
+    state.flags.writeable = False
+    return state
+
+
+def state_kind(key: str) -> str:
+    """
+    Returns the kind ('ep' or 'signalling') of a registered initial state.
+
+    Raises:
+        ValueError: If the key is not registered.
+    """
+    kind = _kinds.get(key)
+    if kind is None:
+        raise ValueError(f"Model code '{key}' is not recognized.")
+    return kind
+
+
+def get_state(key: str, copy: bool = True, kind=None) -> np.ndarray:
+    """
+    Returns a registered initial state.
+
+    Built-in states are constructed on first use only; later calls reuse the
+    stored array.
+
+    Args:
+        key (str): 'TW_endo', 'TW_epi', 'TW_mid', 'signalling' or a key passed
+            to register_state.
+        copy (bool): Return a writable copy (default) or a read-only view of
+            the stored array.
+        kind (str, optional): Required kind, 'ep' or 'signalling'.
+
+    Returns:
+        np.ndarray: The initial state vector.
+
+    Raises:
+        ValueError: If the key is not registered or is of another kind.
+    """
+    if kind is not None and state_kind(key) != kind:
+        raise ValueError(f"Initial state '{key}' is not a {kind} state.")
+    state = _states.get(key)
+    if state is None:
+        if key == "signalling":
+            state = _build_starting_state_signalling()
+        elif key in BUILTIN_STATES:
+            state = _build_starting_state(key)
+        else:
+            raise ValueError(f"Model code '{key}' is not recognized.")
+        state = _freeze(state)
+        _states[key] = state
+    return state.copy() if copy else state
+
+
+def register_state(
+    key: str, state, overwrite: bool = False, kind=None
+) -> np.ndarray:
+    """
+    Registers a user-defined initial state.
+
+    Signaling states, e.g. a steady state at a given isoproterenol dose, and
+    EP states are told apart by their kind, which is checked against the
+    length of the vector.
+
+    Args:
+        key (str): Name of the state.
+        state (array-like): The state vector; it is copied.
+        overwrite (bool): Allow replacing an existing entry.
+        kind (str, optional): 'ep' or 'signalling'. Inferred from the length
+            of the vector if omitted.
+
+    Returns:
+        np.ndarray: Read-only view of the stored state.
+    """
+    if not overwrite and (key in _states or key in BUILTIN_STATES):
+        raise ValueError(f"Initial state '{key}' is already registered.")
+    if key in BUILTIN_STATES:
+        raise ValueError(f"Built-in state '{key}' cannot be replaced.")
+    state = _freeze(state)
+    if kind is None:
+        kind = next((k for k, n in STATE_KINDS.items() if n == len(state)), None)
+        if kind is None:
+            raise ValueError(
+                f"Initial state '{key}' has {len(state)} entries, which matches "
+                "neither an EP nor a signaling state."
+            )
+    elif kind not in STATE_KINDS:
+        raise ValueError(f"State kind '{kind}' is not recognized.")
+    elif len(state) != STATE_KINDS[kind]:
+        raise ValueError(
+            f"A {kind} state has {STATE_KINDS[kind]} entries, not {len(state)}."
+        )
+    _states[key] = state
+    _kinds[key] = kind
+    return _states[key]
+
+
+def registered_states(kind=None) -> tuple:
+    """
+    Returns the keys of all available initial states.
+
+    Args:
+        kind (str, optional): Only keys of this kind, 'ep' or 'signalling'.
+    """
+    keys = tuple(dict.fromkeys(BUILTIN_STATES + tuple(_states)))
+    if kind is None:
+        return keys
+    return tuple(key for key in keys if _kinds[key] == kind)
+
+
+def save_states(path, keys=None):
+    """
+    Saves initial states to an uncompressed .npz file of float64 arrays.
+
+    Args:
+        path (str or os.PathLike): Destination file.
+        keys (iterable of str, optional): States to save. Defaults to all
+            user-registered states.
+    """
+    if keys is None:
+        keys = [key for key in _states if key not in BUILTIN_STATES]
+    np.savez(path, **{key: get_state(key, copy=False) for key in keys})
+
+
+def load_states(path, overwrite: bool = False) -> tuple:
+    """
+    Registers every state stored in a file written by save_states.
+
+    Args:
+        path (str or os.PathLike): Source file.
+        overwrite (bool): Allow replacing existing entries.
+
+    Returns:
+        tuple: The keys of the loaded states.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        for key in data.files:
+            register_state(key, data[key], overwrite=overwrite)
+        return tuple(data.files)
+
+
+def get_starting_state_signalling() -> np.ndarray:
+    """
+    Returns the common signaling state vector used in multiple models.
+    """
+    return get_state("signalling")
+
+
+def get_starting_state(model_code: str) -> dict[str, float]:
+    """
+    Returns the initial state for various cardiac cell models.
+
+    Args:
+        model_code (str): A string identifier for the desired model.
+            Valid options include:
+            - 'TW_endo', 'TW_epi', 'TW_mid'
+
+            - any EP state registered with register_state
+
+    Returns:
+        dict: A mapping from the entries of names to the initial state values
+              for the specified model.
+
+    Raises:
+        ValueError: If the provided model_code is not recognized or is not an
+            EP state.
+    """
+    if _kinds.get(model_code) != "ep":
+        raise ValueError(f"Model code '{model_code}' is not recognized.")
+    return dict(zip(names, get_state(model_code, copy=False)))
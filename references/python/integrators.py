@@ -0,0 +1,321 @@
+import warnings
+
+import numpy as np
+
+# -----------------------------------------------------------------------------
+# Quasi-steady-state (QSSA) elimination of the fast binding reactions
+# -----------------------------------------------------------------------------
+# cAMP binding to the PKA holoenzyme (RC <-> ARC <-> A2RC) and the
+# reassociation of G-protein alpha-GDP with beta-gamma relax on a
+# millisecond time scale, while the rest of the pathway evolves over
+# seconds. In QSSA mode these reactions are assumed to be at equilibrium:
+# the slow pools they conserve are integrated with forward Euler and the
+# fast species are recovered algebraically after every step.
+#
+# cAMP/PKA, per compartment: (cAMP, ARC, A2RC, A2R, RT, kf1, kb1, kf2, kb2)
+# The binding steps conserve S = cAMP + ARC + 2 * A2RC and the holoenzyme
+# pool R = RT - A2R; the slower dissociation A2RC -> A2R + C is integrated.
+QSSA_PKA_POOLS = (
+    (9, 18, 19, 20, 11, 18, 21, 19, 22),  # caveolar
+    (10, 23, 24, 25, 10, 18, 24, 19, 25),  # extracaveolar
+    (11, 28, 29, 30, 12, 18, 27, 19, 28),  # cytoplasm
+)
+
+# G-protein reassociation, per pool: (aGTP, bg, aGDP, k_hydrolysis, k_reassoc)
+# Reassociation conserves D = bg - aGDP; the GTP-bound alpha subunit is slow
+# (hydrolysis rate c[77] / c[78]) and stays an integrated state.
+QSSA_GPROTEIN_POOLS = (
+    (0, 3, 6, 77, 79),  # Gs caveolar
+    (1, 4, 7, 77, 79),  # Gs extracaveolar
+    (2, 5, 8, 77, 79),  # Gs cytoplasm
+    (49, 50, 51, 78, 80),  # Gi caveolar
+    (54, 55, 56, 78, 80),  # Gi extracaveolar
+)
+
+# Largest validated QSSA step in ms. Against forward Euler at dt = 0.5 ms
+# (iso = 1, 200 s) the fractions agree to about 1e-5 up to dt = 10 ms; the
+# error reaches 3e-5 at 15 ms, about 1 at 20 ms and the step fails at 50 ms.
+QSSA_MAX_DT = 10.0
+
+# Largest forward Euler step that stays stable: at iso = 1 over 100 s the
+# fractions agree with dt = 0.5 ms to about 1e-3 at 0.7 ms and are NaN at
+# 0.8 ms.
+EULER_MAX_DT = 0.7
+
+
+def solve_pka_equilibrium(
+    s_tot: float, r_tot: float, k1: float, k2: float, guess: float
+) -> tuple:
+    """
+    Solves the cAMP binding equilibrium of the PKA holoenzyme.
+
+    Finds the free cAMP concentration a in [0, s_tot] such that
+    a + ARC + 2 * A2RC = s_tot with RC + ARC + A2RC = r_tot,
+    ARC = RC * a / k1 and A2RC = ARC * a / k2. The left-hand side is
+    monotonic in a, so a bracketed Newton iteration always converges.
+
+    Args:
+        s_tot (float): cAMP held by the fast pool (free + bound).
+        r_tot (float): Holoenzyme not in the A2R form.
+        k1 (float): Dissociation constant of the first cAMP binding step.
+        k2 (float): Dissociation constant of the second cAMP binding step.
+        guess (float): Initial guess for the free cAMP, e.g. the previous value.
+
+    Returns:
+        tuple: Free cAMP, ARC and A2RC at equilibrium.
+    """
+    if s_tot <= 0.0:
+        return 0.0, 0.0, 0.0
+    lo = 0.0
+    hi = s_tot
+    a = min(max(guess, lo), hi)
+    for _ in range(50):
+        u = a / k1
+        v = u * a / k2
+        den = 1.0 + u + v
+        g = a + r_tot * (u + 2.0 * v) / den - s_tot
+        if g > 0.0:
+            hi = a
+        else:
+            lo = a
+        dnum = 1.0 / k1 + 4.0 * a / (k1 * k2)
+        dden = 1.0 / k1 + 2.0 * a / (k1 * k2)
+        dg = 1.0 + r_tot * (dnum * den - (u + 2.0 * v) * dden) / (den * den)
+        a_new = a - g / dg
+        # Fall back to bisection whenever Newton leaves the bracket
+        if a_new <= lo or a_new >= hi:
+            a_new = 0.5 * (lo + hi)
+        if abs(a_new - a) <= 1e-14 * s_tot:
+            a = a_new
+            break
+        a = a_new
+    rc = r_tot / (1.0 + a / k1 + a * a / (k1 * k2))
+    arc = rc * a / k1
+    a2rc = arc * a / k2
+    return a, arc, a2rc
+
+
+def check_qssa_step(dt, stacklevel: int = 3):
+    """
+    Warns with a RuntimeWarning if a QSSA step exceeds QSSA_MAX_DT.
+
+    Args:
+        dt (float or np.ndarray): Time step, or steps of several cells.
+        stacklevel (int): Passed to warnings.warn.
+    """
+    largest = float(np.max(dt))
+    if largest > QSSA_MAX_DT:
+        warnings.warn(
+            f"QSSA step dt={largest} ms exceeds the validated {QSSA_MAX_DT} ms.",
+            RuntimeWarning,
+            stacklevel=stacklevel,
+        )
+
+
+def make_qssa_step(solve_equilibrium):
+    """
+    The QSSA step, closed over an equilibrium solver.
+
+    The same body serves as the NumPy step, with solve_pka_equilibrium, and
+    as the numba one, closed over its compiled build (see utils_jit.py).
+    The returned function takes (X0, dX, c, dt) like qssa_update but does
+    not check dt.
+    """
+
+    def qssa_step(X0, dX, c, dt):
+        # Conserved pools at the start of the step, and their rate of change
+        n_pka = len(QSSA_PKA_POOLS)
+        s_pool = np.empty(n_pka)
+        for k in range(n_pka):
+            i_a, i_arc, i_a2rc = QSSA_PKA_POOLS[k][0:3]
+            s_pool[k] = X0[i_a] + X0[i_arc] + 2.0 * X0[i_a2rc]
+            s_pool[k] += dt * (dX[i_a] + dX[i_arc] + 2.0 * dX[i_a2rc])
+        n_gp = len(QSSA_GPROTEIN_POOLS)
+        d_pool = np.empty(n_gp)
+        for k in range(n_gp):
+            i_bg = QSSA_GPROTEIN_POOLS[k][1]
+            i_gdp = QSSA_GPROTEIN_POOLS[k][2]
+            d_pool[k] = X0[i_bg] - X0[i_gdp] + dt * (dX[i_bg] - dX[i_gdp])
+
+        # Forward Euler for everything; fast species are overwritten below
+        X0 += dX * dt
+
+        for k in range(n_pka):
+            pool = QSSA_PKA_POOLS[k]
+            i_a, i_arc, i_a2rc, i_a2r, i_rt, i_kf1, i_kb1, i_kf2, i_kb2 = pool
+            a, arc, a2rc = solve_equilibrium(
+                s_pool[k],
+                c[i_rt] - X0[i_a2r],
+                c[i_kb1] / c[i_kf1],
+                c[i_kb2] / c[i_kf2],
+                X0[i_a],
+            )
+            X0[i_a] = a
+            X0[i_arc] = arc
+            X0[i_a2rc] = a2rc
+
+        for k in range(n_gp):
+            i_gtp, i_bg, i_gdp, i_kh, i_kr = QSSA_GPROTEIN_POOLS[k]
+            # kr * (aGDP + D) * aGDP = kh * aGTP, positive root
+            q = max(c[i_kh] * X0[i_gtp] / c[i_kr], 0.0)
+            d = d_pool[k]
+            root = np.sqrt(d * d + 4.0 * q)
+            if d >= 0.0:
+                gdp = 2.0 * q / (d + root) if q > 0.0 else 0.0
+            else:
+                gdp = 0.5 * (root - d)
+            X0[i_gdp] = gdp
+            X0[i_bg] = gdp + d
+
+        return X0
+
+    return qssa_step
+
+
+qssa_step = make_qssa_step(solve_pka_equilibrium)
+
+
+def qssa_update(
+    X0: np.ndarray, dX: np.ndarray, c: np.ndarray, dt: float
+) -> np.ndarray:
+    """
+    Advances the signaling state by one QSSA step, in place.
+
+    The slow states and the conserved pools of the fast reactions are
+    advanced with forward Euler using the full right-hand side dX; the fast
+    species (free cAMP, ARC, A2RC, alpha-GDP and beta-gamma) are then set to
+    their quasi-steady values. Steady states coincide with those of the full
+    model. The step is accurate up to QSSA_MAX_DT (10 ms); larger steps
+    issue a RuntimeWarning, as the slow dynamics are no longer resolved.
+
+    Args:
+        X0 (np.ndarray): Signaling state vector, updated in place.
+        dX (np.ndarray): Derivatives from get_pka_signalling evaluated at X0.
+        c (np.ndarray): A vector of model parameters.
+        dt (float): Time step.
+
+    Returns:
+        np.ndarray: The updated state vector X0.
+    """
+    check_qssa_step(dt)
+    return qssa_step(X0, dX, c, dt)
+
+
+def solve_pka_equilibrium_batch(
+    s_tot: np.ndarray,
+    r_tot: np.ndarray,
+    k1: np.ndarray,
+    k2: np.ndarray,
+    guess: np.ndarray,
+) -> tuple:
+    """
+    Element-wise solve_pka_equilibrium on (N,) arrays.
+
+    Every element takes the same Newton and bisection steps as the scalar
+    version and stops updating once it has converged.
+
+    Returns:
+        tuple: (N,) arrays of free cAMP, ARC and A2RC at equilibrium.
+    """
+    s_tot, r_tot, k1, k2, guess = np.broadcast_arrays(s_tot, r_tot, k1, k2, guess)
+    lo = np.zeros(s_tot.shape)
+    hi = s_tot.copy()
+    a = np.minimum(np.maximum(guess, lo), hi)
+    done = s_tot <= 0.0
+    for _ in range(50):
+        u = a / k1
+        v = u * a / k2
+        den = 1.0 + u + v
+        g = a + r_tot * (u + 2.0 * v) / den - s_tot
+        hi = np.where(g > 0.0, a, hi)
+        lo = np.where(g > 0.0, lo, a)
+        dnum = 1.0 / k1 + 4.0 * a / (k1 * k2)
+        dden = 1.0 / k1 + 2.0 * a / (k1 * k2)
+        dg = 1.0 + r_tot * (dnum * den - (u + 2.0 * v) * dden) / (den * den)
+        a_new = a - g / dg
+        # Fall back to bisection whenever Newton leaves the bracket
+        a_new = np.where((a_new <= lo) | (a_new >= hi), 0.5 * (lo + hi), a_new)
+        converged = np.abs(a_new - a) <= 1e-14 * s_tot
+        a = np.where(done, a, a_new)
+        done |= converged
+        if done.all():
+            break
+    a = np.where(s_tot <= 0.0, 0.0, a)
+    rc = r_tot / (1.0 + a / k1 + a * a / (k1 * k2))
+    arc = rc * a / k1
+    a2rc = arc * a / k2
+    return a, arc, a2rc
+
+
+def qssa_update_batch(
+    X0: np.ndarray, dX: np.ndarray, c: np.ndarray, dt
+) -> np.ndarray:
+    """
+    qssa_update for (N, 57) states, one cell per row, in place.
+
+    Args:
+        X0 (np.ndarray): (N, 57) signaling states, updated in place.
+        dX (np.ndarray): (N, 57) derivatives evaluated at X0.
+        c (np.ndarray): (167,) constants shared by all cells or (N, 167).
+        dt (float or np.ndarray): Time step, shared or one per cell.
+
+    Returns:
+        np.ndarray: The updated states X0.
+    """
+    dt = np.asarray(dt, dtype=np.float64)
+    check_qssa_step(dt)
+    cT = np.asarray(c, dtype=np.float64).T
+    # Conserved pools at the start of the step, and their rate of change
+    s_pool = [
+        X0[:, i_a] + X0[:, i_arc] + 2.0 * X0[:, i_a2rc]
+        + dt * (dX[:, i_a] + dX[:, i_arc] + 2.0 * dX[:, i_a2rc])
+        for i_a, i_arc, i_a2rc in (pool[0:3] for pool in QSSA_PKA_POOLS)
+    ]
+    d_pool = [
+        X0[:, i_bg] - X0[:, i_gdp] + dt * (dX[:, i_bg] - dX[:, i_gdp])
+        for i_bg, i_gdp in (pool[1:3] for pool in QSSA_GPROTEIN_POOLS)
+    ]
+
+    # Forward Euler for everything; fast species are overwritten below
+    X0 += dX * (dt[:, None] if dt.ndim else dt)
+
+    for k, pool in enumerate(QSSA_PKA_POOLS):
+        i_a, i_arc, i_a2rc, i_a2r, i_rt, i_kf1, i_kb1, i_kf2, i_kb2 = pool
+        X0[:, i_a], X0[:, i_arc], X0[:, i_a2rc] = solve_pka_equilibrium_batch(
+            s_pool[k],
+            cT[i_rt] - X0[:, i_a2r],
+            cT[i_kb1] / cT[i_kf1],
+            cT[i_kb2] / cT[i_kf2],
+            X0[:, i_a],
+        )
+
+    for k, pool in enumerate(QSSA_GPROTEIN_POOLS):
+        i_gtp, i_bg, i_gdp, i_kh, i_kr = pool
+        # kr * (aGDP + D) * aGDP = kh * aGTP, positive root
+        q = np.maximum(cT[i_kh] * X0[:, i_gtp] / cT[i_kr], 0.0)
+        d = d_pool[k]
+        root = np.sqrt(d * d + 4.0 * q)
+        positive = q > 0.0
+        small = np.where(positive, 2.0 * q / np.where(positive, d + root, 1.0), 0.0)
+        gdp = np.where(d >= 0.0, small, 0.5 * (root - d))
+        X0[:, i_gdp] = gdp
+        X0[:, i_bg] = gdp + d
+
+    return X0
+
+
+# -----------------------------------------------------------------------------
+# Why there is no exponential (Rush-Larsen) mode
+# -----------------------------------------------------------------------------
+# The substrate (y[39] to y[46]) and PDE (y[33] to y[37]) phosphorylation
+# ODEs have the relaxation form that Rush-Larsen updates exactly, but they do
+# not limit the step. The fastest eigenmodes of the Jacobian (iso = 1, rates
+# -2.4 to -4.0 per ms, i.e. forward Euler fails above 0.5 to 0.9 ms) lie in
+# the cAMP/PKA binding states of QSSA_PKA_POOLS, followed by the G-protein
+# pools of QSSA_GPROTEIN_POOLS. Exponential updates of the phosphorylation
+# states therefore diverged at the same dt >= 1 ms as forward Euler, and
+# combining them with QSSA made it less accurate (2.3e-4 against 1e-5 at
+# 10 ms). An exponential update of the binding states, with rates from the
+# diagonal of the Jacobian, is stable up to about 5 ms but has errors of
+# 1e-3 to 6e-3 at 1 to 5 ms. QSSA removes those modes instead, and is the
+# large-step integrator.
@@ -0,0 +1,150 @@
+"""
+Spatially varying isoproterenol in tissue constants.
+
+Only 12 of the 167 signaling constants depend on the iso concentration
+c[0]: the ligand-binding terms of the caveolar, extracaveolar and cytosolic
+receptor pools (ISO_DEPENDENT). IsoConstantsManager keeps an (N, 167)
+tissue constants matrix in step with a per-node iso field. On every update
+it rewrites those 12 columns, and only for the nodes whose iso has changed.
+The other constants, including any per-node variability, are left alone.
+Optionally, iso is snapped to a set of cached levels, so each level's terms
+are computed once.
+"""
+
+import numpy as np
+
+import getConstantsPKASignalling
+import metrics
+
+# Constants that depend on c[0], in getConstantsPKASignalling
+ISO_DEPENDENT = (0, 89, 90, 91, 92, 93, 98, 99, 100, 101, 102, 105)
+
+# Constants the iso-dependent terms are computed from
+_TERM_INPUTS = (64, 65, 66, 67, 68, 70, 71, 72)
+
+
+def iso_terms(c: np.ndarray, iso) -> np.ndarray:
+    """
+    The ISO_DEPENDENT constants for a given iso concentration.
+
+    Same expressions, in the same order, as get_constants_pka_signalling,
+    so the results are bit-identical.
+
+    Args:
+        c (np.ndarray): (167,) or (167, n) constants supplying the receptor
+            binding constants c[64] to c[72].
+        iso (float or np.ndarray): Iso concentration, scalar or (n,).
+
+    Returns:
+        np.ndarray: (12,) or (12, n) values in ISO_DEPENDENT order.
+    """
+    c = np.asarray(c, dtype=np.float64)
+    c0 = np.asarray(iso, dtype=np.float64) + np.zeros_like(c[0])
+    # beta_cav
+    c89 = (c[72] + c0) * (c[67] + c0) / c[67]
+    c90 = c[70] * c[68] * c[64] * (c[66] + c0) * (c[71] + c0)
+    c91 = c[64] * c[71] * (c[66] + c0) * (c[68] + c0)
+    c92 = c[65] * c[70] * c[66] * c[68] * (c[64] + c0) * (c[71] + c0)
+    c93 = c[65] * c[66] * c[71] * (c[68] + c0) * (c[64] + c0)
+    # beta_eca
+    c98 = (c[72] + c0) * (c[67] + c0) / c[67]
+    c99 = c[65] * c[66] * c[71] * (c[68] + c0) * (c[64] + c0)
+    c100 = c[65] * c[70] * c[66] * c[68] * (c[64] + c0) * (c[71] + c0)
+    c101 = c[64] * c[71] * (c[66] + c0) * (c[68] + c0)
+    c102 = c[70] * c[68] * c[64] * (c[66] + c0) * (c[71] + c0)
+    # beta_cyt
+    c105 = (c[66] + c0) * (c[64] + c0) / c[64]
+    return np.array([c0, c89, c90, c91, c92, c93, c98, c99, c100, c101, c102, c105])
+
+
+class IsoConstantsManager:
+    """
+    Keeps a tissue constants matrix consistent with a per-node iso field.
+
+    Args:
+        constants (np.ndarray): (N, 167) float64 constants, updated in place.
+        levels (array-like, optional): Iso levels to snap to. Each level's
+            terms are computed once and cached. This requires the receptor
+            binding constants to be the same for every node.
+    """
+
+    def __init__(self, constants: np.ndarray, levels=None):
+        self.constants = constants
+        self.columns = np.array(ISO_DEPENDENT, dtype=np.intp)
+        self.levels = None
+        self._level_terms = None
+        if levels is not None:
+            inputs = constants[:, _TERM_INPUTS]
+            if not np.all(inputs == inputs[0]):
+                raise ValueError(
+                    "Quantized iso levels require identical receptor constants "
+                    "in every node."
+                )
+            self.levels = np.sort(np.asarray(levels, dtype=np.float64))
+            self._level_terms = iso_terms(constants[0], self.levels).T
+        self.updates = 0
+        self.rows_updated = 0
+
+    @classmethod
+    def uniform(cls, n: int, iso_conc: float = 0.0, levels=None):
+        """A manager for n nodes sharing get_constants_pka_signalling."""
+        c = getConstantsPKASignalling.get_constants_pka_signalling(iso_conc)
+        if metrics.ENABLED:
+            metrics.count("constant_rebuilds")
+        return cls(np.tile(c, (n, 1)), levels)
+
+    @property
+    def iso(self) -> np.ndarray:
+        """(N,) iso concentration currently in the constants."""
+        return self.constants[:, 0]
+
+    def quantize(self, iso) -> np.ndarray:
+        """Index of the cached level nearest to each iso concentration."""
+        iso = np.asarray(iso, dtype=np.float64)
+        if len(self.levels) == 1:
+            return np.zeros(iso.shape, dtype=np.intp)
+        upper = np.clip(np.searchsorted(self.levels, iso), 1, len(self.levels) - 1)
+        lower = upper - 1
+        nearer_lower = iso - self.levels[lower] <= self.levels[upper] - iso
+        return np.where(nearer_lower, lower, upper)
+
+    def update(self, iso) -> np.ndarray:
+        """
+        Applies a new iso field.
+
+        Args:
+            iso (float or np.ndarray): Iso concentration, scalar or (N,).
+
+        Returns:
+            np.ndarray: Indices of the nodes whose constants were rewritten.
+        """
+        n = self.constants.shape[0]
+        iso = np.broadcast_to(np.asarray(iso, dtype=np.float64), (n,))
+        if self.levels is not None:
+            level = self.quantize(iso)
+            changed = np.flatnonzero(self.levels[level] != self.constants[:, 0])
+            if len(changed):
+                terms = self._level_terms[level[changed]]
+                self.constants[changed[:, None], self.columns] = terms
+        else:
+            changed = np.flatnonzero(iso != self.constants[:, 0])
+            if len(changed):
+                rows = self.constants[changed].T
+                terms = iso_terms(rows, iso[changed])
+                self.constants[changed[:, None], self.columns] = terms.T
+        self.updates += 1
+        self.rows_updated += len(changed)
+        if metrics.ENABLED:
+            metrics.count("iso_constant_rows_updated", len(changed))
+            metrics.count("constant_rebuilds", len(changed))
+        return changed
+
+    def stats(self) -> dict:
+        """Number of updates, rows rewritten and rows per update."""
+        return {
+            "nodes": self.constants.shape[0],
+            "updates": self.updates,
+            "rows_updated": self.rows_updated,
+            "rows_per_update": self.rows_updated / max(self.updates, 1),
+            "levels": None if self.levels is None else len(self.levels),
+        }
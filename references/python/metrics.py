@@ -0,0 +1,296 @@
+"""
+Hot-path counters for the signaling model.
+
+Counts signaling RHS calls, fraction evaluations, rebuilds of the constant
+vector (by sweep.run_point, service.FractionEvaluator, the transmural driver
+and iso_field.IsoConstantsManager) and the simulated time,
+times the update steps, and counts how often the clamp branches of
+get_pka_signalling fire. Recording is off by default; the instrumented call
+sites only test the module-level ENABLED flag.
+
+The hooks sit in the entry points the drivers call: the scalar
+utils.update_fraction_parameters, the batch functions of batched.py and
+utils_jit.py, fused.update_fraction_parameters, ufuncs.get_pka_signalling,
+steady_state.find_steady_state and the compiled stepping loops of threaded,
+transmural, sparse_constants and mixed_precision. The reference functions
+themselves are not instrumented, so calling them, or the single-cell
+utils_jit kernels, directly is not counted.
+
+The scalar Python entry points are called once per step, and a step costs
+only about a hundred microseconds, so they record through begin_update /
+end_update, which add to plain module-level numbers and check the clamp
+branches only on every CLAMP_SAMPLE_EVERY-th call. Their clamp events are
+therefore a sample; all other counters and the timers are exact.
+
+The numba path cannot call back into Python, so compiled loops step with
+utils_jit.update_fraction_parameters_counted, which records into a float64
+array laid out as described by ARRAY_FIELDS; merge_array adds such an array
+to the counters here.
+
+    metrics.enable()
+    ... run ...
+    print(metrics.to_prometheus())
+"""
+
+import json
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+ENABLED = False
+
+# State indices clamped to [0.0001, 0.9999] in get_pka_signalling
+CLAMPED_STATES = (
+    ("iup_f_plb", 41),
+    ("f_tni", 42),
+    ("ina_f_ina", 43),
+    ("f_inak", 44),
+    ("f_ikur", 46),
+)
+
+COUNTERS = ("rhs_calls", "fraction_evaluations", "constant_rebuilds")
+
+# The scalar hot path checks the clamp branches on every n-th call only
+CLAMP_SAMPLE_EVERY = 16
+
+# Layout of the counter arrays filled by the numba path
+ARRAY_FIELDS = (
+    ("rhs_calls", "fraction_evaluations", "simulated_ms")
+    + tuple(f"clamp_low:{name}" for name, _ in CLAMPED_STATES)
+    + tuple(f"clamp_high:{name}" for name, _ in CLAMPED_STATES)
+)
+
+_counts = {}
+_clamps = {}
+_timers = {}
+_simulated_ms = 0.0
+
+# Accumulators of begin_update / end_update, folded in by _flush
+_scalar_calls = 0
+_scalar_rhs_calls = 0
+_scalar_ms = 0.0
+_scalar_seconds = 0.0
+
+
+def enable():
+    """Turns recording on."""
+    global ENABLED
+    ENABLED = True
+
+
+def disable():
+    """Turns recording off; the collected values are kept."""
+    global ENABLED
+    ENABLED = False
+
+
+def reset():
+    """Clears all counters, clamp events and timers."""
+    global _simulated_ms, _scalar_calls, _scalar_rhs_calls, _scalar_ms
+    global _scalar_seconds
+    _counts.clear()
+    _clamps.clear()
+    _timers.clear()
+    _simulated_ms = 0.0
+    _scalar_calls = _scalar_rhs_calls = 0
+    _scalar_ms = _scalar_seconds = 0.0
+
+
+def count(name: str, n: int = 1):
+    """Adds n to a counter."""
+    _counts[name] = _counts.get(name, 0) + n
+
+
+def add_time(name: str, seconds: float):
+    """Adds one timed call of the given duration to a timer."""
+    calls, total = _timers.get(name, (0, 0.0))
+    _timers[name] = (calls + 1, total + seconds)
+
+
+@contextmanager
+def timer(name: str):
+    """Context manager timing a block into a timer, if recording is on."""
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_time(name, time.perf_counter() - start)
+
+
+def record_clamps(y):
+    """
+    Counts the clamp branches get_pka_signalling takes for state y.
+
+    Args:
+        y (np.ndarray): (57,) state or (N, 57) states, one cell per row.
+    """
+    y = np.asarray(y)
+    for name, i in CLAMPED_STATES:
+        low = int(np.count_nonzero(y[..., i] < 0.0))
+        high = int(np.count_nonzero(y[..., i] > 1.0))
+        for kind, n in (("low", low), ("high", high)):
+            if n:
+                _clamps[(name, kind)] = _clamps.get((name, kind), 0) + n
+
+
+def record_update(dt: float, rhs: bool, seconds: float, n_cells: int = 1):
+    """
+    Records one call of update_fraction_parameters or of a batch version.
+
+    Args:
+        dt (float): Time step in ms.
+        rhs (bool): Whether the signaling RHS was evaluated.
+        seconds (float): Wall time of the call.
+        n_cells (int): Number of cells the call advanced.
+    """
+    global _simulated_ms
+    count("fraction_evaluations", n_cells)
+    if rhs:
+        count("rhs_calls", n_cells)
+        _simulated_ms += dt * n_cells
+    add_time("update_fraction_parameters", seconds)
+
+
+def begin_update(y) -> float:
+    """
+    Starts recording one scalar update step (see end_update).
+
+    Args:
+        y (np.ndarray or None): (57,) state the signaling RHS is evaluated
+            at, or None if the step skips the RHS.
+
+    Returns:
+        float: The start time to pass to end_update.
+    """
+    global _scalar_calls
+    _scalar_calls += 1
+    if y is not None and not _scalar_calls % CLAMP_SAMPLE_EVERY:
+        for name, i in CLAMPED_STATES:
+            value = y[i]
+            if value < 0.0:
+                _clamps[(name, "low")] = _clamps.get((name, "low"), 0) + 1
+            elif value > 1.0:
+                _clamps[(name, "high")] = _clamps.get((name, "high"), 0) + 1
+    return time.perf_counter()
+
+
+def end_update(dt: float, rhs: bool, start: float):
+    """
+    Finishes recording a scalar update step started by begin_update.
+
+    Args:
+        dt (float): Time step in ms.
+        rhs (bool): Whether the signaling RHS was evaluated.
+        start (float): The value begin_update returned.
+    """
+    global _scalar_rhs_calls, _scalar_ms, _scalar_seconds
+    _scalar_seconds += time.perf_counter() - start
+    if rhs:
+        _scalar_rhs_calls += 1
+        _scalar_ms += dt
+
+
+def _flush():
+    # Moves the begin_update / end_update accumulators into the counters
+    global _simulated_ms, _scalar_calls, _scalar_rhs_calls, _scalar_ms
+    global _scalar_seconds
+    if _scalar_calls:
+        count("fraction_evaluations", _scalar_calls)
+        count("rhs_calls", _scalar_rhs_calls)
+        _simulated_ms += _scalar_ms
+        calls, total = _timers.get("update_fraction_parameters", (0, 0.0))
+        _timers["update_fraction_parameters"] = (
+            calls + _scalar_calls,
+            total + _scalar_seconds,
+        )
+        _scalar_calls = _scalar_rhs_calls = 0
+        _scalar_ms = _scalar_seconds = 0.0
+
+
+def merge_array(counts):
+    """
+    Adds a counter array filled by the numba path (see ARRAY_FIELDS).
+
+    Args:
+        counts (np.ndarray): Array of len(ARRAY_FIELDS) values; it is not
+            modified.
+    """
+    global _simulated_ms
+    for field, value in zip(ARRAY_FIELDS, counts):
+        value = float(value)
+        if field == "simulated_ms":
+            _simulated_ms += value
+        elif field.startswith("clamp_"):
+            kind, name = field[len("clamp_") :].split(":")
+            if value:
+                _clamps[(name, kind)] = _clamps.get((name, kind), 0) + int(value)
+        else:
+            count(field, int(value))
+
+
+def snapshot() -> dict:
+    """
+    Returns the current values.
+
+    Returns:
+        dict: Counters, their rates per simulated second, clamp events keyed
+            by "variable:low|high", timers (calls, total and mean seconds)
+            and the simulated time in ms.
+    """
+    _flush()
+    counters = {name: _counts.get(name, 0) for name in COUNTERS}
+    counters.update(_counts)
+    seconds = _simulated_ms / 1000.0
+    return {
+        "simulated_ms": _simulated_ms,
+        "counters": counters,
+        "per_simulated_second": {
+            name: (value / seconds if seconds > 0.0 else 0.0)
+            for name, value in counters.items()
+        },
+        "clamp_events": {
+            f"{name}:{kind}": value for (name, kind), value in sorted(_clamps.items())
+        },
+        "timers": {
+            name: {
+                "calls": calls,
+                "total_seconds": total,
+                "mean_seconds": total / calls if calls else 0.0,
+            }
+            for name, (calls, total) in _timers.items()
+        },
+    }
+
+
+def to_json(indent=None) -> str:
+    """The snapshot as a JSON document."""
+    return json.dumps(snapshot(), indent=indent)
+
+
+def to_prometheus(prefix: str = "gbas_") -> str:
+    """The snapshot in the Prometheus text exposition format."""
+    data = snapshot()
+    lines = [
+        f"# TYPE {prefix}simulated_ms counter",
+        f"{prefix}simulated_ms {data['simulated_ms']!r}",
+    ]
+    for name, value in data["counters"].items():
+        lines.append(f"# TYPE {prefix}{name}_total counter")
+        lines.append(f"{prefix}{name}_total {value}")
+    lines.append(f"# TYPE {prefix}clamp_events_total counter")
+    for key, value in data["clamp_events"].items():
+        variable, kind = key.split(":")
+        labels = f'variable="{variable}",bound="{kind}"'
+        lines.append(f"{prefix}clamp_events_total{{{labels}}} {value}")
+    lines.append(f"# TYPE {prefix}timer_seconds summary")
+    for name, timer_data in data["timers"].items():
+        labels = f'timer="{name}"'
+        lines.append(
+            f"{prefix}timer_seconds_sum{{{labels}}} {timer_data['total_seconds']!r}"
+        )
+        lines.append(f"{prefix}timer_seconds_count{{{labels}}} {timer_data['calls']}")
+    return "\n".join(lines) + "\n"
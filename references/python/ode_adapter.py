@@ -0,0 +1,225 @@
+"""
+Compiled RHS and Jacobian adapters for SciPy and C-level ODE solvers.
+
+The RHS and its Jacobian are bound to a fixed constants vector and compiled
+with numba, in two forms:
+
+- bind_rhs / bind_jacobian return compiled ``f(t, y)`` and ``jac(t, y)`` for
+  scipy.integrate.solve_ivp (BDF, LSODA, Radau). odeint calls ``f(y, t)``
+  by default, so pass ``tfirst=True`` to use them there. SciPy's ODE
+  solvers only accept Python callables, so every call still enters Python
+  once. But the whole evaluation then runs in compiled code, and the Jacobian
+  costs one call instead of the 57 RHS callbacks SciPy's own
+  finite differences need.
+- rhs_cfunc / jacobian_cfunc return numba cfuncs with the C signature
+  ``void(double t, const double *y, double *out)``. Their ``.address`` and
+  ``.ctypes`` can be passed to C-level integrators (e.g. SUNDIALS or a
+  hand-written solver loaded with ctypes). No SciPy integrator accepts this
+  signature as a LowLevelCallable. The constants are frozen into the
+  compiled code, so each distinct constants vector is compiled once and the
+  cfunc is reused, and kept alive, for later calls with equal constants.
+"""
+
+import time
+
+import numba
+import numpy as np
+
+import get_starting_state
+import getConstantsPKASignalling
+import getPKASignalling
+import utils_jit
+
+N_STATES = 57
+_C_SIGNATURE = "void(float64, CPointer(float64), CPointer(float64))"
+
+# Compiled cfuncs by (kind, constants bytes); never evicted, since C code
+# may still hold their addresses
+_cfuncs = {}
+
+
+@numba.njit
+def _jacobian(y, c):
+    # Central differences as in steady_state.state_jacobian, compiled
+    n = y.shape[0]
+    J = np.empty((n, n))
+    yp = y.copy()
+    for j in range(n):
+        h = 6e-6 * max(abs(y[j]), 1e-9)
+        yp[j] = y[j] + h
+        fp = utils_jit.get_pka_signalling(yp, c)
+        yp[j] = y[j] - h
+        fm = utils_jit.get_pka_signalling(yp, c)
+        yp[j] = y[j]
+        J[:, j] = (fp - fm) / (2.0 * h)
+    return J
+
+
+def bind_rhs(c: np.ndarray):
+    """
+    f(t, y) of the compiled get_pka_signalling for fixed constants.
+
+    The constants are passed to the compiled function rather than frozen
+    into it, so binding new constants does not trigger a recompilation.
+
+    Args:
+        c (np.ndarray): A vector of model parameters; it is copied.
+
+    Returns:
+        function: f(t, y) -> ydot; use tfirst=True with odeint.
+    """
+    c = np.array(c, dtype=np.float64)
+    rhs = utils_jit.get_pka_signalling
+
+    def fun(t, y):
+        return rhs(y, c)
+
+    return fun
+
+
+def bind_jacobian(c: np.ndarray):
+    """
+    jac(t, y) -> (57, 57) compiled finite-difference Jacobian for fixed constants.
+
+    Like bind_rhs, it takes t first; use tfirst=True with odeint.
+    """
+    c = np.array(c, dtype=np.float64)
+
+    def jac(t, y):
+        return _jacobian(y, c)
+
+    return jac
+
+
+def rhs_cfunc(c: np.ndarray):
+    """
+    C callback void(double t, const double *y, double *ydot) for fixed constants.
+
+    Args:
+        c (np.ndarray): A vector of model parameters; it is copied and frozen
+            into the compiled code.
+
+    Returns:
+        numba CFunc: Exposes ``.address``, ``.ctypes`` and ``.cffi``. Equal
+            constants return the same, already compiled, object.
+    """
+    c = np.array(c, dtype=np.float64)
+    key = ("rhs", c.tobytes())
+    if key not in _cfuncs:
+
+        @numba.cfunc(_C_SIGNATURE)
+        def rhs(t, y_ptr, ydot_ptr):
+            y = numba.carray(y_ptr, N_STATES)
+            ydot = numba.carray(ydot_ptr, N_STATES)
+            ydot[:] = utils_jit.get_pka_signalling(y.copy(), c)
+
+        _cfuncs[key] = rhs
+    return _cfuncs[key]
+
+
+def jacobian_cfunc(c: np.ndarray):
+    """
+    C callback void(double t, const double *y, double *J), J row-major 57x57.
+    """
+    c = np.array(c, dtype=np.float64)
+    key = ("jacobian", c.tobytes())
+    if key not in _cfuncs:
+
+        @numba.cfunc(_C_SIGNATURE)
+        def jacobian(t, y_ptr, J_ptr):
+            y = numba.carray(y_ptr, N_STATES)
+            J = numba.carray(J_ptr, (N_STATES, N_STATES))
+            J[:, :] = _jacobian(y.copy(), c)
+
+        _cfuncs[key] = jacobian
+    return _cfuncs[key]
+
+
+def solve(
+    c: np.ndarray,
+    y0=None,
+    t_span=(0.0, 60000.0),
+    method: str = "BDF",
+    compiled: bool = True,
+    **kwargs,
+):
+    """
+    Integrates the signaling model with scipy.integrate.solve_ivp.
+
+    Args:
+        c (np.ndarray): A vector of model parameters.
+        y0 (np.ndarray, optional): Initial state. Defaults to
+            get_starting_state_signalling().
+        t_span (tuple): Start and end time in ms.
+        method (str): A solve_ivp method, e.g. "BDF", "LSODA" or "Radau".
+        compiled (bool): Use the compiled RHS and Jacobian; otherwise the
+            plain Python RHS and SciPy's finite-difference Jacobian.
+        **kwargs: Passed on to solve_ivp.
+
+    Returns:
+        OdeResult: The solve_ivp result.
+    """
+    from scipy.integrate import solve_ivp
+
+    if y0 is None:
+        y0 = get_starting_state.get_starting_state_signalling()
+    if compiled:
+        kwargs.setdefault("jac", bind_jacobian(c))
+        fun = bind_rhs(c)
+    else:
+
+        def fun(t, y):
+            return getPKASignalling.get_pka_signalling(y, c)
+
+    return solve_ivp(fun, t_span, y0, method=method, **kwargs)
+
+
+def benchmark(
+    iso_conc: float = 1.0,
+    t_end: float = 60000.0,
+    methods=("BDF", "LSODA"),
+    rtol: float = 1e-6,
+    atol: float = 1e-10,
+) -> dict:
+    """
+    Times solve_ivp with the compiled adapter against the Python callback.
+
+    Compilation happens before timing.
+
+    Returns:
+        dict: Per method and variant, wall time, RHS and Jacobian evaluation
+            counts, and the largest difference between the final states.
+    """
+    c = getConstantsPKASignalling.get_constants_pka_signalling(iso_conc)
+    solve(c, t_span=(0.0, 1.0), method=methods[0])  # compile
+    report = {}
+    for method in methods:
+        final = {}
+        for compiled in (False, True):
+            start = time.perf_counter()
+            sol = solve(
+                c,
+                t_span=(0.0, t_end),
+                method=method,
+                compiled=compiled,
+                rtol=rtol,
+                atol=atol,
+            )
+            elapsed = time.perf_counter() - start
+            name = f"{method}_{'compiled' if compiled else 'python'}"
+            report[name] = {
+                "seconds": elapsed,
+                "nfev": int(sol.nfev),
+                "njev": int(sol.njev),
+                "success": bool(sol.success),
+            }
+            final[compiled] = sol.y[:, -1]
+        report[f"{method}_max_state_difference"] = float(
+            np.max(np.abs(final[True] - final[False]))
+        )
+    return report
+
+
+if __name__ == "__main__":
+    for key, value in benchmark().items():
+        print(key, value)
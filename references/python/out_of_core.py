@@ -0,0 +1,241 @@
+"""
+Out-of-core stepping of populations larger than memory.
+
+The population lives in two .npy files: (N, 57) float64 states and
+(N, 167) float64 constants. An optional third file receives the (N, 8)
+fractions. ChunkedExecutor memory-maps the files and streams blocks of
+cells through memory. Each block is copied in, advanced by all requested
+steps with a vectorized update_fraction_parameters, and written back in
+place. Every byte is therefore read and written once per run, not once per
+step, and only one block has to fit into the memory budget at a time.
+In-memory arrays can be passed instead of files.
+
+With deduplicate=True, the cells of a block that share their constants and
+state rows are stepped once (see dedup.DeduplicatedPopulation). Duplicates
+are only found within a block.
+
+Passing a population_stats.PopulationStatistics to ChunkedExecutor.run
+reduces the fractions of every block at every step, so per-step population
+summaries are available without storing trajectories.
+"""
+
+import os
+import time
+
+import numpy as np
+
+import batched
+import dedup
+import get_starting_state
+import population
+import utils
+
+try:
+    import utils_jit
+except ImportError:
+    utils_jit = None
+
+N_STATES = 57
+N_CONSTANTS = 167
+N_FRACTIONS = len(utils.names_signalling)
+
+# Bytes per cell held in memory while a block is stepped: the float64 copies
+# of states, constants and fractions, plus the temporaries of the NumPy
+# batched RHS (about 1.5 kB per cell, measured with tracemalloc)
+_BLOCK_BYTES_PER_CELL = 8 * (N_STATES + N_CONSTANTS + N_FRACTIONS)
+_NUMPY_WORK_BYTES_PER_CELL = 1536
+
+BACKENDS = ("numba", "numpy")
+
+
+def chunk_cells(memory_budget: int, backend: str = "numba") -> int:
+    """
+    Largest number of cells per block that fits into a memory budget.
+
+    Args:
+        memory_budget (int): Bytes available for one block.
+        backend (str): "numba" or "numpy"; the NumPy backend needs room for
+            its array temporaries.
+
+    Returns:
+        int: Cells per block, at least 1.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend '{backend}' is not recognized.")
+    per_cell = _BLOCK_BYTES_PER_CELL
+    if backend == "numpy":
+        per_cell += _NUMPY_WORK_BYTES_PER_CELL
+    return max(1, int(memory_budget) // per_cell)
+
+
+def create_population_files(
+    directory,
+    n: int,
+    iso_conc: float = 0.0,
+    sigma=0.1,
+    block: int = 100000,
+    rng=None,
+) -> tuple:
+    """
+    Writes a population to states.npy and constants.npy, block by block.
+
+    The constants are generated as in population.generate_population (with
+    random sampling, since Latin hypercube strata span the whole
+    population) and every cell starts from get_starting_state_signalling.
+
+    Args:
+        directory (str or os.PathLike): Output directory, created if needed.
+        n (int): Number of cells.
+        iso_conc (float): Isoproterenol concentration.
+        sigma (float or np.ndarray): Log-space spread of the constants.
+        block (int): Cells generated at a time.
+        rng (int or np.random.Generator, optional): Seed or generator.
+
+    Returns:
+        tuple: Paths of the states and constants files.
+    """
+    os.makedirs(directory, exist_ok=True)
+    states_path = os.path.join(directory, "states.npy")
+    constants_path = os.path.join(directory, "constants.npy")
+    rng = np.random.default_rng(rng)
+    y0 = get_starting_state.get_starting_state_signalling()
+
+    states = np.lib.format.open_memmap(
+        states_path, mode="w+", dtype=np.float64, shape=(n, N_STATES)
+    )
+    constants = np.lib.format.open_memmap(
+        constants_path, mode="w+", dtype=np.float64, shape=(n, N_CONSTANTS)
+    )
+    for lo in range(0, n, block):
+        hi = min(n, lo + block)
+        states[lo:hi] = y0
+        constants[lo:hi], _ = population.generate_population(
+            hi - lo, iso_conc, sigma=sigma, method="random", rng=rng, shared=False
+        )
+    states.flush()
+    constants.flush()
+    del states, constants
+    return states_path, constants_path
+
+
+def _open(source, mode):
+    if isinstance(source, np.ndarray):
+        return source
+    return np.load(source, mmap_mode=mode)
+
+
+class ChunkedExecutor:
+    """
+    Steps a memory-mapped population block by block.
+
+    Args:
+        states_path (str, os.PathLike or np.ndarray): (N, 57) float64 .npy
+            file or array, updated in place.
+        constants_path (str, os.PathLike or np.ndarray): (N, 167) float64
+            .npy file or array.
+        fractions_path (str or os.PathLike, optional): (N, 8) .npy file for
+            the fractions after the last step; created if it does not exist.
+        memory_budget (int): Bytes per block, see chunk_cells.
+        chunk (int, optional): Cells per block, overriding memory_budget.
+        backend (str, optional): "numba" or "numpy"; defaults to numba when
+            it is installed.
+        deduplicate (bool): Step the cells of a block with bitwise equal
+            constants and states only once.
+    """
+
+    def __init__(
+        self,
+        states_path,
+        constants_path,
+        fractions_path=None,
+        memory_budget: int = 64 * 2**20,
+        chunk=None,
+        backend=None,
+        deduplicate: bool = False,
+    ):
+        if backend is None:
+            backend = "numba" if utils_jit is not None else "numpy"
+        if backend == "numba" and utils_jit is None:
+            raise ImportError("The numba backend requires numba.")
+        self.backend = backend
+        self.deduplicate = deduplicate
+        self.chunk = chunk or chunk_cells(memory_budget, backend)
+        self.states = _open(states_path, "r+")
+        self.constants = _open(constants_path, "r")
+        if self.states.shape[0] != self.constants.shape[0]:
+            raise ValueError("States and constants differ in their number of cells.")
+        self.fractions = None
+        if fractions_path is not None:
+            shape = (self.states.shape[0], N_FRACTIONS)
+            if os.path.exists(fractions_path):
+                self.fractions = np.load(fractions_path, mmap_mode="r+")
+            else:
+                self.fractions = np.lib.format.open_memmap(
+                    fractions_path, mode="w+", dtype=np.float64, shape=shape
+                )
+
+    def _step_block(self, X, c, dt, n_steps, statistics, first_step):
+        if self.deduplicate:
+            unique = dedup.DeduplicatedPopulation(c, X)
+            fraction = None
+            for k in range(n_steps):
+                fraction = unique.step(dt, jit=self.backend == "numba")
+                if statistics is not None:
+                    statistics.update(first_step + k, fraction)
+            X[:] = unique.states
+            return fraction
+        if self.backend == "numba":
+            step = utils_jit.update_fraction_parameters_batch
+        else:
+            step = batched.update_fraction_parameters
+        fraction = None
+        for k in range(n_steps):
+            fraction = step(True, dt, X, c)
+            if statistics is not None:
+                statistics.update(first_step + k, fraction)
+        return fraction
+
+    def run(
+        self, dt: float, n_steps: int = 1, statistics=None, first_step: int = 0
+    ) -> dict:
+        """
+        Advances every cell by n_steps in place.
+
+        Args:
+            dt (float): Time step in ms.
+            n_steps (int): Steps per cell; all of them are taken while the
+                cell's block is in memory.
+            statistics (population_stats.PopulationStatistics, optional):
+                Receives the fractions of every block after every step.
+            first_step (int): Time point index of the first step in
+                statistics, for continuing over several runs.
+
+        Returns:
+            dict: Number of cells, steps, cells per block, elapsed seconds and
+                throughput in cell-steps per second.
+        """
+        n = self.states.shape[0]
+        start = time.perf_counter()
+        for lo in range(0, n, self.chunk):
+            hi = min(n, lo + self.chunk)
+            X = np.array(self.states[lo:hi])
+            c = np.array(self.constants[lo:hi])
+            fraction = self._step_block(X, c, dt, n_steps, statistics, first_step)
+            self.states[lo:hi] = X
+            if self.fractions is not None and fraction is not None:
+                self.fractions[lo:hi] = fraction
+        self.flush()
+        elapsed = time.perf_counter() - start
+        return {
+            "cells": n,
+            "steps": n_steps,
+            "chunk": self.chunk,
+            "seconds": elapsed,
+            "cell_steps_per_second": n * n_steps / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def flush(self):
+        """Writes pending changes of the memory maps to disk."""
+        for array in (self.states, self.fractions):
+            if isinstance(array, np.memmap):
+                array.flush()
@@ -0,0 +1,216 @@
+"""
+Parity and speed harness for the signaling RHS.
+
+Evaluates get_pka_signalling on a fixed grid of (state, iso dose) cases
+with every available build, times each build and compares it against
+golden derivatives stored on disk. The golden files are raw little-endian
+float64 arrays described by a small text manifest, so they can be read
+without extra dependencies from Julia (test/rhs_evaluation.jl) as well.
+
+    python parity.py --write ../../test/golden
+    python parity.py --check ../../test/golden
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+import batched
+import getConstantsPKASignalling
+import getPKASignalling
+import get_starting_state
+import steady_state
+
+# Isoproterenol doses (uM) of the grid
+DOSES = (0.0, 0.01, 0.1, 1.0)
+# Relative perturbations applied to the starting state for extra cases
+PERTURBATIONS = (0.05, 0.2)
+GOLDEN_PREFIX = "rhs"
+RTOL = 1e-10
+ATOL = 1e-18
+
+
+def case_grid(seed: int = 0) -> tuple:
+    """
+    The fixed grid of evaluation cases.
+
+    For every dose the grid holds the starting state, the steady state at
+    that dose and deterministic random perturbations of the starting state.
+
+    Args:
+        seed (int): Seed of the perturbations.
+
+    Returns:
+        tuple: (N, 57) states and (N, 167) constants, one case per row.
+    """
+    rng = np.random.default_rng(seed)
+    y0 = get_starting_state.get_starting_state_signalling()
+    states, constants = [], []
+    for iso_conc in DOSES:
+        c = getConstantsPKASignalling.get_constants_pka_signalling(iso_conc)
+        y_ss, _ = steady_state.find_steady_state(c, y0)
+        cases = [y0, y_ss]
+        for scale in PERTURBATIONS:
+            cases.append(y0 * np.exp(scale * rng.standard_normal(len(y0))))
+        states.extend(cases)
+        constants.extend([c] * len(cases))
+    return np.array(states), np.array(constants)
+
+
+def builds() -> dict:
+    """
+    The available RHS builds as functions of the (N, 57) and (N, 167) grid.
+
+    The numba builds are skipped when numba is not installed.
+    """
+    rhs = getPKASignalling.get_pka_signalling
+    available = {
+        "python": lambda Y, C: np.array([rhs(y, c) for y, c in zip(Y, C)]),
+        "numpy_batched": batched.get_pka_signalling,
+    }
+    try:
+        import utils_jit
+    except ImportError:
+        return available
+    jit_rhs = utils_jit.get_pka_signalling
+    available["numba"] = lambda Y, C: np.array([jit_rhs(y, c) for y, c in zip(Y, C)])
+    available["numba_batched"] = utils_jit.get_pka_signalling_batch
+
+    import ufuncs
+
+    available["numba_gufunc"] = ufuncs.get_pka_signalling
+    return available
+
+
+def _paths(directory) -> dict:
+    return {
+        key: os.path.join(directory, f"{GOLDEN_PREFIX}_{key}.bin")
+        for key in ("states", "constants", "derivatives")
+    }
+
+
+def write_golden(directory, states=None, constants=None):
+    """
+    Writes golden derivatives of the Python reference RHS.
+
+    Creates rhs_states.bin, rhs_constants.bin, rhs_derivatives.bin and
+    rhs_manifest.txt. The binaries are C-ordered (N, 57), (N, 167) and
+    (N, 57) arrays; read column-major (e.g. in Julia) they are the
+    transposes. The manifest lists N, the number of states and the number
+    of constants.
+
+    Args:
+        directory (str or os.PathLike): Output directory; created if missing.
+        states (np.ndarray, optional): Cases to store; defaults to case_grid.
+        constants (np.ndarray, optional): Constants of each case.
+    """
+    if states is None:
+        states, constants = case_grid()
+    derivatives = builds()["python"](states, constants)
+
+    os.makedirs(directory, exist_ok=True)
+    paths = _paths(directory)
+    for key, array in (
+        ("states", states),
+        ("constants", constants),
+        ("derivatives", derivatives),
+    ):
+        np.ascontiguousarray(array, dtype="<f8").tofile(paths[key])
+    with open(os.path.join(directory, f"{GOLDEN_PREFIX}_manifest.txt"), "w") as f:
+        f.write(f"{states.shape[0]} {states.shape[1]} {constants.shape[1]}\n")
+
+
+def read_golden(directory) -> tuple:
+    """
+    Reads the files written by write_golden.
+
+    Returns:
+        tuple: The states, constants and golden derivatives.
+    """
+    with open(os.path.join(directory, f"{GOLDEN_PREFIX}_manifest.txt")) as f:
+        n_cases, n_states, n_constants = map(int, f.read().split())
+    paths = _paths(directory)
+    states = np.fromfile(paths["states"], dtype="<f8").reshape(n_cases, n_states)
+    constants = np.fromfile(paths["constants"], dtype="<f8").reshape(
+        n_cases, n_constants
+    )
+    derivatives = np.fromfile(paths["derivatives"], dtype="<f8").reshape(
+        n_cases, n_states
+    )
+    return states, constants, derivatives
+
+
+def check_builds(
+    directory, rtol: float = RTOL, atol: float = ATOL, repeats: int = 5
+) -> dict:
+    """
+    Compares every available build against the golden derivatives.
+
+    Args:
+        directory (str or os.PathLike): Directory written by write_golden.
+        rtol (float): Relative tolerance.
+        atol (float): Absolute tolerance.
+        repeats (int): Timed passes over the grid; the median is reported.
+
+    Returns:
+        dict: Per build, whether it passed, the largest relative error over
+            the derivatives whose bound atol + rtol * |ref| is set by rtol,
+            the largest absolute error over those whose bound is set by atol,
+            and the median time per RHS evaluation in microseconds.
+    """
+    states, constants, golden = read_golden(directory)
+    report = {}
+    for name, build in builds().items():
+        derivatives = build(states, constants)  # also triggers compilation
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            build(states, constants)
+            timings.append(time.perf_counter() - start)
+        error = np.abs(derivatives - golden)
+        scale = np.abs(golden)
+        # Report each entry against the tolerance that decides its bound
+        relative = rtol * scale > atol
+        report[name] = {
+            "passed": bool(np.all(error <= atol + rtol * scale)),
+            "max_rel_error": float(
+                np.max(error[relative] / scale[relative], initial=0.0)
+            ),
+            "max_abs_error": float(np.max(error[~relative], initial=0.0)),
+            "us_per_call": 1e6 * float(np.median(timings)) / len(states),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--write", metavar="DIR", help="Write golden files")
+    group.add_argument("--check", metavar="DIR", help="Check builds against DIR")
+    parser.add_argument("--rtol", type=float, default=RTOL)
+    parser.add_argument("--atol", type=float, default=ATOL)
+    args = parser.parse_args()
+
+    if args.write:
+        write_golden(args.write)
+        return
+    report = check_builds(args.check, rtol=args.rtol, atol=args.atol)
+    print(
+        f"relative errors where rtol * |ref| > atol ({args.rtol:.0e}, "
+        f"{args.atol:.0e}), absolute errors elsewhere"
+    )
+    for name, row in report.items():
+        status = "ok" if row["passed"] else "FAIL"
+        print(
+            f"{name:15s} {status:4s} max rel error {row['max_rel_error']:.2e}  "
+            f"max abs error {row['max_abs_error']:.2e}  "
+            f"{row['us_per_call']:9.2f} us/call"
+        )
+    if not all(row["passed"] for row in report.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+from multiprocessing import shared_memory
+from statistics import NormalDist
+
+import numpy as np
+
+import getConstantsPKASignalling
+import iso_field
+
+# Independent parameters of get_constants_pka_signalling, sampled by default:
+# constants set to a literal value that no other constant is computed from,
+# plus the receptor/ligand affinities c[64] to c[72], whose iso-dependent
+# terms are recomputed after sampling. Geometry, compartment concentrations
+# derived from totals and fractions, backward rates derived from equilibrium
+# constants, the AKAP terms and the unit ratios c[85], c[87], c[94], c[95]
+# and c[104] keep their baseline values.
+INDEPENDENT_CONSTANTS = (
+    (30, 31, 32, 33, 39)  # inhibitor 1, PP2A
+    + (40, 41, 42, 43, 44, 45, 46)  # PDE hydrolysis and affinities
+    + (58, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76)  # receptors, G
+    + tuple(range(106, 118))  # adenylyl cyclase
+    + tuple(range(123, 143))  # INaK, INa, PLB, IKur, IKs phosphorylation
+    + (146, 147, 148, 149, 151, 152, 153, 154)  # TnI, RyR phosphorylation
+    + (156, 157, 158, 159)  # ICaL phosphorylation
+)
+
+
+def latin_hypercube(n: int, d: int, rng=None) -> np.ndarray:
+    """
+    Latin hypercube sample of n points in the unit cube [0, 1)^d.
+
+    Each of the d dimensions is split into n equal strata and every stratum
+    receives exactly one point, placed uniformly within it.
+
+    Args:
+        n (int): Number of samples.
+        d (int): Number of dimensions.
+        rng (np.random.Generator, optional): Random number generator.
+
+    Returns:
+        np.ndarray: (n, d) array of samples.
+    """
+    rng = np.random.default_rng(rng)
+    strata = rng.permuted(np.tile(np.arange(n), (d, 1)), axis=1).T
+    return (strata + rng.random((n, d))) / n
+
+
+def sobol(n: int, d: int, rng=None) -> np.ndarray:
+    """
+    Scrambled Sobol sample of n points in the unit cube (requires SciPy).
+
+    Args:
+        n (int): Number of samples, ideally a power of two.
+        d (int): Number of dimensions.
+        rng (int or np.random.Generator, optional): Seed for the scrambling.
+
+    Returns:
+        np.ndarray: (n, d) array of samples.
+    """
+    try:
+        from scipy.stats import qmc
+    except ImportError as e:
+        raise ImportError("Sobol sampling requires scipy.") from e
+    return qmc.Sobol(d=d, scramble=True, seed=rng).random(n)
+
+
+def _normal_ppf(u: np.ndarray) -> np.ndarray:
+    try:
+        from scipy.special import ndtri
+    except ImportError:
+        inv_cdf = NormalDist().inv_cdf
+        flat = [inv_cdf(x) for x in u.ravel()]
+        return np.array(flat).reshape(u.shape)
+    return ndtri(u)
+
+
+def sample_scaling_factors(
+    n: int, d: int, sigma=0.1, method: str = "lhs", rng=None
+) -> np.ndarray:
+    """
+    Samples log-normal scaling factors exp(sigma * z), z ~ N(0, 1).
+
+    Args:
+        n (int): Number of cells.
+        d (int): Number of scaled constants.
+        sigma (float or np.ndarray): Log-space standard deviation, either a
+            scalar or one value per scaled constant.
+        method (str): "lhs" (Latin hypercube), "sobol" or "random".
+        rng (int or np.random.Generator, optional): Seed or generator.
+
+    Returns:
+        np.ndarray: (n, d) array of scaling factors with median 1.
+    """
+    if method == "lhs":
+        u = latin_hypercube(n, d, rng)
+    elif method == "sobol":
+        u = sobol(n, d, rng)
+    elif method == "random":
+        u = np.random.default_rng(rng).random((n, d))
+    else:
+        raise ValueError(f"Sampling method '{method}' is not recognized.")
+    # Keep the inverse CDF finite at the cube boundaries
+    u = np.clip(u, 1e-12, 1.0 - 1e-12)
+    return np.exp(np.asarray(sigma) * _normal_ppf(u))
+
+
+def scale_constants(
+    baseline: np.ndarray, indices: np.ndarray, factors: np.ndarray, out=None
+) -> np.ndarray:
+    """
+    Builds the (N, 167) population constants matrix in one vectorized pass.
+
+    Args:
+        baseline (np.ndarray): Baseline vector from get_constants_pka_signalling.
+        indices (np.ndarray): Indices of the scaled constants.
+        factors (np.ndarray): (N, len(indices)) scaling factors.
+        out (np.ndarray, optional): (N, 167) array to write into, e.g. a
+            shared-memory buffer.
+
+    Returns:
+        np.ndarray: The population constants matrix.
+    """
+    factors = np.asarray(factors, dtype=np.float64)
+    if out is None:
+        out = np.empty((factors.shape[0], len(baseline)))
+    out[:] = baseline
+    out[:, indices] *= factors
+    return out
+
+
+class SharedConstants:
+    """
+    A population constants matrix published through shared memory.
+
+    The owning process creates the block; workers receive only the small
+    picklable ``spec`` tuple and map the same memory with attach_constants,
+    so the matrix is never copied or pickled.
+    """
+
+    def __init__(self, shape: tuple, dtype=np.float64):
+        dtype = np.dtype(dtype)
+        nbytes = max(int(np.prod(shape)) * dtype.itemsize, 1)
+        self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf)
+        self.spec = (self.shm.name, tuple(shape), dtype.str)
+
+    def close(self):
+        """Releases the mapping and removes the shared memory block."""
+        self.array = None
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach_constants(spec: tuple) -> tuple:
+    """
+    Maps a SharedConstants block in a worker process without copying.
+
+    Args:
+        spec (tuple): The ``spec`` attribute of the SharedConstants instance.
+
+    Returns:
+        tuple: The SharedMemory handle, which must be kept alive while the
+            array is used, and a read-only (N, 167) view of the constants.
+    """
+    name, shape, dtype = spec
+    try:
+        # The creating process owns the block; don't let workers unlink it
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+    array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    array.flags.writeable = False
+    return shm, array
+
+
+def generate_population(
+    n: int,
+    iso_conc: float = 0.0,
+    indices=None,
+    sigma=0.1,
+    method: str = "lhs",
+    rng=None,
+    shared: bool = True,
+):
+    """
+    Generates a population of constants by log-normal scaling of the baseline.
+
+    Args:
+        n (int): Number of cells.
+        iso_conc (float): Isoproterenol concentration of the baseline.
+        indices (array-like, optional): Indices of the constants to scale.
+            Defaults to INDEPENDENT_CONSTANTS. The iso-dependent receptor
+            terms (iso_field.ISO_DEPENDENT) not in indices are recomputed
+            from the sampled affinities.
+        sigma (float or np.ndarray): Log-space standard deviation.
+        method (str): "lhs", "sobol" or "random".
+        rng (int or np.random.Generator, optional): Seed or generator.
+        shared (bool): Place the matrix in shared memory.
+
+    Returns:
+        tuple: The population (a SharedConstants instance if shared, otherwise
+            an (N, 167) array) and the (N, len(indices)) scaling factors.
+    """
+    baseline = getConstantsPKASignalling.get_constants_pka_signalling(iso_conc)
+    if indices is None:
+        indices = INDEPENDENT_CONSTANTS
+    indices = np.asarray(indices, dtype=np.intp)
+    factors = sample_scaling_factors(n, len(indices), sigma, method, rng)
+    if shared:
+        population = SharedConstants((n, len(baseline)))
+        out = population.array
+    else:
+        out = population = np.empty((n, len(baseline)))
+    scale_constants(baseline, indices, factors, out=out)
+    derived = np.setdiff1d(iso_field.ISO_DEPENDENT[1:], indices)
+    if len(derived):
+        terms = iso_field.iso_terms(out.T, out[:, 0])
+        rows = np.searchsorted(iso_field.ISO_DEPENDENT, derived)
+        out[:, derived] = terms[rows].T
+    return population, factors
@@ -0,0 +1,198 @@
+"""
+Streaming population statistics of the signaling fractions.
+
+PopulationStatistics reduces the (N, 8) fraction matrix of every time step
+to per-fraction summaries across cells: count, mean and variance (Welford,
+with Chan's merge of blocks) and quantiles (P² estimator of Jain and
+Chlamtac, five markers per quantile). A stepper that processes cells in
+blocks, such as out_of_core.ChunkedExecutor, feeds each block at each step.
+Only the summaries are stored, so memory is O(T) rather than O(N T).
+"""
+
+import csv
+
+import numpy as np
+
+import utils
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+def _p2_block(q, pos, desired, dn, seen, values):
+    # P² update of the (F, Q, 5) markers of one time point with a block of
+    # (n, F) values, seen being the number of earlier observations
+    n_fractions, n_quantiles, _ = q.shape
+    for r in range(values.shape[0]):
+        m = seen + r
+        for f in range(n_fractions):
+            x = values[r, f]
+            for j in range(n_quantiles):
+                qj = q[f, j]
+                if m < 5:
+                    qj[m] = x
+                    if m == 4:
+                        qj.sort()
+                    continue
+                nj = pos[f, j]
+                if x < qj[0]:
+                    qj[0] = x
+                    k = 0
+                elif x >= qj[4]:
+                    qj[4] = x
+                    k = 3
+                else:
+                    k = 0
+                    while x >= qj[k + 1]:
+                        k += 1
+                for i in range(k + 1, 5):
+                    nj[i] += 1.0
+                for i in range(5):
+                    desired[f, j, i] += dn[j, i]
+                for i in range(1, 4):
+                    d = desired[f, j, i] - nj[i]
+                    if (d >= 1.0 and nj[i + 1] - nj[i] > 1.0) or (
+                        d <= -1.0 and nj[i - 1] - nj[i] < -1.0
+                    ):
+                        s = 1 if d > 0.0 else -1
+                        # Piecewise-parabolic prediction, linear as fallback
+                        qp = qj[i] + s / (nj[i + 1] - nj[i - 1]) * (
+                            (nj[i] - nj[i - 1] + s)
+                            * (qj[i + 1] - qj[i])
+                            / (nj[i + 1] - nj[i])
+                            + (nj[i + 1] - nj[i] - s)
+                            * (qj[i] - qj[i - 1])
+                            / (nj[i] - nj[i - 1])
+                        )
+                        if not qj[i - 1] < qp < qj[i + 1]:
+                            qp = qj[i] + s * (qj[i + s] - qj[i]) / (nj[i + s] - nj[i])
+                        qj[i] = qp
+                        nj[i] += s
+
+
+if numba is not None:
+    _p2_block = numba.njit(_p2_block)
+
+
+class PopulationStatistics:
+    """
+    Per-time-point moments and quantiles of the fractions across cells.
+
+    Args:
+        n_times (int): Number of time points (steps) to summarise.
+        quantiles (iterable of float): Quantile levels in (0, 1).
+        names (iterable of str): Column names of the fraction matrix.
+    """
+
+    def __init__(
+        self,
+        n_times: int,
+        quantiles=(0.05, 0.5, 0.95),
+        names=utils.names_signalling,
+    ):
+        self.names = list(names)
+        self.quantiles = np.asarray(quantiles, dtype=np.float64)
+        shape = (n_times, len(self.names))
+        self.count = np.zeros(n_times, dtype=np.int64)
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+
+        p = self.quantiles[:, None]
+        marker_shape = shape + (len(self.quantiles), 5)
+        self._q = np.zeros(marker_shape)
+        self._pos = np.broadcast_to(np.arange(5.0), marker_shape).copy()
+        initial = np.hstack([0.0 * p, 2.0 * p, 4.0 * p, 2.0 + 2.0 * p, 4.0 + 0.0 * p])
+        self._desired = np.broadcast_to(initial, marker_shape).copy()
+        self._dn = np.hstack([0.0 * p, p / 2.0, p, (1.0 + p) / 2.0, 1.0 + 0.0 * p])
+
+    @property
+    def n_times(self) -> int:
+        return self.count.shape[0]
+
+    def update(self, t: int, values: np.ndarray):
+        """
+        Adds a block of cells at time point t.
+
+        Args:
+            t (int): Time point index.
+            values (np.ndarray): (n, F) fractions of n cells.
+        """
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        n_block = values.shape[0]
+        if n_block == 0:
+            return
+        n_seen = int(self.count[t])
+        block_mean = values.mean(axis=0)
+        block_m2 = ((values - block_mean) ** 2).sum(axis=0)
+        n_total = n_seen + n_block
+        delta = block_mean - self.mean[t]
+        self.mean[t] += delta * (n_block / n_total)
+        self.m2[t] += block_m2 + delta**2 * (n_seen * n_block / n_total)
+        _p2_block(self._q[t], self._pos[t], self._desired[t], self._dn, n_seen, values)
+        self.count[t] = n_total
+
+    def variance(self, ddof: int = 1) -> np.ndarray:
+        """(T, F) variance across cells; NaN where count <= ddof."""
+        n = (self.count - ddof).astype(np.float64)[:, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(n > 0, self.m2 / n, np.nan)
+
+    def quantile(self, level: float) -> np.ndarray:
+        """
+        (T, F) estimate of one of the tracked quantiles.
+
+        Time points with fewer than five cells use the exact quantile.
+        """
+        matches = np.flatnonzero(np.isclose(self.quantiles, level))
+        if len(matches) == 0:
+            raise ValueError(f"Quantile '{level}' is not recognized.")
+        j = matches[0]
+        out = self._q[:, :, j, 2].copy()
+        for t in np.flatnonzero(self.count < 5):
+            n = self.count[t]
+            out[t] = np.quantile(self._q[t, :, j, :n], level, axis=1) if n else np.nan
+        return out
+
+    def summary(self) -> dict:
+        """
+        The summary time series.
+
+        Returns:
+            dict: "count" (T,), "mean", "std" and one "q<level>" entry per
+                quantile, each (T, F).
+        """
+        out = {
+            "count": self.count.copy(),
+            "mean": self.mean.copy(),
+            "std": np.sqrt(self.variance()),
+        }
+        for level in self.quantiles:
+            out[f"q{level:g}"] = self.quantile(level)
+        return out
+
+    def to_csv(self, path, times=None):
+        """
+        Writes one row per time point and one column per fraction statistic.
+
+        Args:
+            path (str or os.PathLike): Destination file.
+            times (np.ndarray, optional): Time of every point; defaults to
+                the time point index.
+        """
+        summary = self.summary()
+        if times is None:
+            times = np.arange(self.n_times)
+        keys = [key for key in summary if key != "count"]
+        header = ["time", "count"] + [
+            f"{name}_{key}" for key in keys for name in self.names
+        ]
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for t in range(self.n_times):
+                row = [times[t], summary["count"][t]]
+                for key in keys:
+                    row.extend(summary[key][t].tolist())
+                writer.writerow(row)
@@ -0,0 +1,505 @@
+"""
+Local fraction service.
+
+Serves the names_signalling fractions of utils.update_fraction_parameters
+for (iso_conc, time) queries over HTTP, on a TCP port or a Unix socket,
+so that several EP tools can share one copy of the signaling model. It
+only uses the standard library and never leaves the machine.
+
+    POST /fractions  {"queries": [{"iso_conc": 1.0, "time": 60000.0},
+                                  {"iso_conc": 0.1, "time": null}]}
+    GET  /stats
+
+A query with time null (or omitted) returns the steady-state fractions.
+Negative or non-finite iso_conc or time values are rejected with 400.
+
+Run with ``python service.py --port 8765`` or ``--unix /tmp/gbas.sock``.
+"""
+
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import http.client
+import json
+import socket
+import threading
+import time
+
+import numpy as np
+
+import getConstantsPKASignalling
+import get_starting_state
+import metrics
+import steady_state
+import utils
+import warm_start
+
+try:
+    import utils_jit
+except ImportError:
+    utils_jit = None
+
+
+# Cell type label of the service's warm-start entries; the signaling
+# constants do not depend on the EP cell type
+WARM_START_LABEL = "signalling"
+
+
+def _percentiles(values) -> dict:
+    if not values:
+        return {"p50": 0.0, "p90": 0.0, "p99": 0.0}
+    p50, p90, p99 = np.percentile(np.asarray(values), (50, 90, 99))
+    return {"p50": float(p50), "p90": float(p90), "p99": float(p99)}
+
+
+def _update_rows(
+    runSignalingPathway: bool, dt, X0, const_signaling, integrator="euler"
+) -> np.ndarray:
+    # The scalar reference row by row; without numba it beats the NumPy
+    # batch build for the few doses of a batch
+    dt = np.broadcast_to(dt, (len(X0),))
+    return np.array(
+        [
+            utils.update_fraction_parameters(runSignalingPathway, h, x, c, integrator)
+            for h, x, c in zip(dt, X0, const_signaling)
+        ]
+    )
+
+
+def _check_query(iso_conc: float, time=None):
+    # Raises ValueError unless iso_conc and time are finite and non-negative
+    for name, value in (("iso_conc", iso_conc), ("time", time)):
+        if value is not None and not (np.isfinite(value) and value >= 0.0):
+            raise ValueError(
+                f"Query {name} {value!r} is not a finite, non-negative number."
+            )
+
+
+class FractionEvaluator:
+    """
+    Evaluates batches of (iso_conc, time) queries.
+
+    Queries are grouped by iso_conc so that every group is served by one
+    constants build and one forward integration up to the latest requested
+    time, sampling the earlier times on the way. The groups of a batch are
+    stacked into one (G, 167) constants matrix and advanced together by the
+    utils_jit batch kernel, each with its own step so that it lands on its
+    own requested times. Without numba the rows are stepped one by one with
+    the scalar reference instead. The end of each integration is kept,
+    and a later query for the same dose continues from it instead of
+    starting again from get_starting_state_signalling. Steady states are
+    solved directly with steady_state.find_steady_state, starting from the
+    closest steady state already solved. If $GBAS_WARM_START_DIR names a
+    warm_start.WarmStartCache, steady states are solved from and stored in
+    it, and new integrations start from its best state for the dose instead
+    of get_starting_state_signalling.
+
+    Calls to evaluate are serialized by a lock, since they share the cached
+    integration cursors. evaluate_each keeps a failure confined to the queries
+    of its dose group; failed results are not cached.
+
+    Args:
+        dt (float): Time step in ms.
+        integrator (str): Integrator passed to update_fraction_parameters.
+        cache_size (int): Maximum number of cached query results.
+    """
+
+    def __init__(self, dt: float = 10.0, integrator: str = "qssa", cache_size=4096):
+        self.dt = dt
+        self.integrator = integrator
+        self.cache_size = cache_size
+        self.results = collections.OrderedDict()
+        self.cache_hits = 0
+        self._constants = {}
+        self._cursors = {}
+        self._steady = {}
+        self._lock = threading.Lock()
+        self.warm_start = warm_start.default_cache()
+
+    def constants(self, iso_conc: float) -> np.ndarray:
+        c = self._constants.get(iso_conc)
+        if c is None:
+            c = getConstantsPKASignalling.get_constants_pka_signalling(iso_conc)
+            if metrics.ENABLED:
+                metrics.count("constant_rebuilds")
+            self._constants[iso_conc] = c
+        return c
+
+    def _steady_state(self, iso_conc: float) -> np.ndarray:
+        y = self._steady.get(iso_conc)
+        if y is None and self.warm_start is not None:
+            y = self.warm_start.equilibrate(WARM_START_LABEL, self.constants(iso_conc))
+            self._steady[iso_conc] = y
+        if y is None:
+            y0 = None
+            if self._steady:
+                nearest = min(self._steady, key=lambda iso: abs(iso - iso_conc))
+                y0 = self._steady[nearest]
+            y, _ = steady_state.find_steady_state(self.constants(iso_conc), y0)
+            self._steady[iso_conc] = y
+        return y
+
+    def _integrate(self, requests: dict) -> dict:
+        # requests maps iso_conc to its sorted times; all doses are advanced
+        # together, a row dropping out once it has reached its last time
+        isos = list(requests)
+        C = np.array([self.constants(iso) for iso in isos])
+        t = np.zeros(len(isos))
+        X = np.empty((len(isos), get_starting_state.N_SIGNALLING_STATES))
+        for g, iso_conc in enumerate(isos):
+            t_g, X_g = self._cursors.get(iso_conc, (0.0, None))
+            if X_g is None or t_g > requests[iso_conc][0]:
+                t_g = 0.0
+                if self.warm_start is not None:
+                    X_g = self.warm_start.starting_state(WARM_START_LABEL, C[g])
+                else:
+                    X_g = get_starting_state.get_starting_state_signalling()
+            t[g] = t_g
+            # Integrate a copy; the cursors are only replaced once finished
+            X[g] = X_g
+        if utils_jit is not None:
+            update = utils_jit.update_fraction_parameters_batch
+        else:
+            update = _update_rows
+        fractions = update(True, 0.0, X, C)
+
+        found = {}
+        position = np.zeros(len(isos), dtype=np.intp)
+        while True:
+            for g, iso_conc in enumerate(isos):
+                times = requests[iso_conc]
+                while position[g] < len(times) and t[g] >= times[position[g]]:
+                    found[(iso_conc, times[position[g]])] = fractions[g].copy()
+                    position[g] += 1
+            rows = np.array(
+                [g for g, iso in enumerate(isos) if position[g] < len(requests[iso])],
+                dtype=np.intp,
+            )
+            if not len(rows):
+                break
+            targets = np.array([requests[isos[g]][position[g]] for g in rows])
+            step = np.minimum(self.dt, targets - t[rows])
+            X_rows = X[rows]
+            fractions[rows] = update(True, step, X_rows, C[rows], self.integrator)
+            X[rows] = X_rows
+            t[rows] += step
+
+        diverged = [iso for g, iso in enumerate(isos) if not np.isfinite(X[g]).all()]
+        if diverged:
+            raise RuntimeError(f"Integration diverged for iso_conc {diverged}.")
+        for g, iso_conc in enumerate(isos):
+            self._cursors[iso_conc] = (t[g], X[g].copy())
+        return found
+
+    def evaluate(self, queries) -> list:
+        """
+        Fractions for a list of (iso_conc, time) queries.
+
+        Args:
+            queries (list of tuple): (iso_conc, time in ms or None) pairs.
+
+        Returns:
+            list of np.ndarray: The names_signalling fractions per query.
+
+        Raises:
+            ValueError: If a query is negative or not finite.
+        """
+        results = self.evaluate_each(queries)
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return results
+
+    def evaluate_each(self, queries) -> list:
+        """
+        Like evaluate, but returns the exceptions instead of raising them.
+
+        An invalid query fails alone, and a failure while solving or
+        integrating a dose fails only the queries for that dose.
+
+        Args:
+            queries (list of tuple): (iso_conc, time in ms or None) pairs.
+
+        Returns:
+            list: Per query, the names_signalling fractions or the exception
+                raised while computing them.
+        """
+        with self._lock:
+            # Results are collected before storing, which may evict them
+            found = {}
+            groups = collections.defaultdict(set)
+            for key in queries:
+                if key in found:
+                    continue
+                if key in self.results:
+                    self.cache_hits += 1
+                    self.results.move_to_end(key)
+                    found[key] = self.results[key]
+                    continue
+                try:
+                    _check_query(*key)
+                except ValueError as e:
+                    found[key] = e
+                    continue
+                groups[key[0]].add(key[1])
+
+            requests = {}
+            for iso_conc, times in groups.items():
+                if None in times:
+                    try:
+                        y = self._steady_state(iso_conc)
+                        found[(iso_conc, None)] = utils.update_fraction_parameters(
+                            True, 0.0, y.copy(), self.constants(iso_conc)
+                        )
+                    except Exception as e:
+                        found[(iso_conc, None)] = e
+                    times.discard(None)
+                if times:
+                    requests[iso_conc] = sorted(times)
+            try:
+                found.update(self._integrate(requests) if requests else {})
+            except Exception:
+                # Retry the doses one at a time to find the failing ones
+                for iso_conc, times in requests.items():
+                    try:
+                        found.update(self._integrate({iso_conc: times}))
+                    except Exception as e:
+                        found.update(((iso_conc, t), e) for t in times)
+
+            for key in dict.fromkeys(queries):
+                if not isinstance(found[key], Exception):
+                    self._store(key, found[key])
+            return [found[key] for key in queries]
+
+    def _store(self, key, fraction):
+        self.results[key] = fraction
+        while len(self.results) > self.cache_size:
+            self.results.popitem(last=False)
+
+
+class FractionService:
+    """
+    Asyncio HTTP front end that coalesces concurrent queries.
+
+    Queries arriving within ``window`` seconds of the first pending one are
+    evaluated as a single batch by a FractionEvaluator in a worker thread,
+    which keeps the event loop free to accept further requests meanwhile.
+    All batches run on the same single worker thread, one after another. A
+    request fails only if one of its own queries does.
+
+    Args:
+        evaluator (FractionEvaluator, optional): Defaults to a new instance.
+        window (float): Batching window in seconds.
+    """
+
+    def __init__(self, evaluator=None, window: float = 0.005):
+        self.evaluator = evaluator or FractionEvaluator()
+        self.window = window
+        self.latencies = collections.deque(maxlen=10000)
+        self.batch_sizes = collections.deque(maxlen=10000)
+        self._pending = []
+        self._flush = None
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+    async def query(self, queries) -> list:
+        """Schedules queries for the next batch and waits for the results."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((queries, future))
+        if self._flush is None:
+            self._flush = asyncio.ensure_future(self._run_batch())
+        return await future
+
+    async def _run_batch(self):
+        await asyncio.sleep(self.window)
+        pending, self._pending, self._flush = self._pending, [], None
+        keys = [key for queries, _ in pending for key in queries]
+        self.batch_sizes.append(len(keys))
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self.evaluator.evaluate_each, keys
+            )
+        except Exception as e:
+            results = [e] * len(keys)
+        i = 0
+        for queries, future in pending:
+            own = results[i : i + len(queries)]
+            i += len(queries)
+            if future.cancelled():
+                continue
+            errors = [r for r in own if isinstance(r, Exception)]
+            if errors:
+                future.set_exception(errors[0])
+            else:
+                future.set_result(own)
+
+    def stats(self) -> dict:
+        """Request latency percentiles in ms and batching statistics."""
+        return {
+            "n_requests": len(self.latencies),
+            "latency_ms": _percentiles(list(self.latencies)),
+            "n_batches": len(self.batch_sizes),
+            "mean_batch_size": float(np.mean(self.batch_sizes))
+            if self.batch_sizes
+            else 0.0,
+            "cache_hits": self.evaluator.cache_hits,
+            "cached_results": len(self.evaluator.results),
+        }
+
+    @staticmethod
+    async def _respond(writer, status: str, payload: dict, close: bool = False):
+        data = json.dumps(payload).encode("utf-8")
+        connection = "Connection: close\r\n" if close else ""
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n{connection}"
+            f"Content-Length: {len(data)}\r\n\r\n".encode("latin-1") + data
+        )
+        await writer.drain()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                    length = int(headers.get("content-length", 0))
+                    if length < 0:
+                        raise ValueError(f"negative Content-Length {length}")
+                except ValueError as e:
+                    # The body cannot be delimited, so the connection is closed
+                    payload = {"error": f"Malformed request: {e}"}
+                    await self._respond(writer, "400 Bad Request", payload, True)
+                    break
+                body = await reader.readexactly(length)
+
+                status, payload = await self._dispatch(method, path, body)
+                await self._respond(writer, status, payload)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> tuple:
+        if method == "GET" and path == "/stats":
+            return "200 OK", self.stats()
+        if method != "POST" or path != "/fractions":
+            return "404 Not Found", {"error": f"No route for {method} {path}."}
+
+        start = time.perf_counter()
+        try:
+            request = json.loads(body or b"{}")
+            items = request.get("queries", [request])
+            queries = [
+                (
+                    float(item["iso_conc"]),
+                    None if item.get("time") is None else float(item["time"]),
+                )
+                for item in items
+            ]
+            for query in queries:
+                _check_query(*query)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            return "400 Bad Request", {"error": f"Malformed query: {e}"}
+        try:
+            results = await self.query(queries)
+        except (
+            RuntimeError,
+            ValueError,
+            KeyError,
+            ArithmeticError,
+            np.linalg.LinAlgError,
+        ) as e:
+            return "500 Internal Server Error", {"error": str(e)}
+        self.latencies.append(1000.0 * (time.perf_counter() - start))
+        return "200 OK", {
+            "names": list(utils.names_signalling),
+            "results": [list(map(float, r)) for r in results],
+        }
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765, unix=None):
+        """Serves until cancelled, on a Unix socket if a path is given."""
+        if unix is not None:
+            server = await asyncio.start_unix_server(self._handle, path=unix)
+        else:
+            server = await asyncio.start_server(self._handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
+
+def query_fractions(
+    queries, host: str = "127.0.0.1", port: int = 8765, unix=None, timeout=None
+) -> np.ndarray:
+    """
+    Client helper: requests fractions from a running service.
+
+    Args:
+        queries (list of tuple): (iso_conc, time in ms or None) pairs.
+        host (str): Service host.
+        port (int): Service port.
+        unix (str, optional): Unix socket path; overrides host and port.
+        timeout (float, optional): Socket timeout in seconds.
+
+    Returns:
+        np.ndarray: (len(queries), 8) array in names_signalling order.
+    """
+    if unix is not None:
+        connection = _UnixHTTPConnection(unix, timeout=timeout)
+    else:
+        connection = http.client.HTTPConnection(host, port, timeout=timeout)
+    body = json.dumps(
+        {"queries": [{"iso_conc": iso, "time": t} for iso, t in queries]}
+    )
+    try:
+        connection.request(
+            "POST", "/fractions", body, {"Content-Type": "application/json"}
+        )
+        response = connection.getresponse()
+        payload = json.loads(response.read())
+    finally:
+        connection.close()
+    if response.status != 200:
+        raise RuntimeError(payload.get("error", response.reason))
+    return np.array(payload["results"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="Serve on this Unix socket path instead")
+    parser.add_argument("--dt", type=float, default=10.0, help="Time step in ms")
+    parser.add_argument("--integrator", default="qssa")
+    parser.add_argument("--window", type=float, default=0.005)
+    args = parser.parse_args()
+
+    service = FractionService(FractionEvaluator(args.dt, args.integrator), args.window)
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Single entry point to the Python reference of the signaling model.
+
+    import signaling
+
+    c = signaling.get_constants_pka_signalling(1.0)
+    y = signaling.get_starting_state_signalling()
+    ydot = signaling.get_pka_signalling(y, c)
+
+Everything is resolved lazily: importing this module imports nothing but
+the standard library, looking up constants or starting states imports only
+those modules, and the compute functions are taken from a backend that is
+chosen on first use. Backends are
+
+    "numpy"          the scalar reference functions
+    "numpy_batched"  the array builds in batched.py
+    "numba"          the compiled builds in utils_jit.py
+
+The backend is picked by set_backend, else by the GBAS_BACKEND environment
+variable, else "numba" if numba is installed and "numpy" otherwise. numba
+is only imported once the numba backend is actually used.
+"""
+
+import importlib
+import importlib.util
+import os
+
+BACKENDS = ("numpy", "numpy_batched", "numba")
+ENV_VAR = "GBAS_BACKEND"
+
+# Attributes served directly by a reference module, without a backend
+_STATIC = {
+    "get_constants_pka_signalling": "getConstantsPKASignalling",
+    "get_starting_state": "get_starting_state",
+    "get_starting_state_signalling": "get_starting_state",
+    "get_state": "get_starting_state",
+    "register_state": "get_starting_state",
+    "names": "get_starting_state",
+    "names_signalling": "utils",
+}
+
+# Attributes that depend on the backend
+BACKEND_FUNCTIONS = (
+    "get_pka_signalling",
+    "get_effective_fraction",
+    "update_fraction_parameters",
+    "get_pka_signalling_batch",
+    "update_fraction_parameters_batch",
+)
+
+_backends = {}
+_default = None
+
+
+class Backend:
+    """
+    The compute functions of one backend.
+
+    get_pka_signalling, get_effective_fraction and update_fraction_parameters
+    take a single cell, like the reference functions. The _batch variants
+    take (N, 57) states, one cell per row, and (N, 167) constants or a
+    (167,) vector shared by all cells.
+    """
+
+    def __init__(self, name: str, **functions):
+        self.name = name
+        for key in BACKEND_FUNCTIONS:
+            setattr(self, key, functions[key])
+
+    def __repr__(self) -> str:
+        return f"Backend('{self.name}')"
+
+
+def _row_loop(function):
+    import numpy as np
+
+    def batch(*args):
+        *head, X, C = args
+        C = np.broadcast_to(C, (len(X), C.shape[-1]))
+        return np.array([function(*head, x, c) for x, c in zip(X, C)])
+
+    return batch
+
+
+def _load(name: str) -> Backend:
+    if name == "numpy":
+        import getEffectiveFraction
+        import getPKASignalling
+        import utils
+
+        return Backend(
+            name,
+            get_pka_signalling=getPKASignalling.get_pka_signalling,
+            get_effective_fraction=getEffectiveFraction.get_effective_fraction,
+            update_fraction_parameters=utils.update_fraction_parameters,
+            get_pka_signalling_batch=_row_loop(getPKASignalling.get_pka_signalling),
+            update_fraction_parameters_batch=_row_loop(
+                utils.update_fraction_parameters
+            ),
+        )
+    if name == "numpy_batched":
+        import batched
+
+        scalar = get_backend("numpy")
+        return Backend(
+            name,
+            get_pka_signalling=scalar.get_pka_signalling,
+            get_effective_fraction=scalar.get_effective_fraction,
+            update_fraction_parameters=scalar.update_fraction_parameters,
+            get_pka_signalling_batch=batched.get_pka_signalling,
+            update_fraction_parameters_batch=batched.update_fraction_parameters,
+        )
+    if name == "numba":
+        import utils_jit
+
+        return Backend(
+            name,
+            get_pka_signalling=utils_jit.get_pka_signalling,
+            get_effective_fraction=utils_jit.get_effective_fraction,
+            update_fraction_parameters=utils_jit.update_fraction_parameters,
+            get_pka_signalling_batch=utils_jit.get_pka_signalling_batch,
+            update_fraction_parameters_batch=utils_jit.update_fraction_parameters_batch,
+        )
+    raise ValueError(f"Backend '{name}' is not recognized.")
+
+
+def default_backend_name() -> str:
+    """Backend used when none is requested explicitly."""
+    if _default is not None:
+        return _default
+    name = os.environ.get(ENV_VAR)
+    if name:
+        return name
+    return "numba" if importlib.util.find_spec("numba") is not None else "numpy"
+
+
+def get_backend(name=None) -> Backend:
+    """
+    Returns a backend, importing it on first use.
+
+    Args:
+        name (str, optional): One of BACKENDS; defaults to
+            default_backend_name().
+
+    Returns:
+        Backend: The backend's compute functions.
+    """
+    if name is None:
+        name = default_backend_name()
+    backend = _backends.get(name)
+    if backend is None:
+        backend = _load(name)
+        _backends[name] = backend
+    return backend
+
+
+def set_backend(name: str) -> Backend:
+    """Makes name the default backend and returns it."""
+    global _default
+    backend = get_backend(name)
+    _default = name
+    return backend
+
+
+def __getattr__(attr: str):
+    if attr in _STATIC:
+        return getattr(importlib.import_module(_STATIC[attr]), attr)
+    if attr in BACKEND_FUNCTIONS:
+        return getattr(get_backend(), attr)
+    raise AttributeError(f"module '{__name__}' has no attribute '{attr}'")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_STATIC) + list(BACKEND_FUNCTIONS))
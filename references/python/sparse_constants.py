@@ -0,0 +1,194 @@
+"""
+Baseline-plus-sparse-delta storage of population constants.
+
+In variability studies each cell usually overrides only a few of the 167
+constants of one get_constants_pka_signalling baseline. SparseConstants
+stores the baseline once and the per-cell overrides in CSR arrays: cell i
+overrides constants indices[indptr[i]:indptr[i + 1]] with the matching
+values. Memory is 8 * 167 + 12 nnz + 8 (N + 1) bytes instead of 8 * 167 N.
+
+step_population advances states directly from this representation: the
+compiled kernel patches a single scratch copy of the baseline for each
+cell and restores it afterwards, so no dense row is stored. row()
+materializes one cell for the scalar reference functions, and materialize()
+a dense block.
+"""
+
+import numpy as np
+
+import batched
+import utils
+
+try:
+    import numba
+
+    import utils_jit
+except ImportError:
+    numba = None
+
+
+class SparseConstants:
+    """
+    A baseline constants vector with per-cell sparse overrides.
+
+    Args:
+        baseline (np.ndarray): (167,) baseline constants.
+        indptr (np.ndarray): (N + 1,) row pointers into indices and values.
+        indices (np.ndarray): Overridden constant indices, sorted per cell.
+        values (np.ndarray): Override values.
+    """
+
+    def __init__(self, baseline, indptr, indices, values):
+        self.baseline = np.array(baseline, dtype=np.float64)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.values = np.asarray(values, dtype=np.float64)
+        if self.indices.shape != self.values.shape:
+            raise ValueError("Indices and values differ in length.")
+        if self.indptr[0] != 0 or self.indptr[-1] != len(self.indices):
+            raise ValueError("Row pointers do not match the overrides.")
+
+    @classmethod
+    def from_dense(cls, matrix: np.ndarray, baseline: np.ndarray):
+        """
+        Stores the entries of an (N, 167) matrix that differ from baseline.
+        """
+        matrix = np.asarray(matrix, dtype=np.float64)
+        baseline = np.asarray(baseline, dtype=np.float64)
+        rows, columns = np.nonzero(matrix != baseline)
+        indptr = np.zeros(matrix.shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=matrix.shape[0]), out=indptr[1:])
+        return cls(baseline, indptr, columns, matrix[rows, columns])
+
+    @classmethod
+    def from_scaling(cls, baseline, indices, factors):
+        """
+        Sparse form of population.scale_constants(baseline, indices, factors).
+
+        Args:
+            baseline (np.ndarray): (167,) baseline constants.
+            indices (np.ndarray): Indices of the scaled constants.
+            factors (np.ndarray): (N, len(indices)) scaling factors.
+        """
+        baseline = np.asarray(baseline, dtype=np.float64)
+        indices = np.asarray(indices, dtype=np.int32)
+        factors = np.asarray(factors, dtype=np.float64)
+        order = np.argsort(indices)
+        n, k = factors.shape
+        indptr = np.arange(n + 1, dtype=np.int64) * k
+        values = baseline[indices[order]] * factors[:, order]
+        return cls(baseline, indptr, np.tile(indices[order], n), values.ravel())
+
+    def __len__(self) -> int:
+        return self.indptr.shape[0] - 1
+
+    @property
+    def shape(self) -> tuple:
+        return (len(self), self.baseline.shape[0])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            a.nbytes for a in (self.baseline, self.indptr, self.indices, self.values)
+        )
+
+    def row(self, i: int, out=None) -> np.ndarray:
+        """
+        Dense constants of cell i, e.g. for getPKASignalling.get_pka_signalling.
+        """
+        if out is None:
+            out = self.baseline.copy()
+        else:
+            out[:] = self.baseline
+        lo, hi = self.indptr[i], self.indptr[i + 1]
+        out[self.indices[lo:hi]] = self.values[lo:hi]
+        return out
+
+    def materialize(self, start: int = 0, stop=None, out=None) -> np.ndarray:
+        """
+        Dense (stop - start, 167) constants of a block of cells.
+        """
+        stop = len(self) if stop is None else stop
+        if out is None:
+            out = np.empty((stop - start, self.baseline.shape[0]))
+        out[:] = self.baseline
+        lo, hi = self.indptr[start], self.indptr[stop]
+        counts = np.diff(self.indptr[start : stop + 1])
+        rows = np.repeat(np.arange(stop - start), counts)
+        out[rows, self.indices[lo:hi]] = self.values[lo:hi]
+        return out
+
+
+if numba is not None:
+
+    @numba.njit(nogil=True)
+    def _step_sparse(
+        baseline, indptr, indices, values, states, fractions, dt, n_steps, counts
+    ):
+        c = baseline.copy()
+        for i in range(states.shape[0]):
+            lo, hi = indptr[i], indptr[i + 1]
+            for k in range(lo, hi):
+                c[indices[k]] = values[k]
+            X = states[i]
+            for _ in range(n_steps):
+                fractions[i] = utils_jit.update_fraction_parameters_counted(
+                    True, dt, X, c, counts
+                )
+            for k in range(lo, hi):
+                c[indices[k]] = baseline[indices[k]]
+
+
+def step_population(
+    constants: SparseConstants,
+    states: np.ndarray,
+    dt: float,
+    n_steps: int = 1,
+    fractions=None,
+    block: int = 4096,
+) -> np.ndarray:
+    """
+    Advances every cell by n_steps of forward Euler in place.
+
+    Args:
+        constants (SparseConstants): Constants of the population.
+        states (np.ndarray): (N, 57) float64 states, updated in place.
+        dt (float): Time step in ms.
+        n_steps (int): Number of steps, at least 1.
+        fractions (np.ndarray, optional): (N, 8) output array.
+        block (int): Cells materialized at a time by the NumPy fallback,
+            used when numba is not installed.
+
+    Returns:
+        np.ndarray: (N, 8) fractions after the last step.
+
+    Raises:
+        ValueError: If n_steps is less than 1, since no step would fill
+            the fractions.
+    """
+    if n_steps < 1:
+        raise ValueError(f"Number of steps must be at least 1, not {n_steps}.")
+    if fractions is None:
+        fractions = np.empty((len(constants), len(utils.names_signalling)))
+    if numba is not None:
+        counts = utils_jit.new_counts()
+        _step_sparse(
+            constants.baseline,
+            constants.indptr,
+            constants.indices,
+            constants.values,
+            states,
+            fractions,
+            dt,
+            n_steps,
+            counts,
+        )
+        utils_jit.merge_counts(counts)
+        return fractions
+    for start in range(0, len(constants), block):
+        stop = min(len(constants), start + block)
+        c = constants.materialize(start, stop)
+        X = states[start:stop]
+        for _ in range(n_steps):
+            fractions[start:stop] = batched.update_fraction_parameters(True, dt, X, c)
+    return fractions
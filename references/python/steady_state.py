@@ -0,0 +1,131 @@
+import numpy as np
+
+import getPKASignalling
+import get_starting_state
+import metrics
+
+# Linear combinations of states conserved exactly by get_pka_signalling.
+# Catalytic PKA:   C + PKIC - A2R, per compartment
+# G-proteins:      bg - aGDP - aGTP, per Gs/Gi pool
+# The Jacobian of the signaling RHS is singular along these directions, so
+# steady states (and their sensitivities) are only defined together with the
+# totals fixed by the initial state.
+CONSERVED_POOLS = (
+    ((21, 1.0), (22, 1.0), (20, -1.0)),
+    ((26, 1.0), (27, 1.0), (25, -1.0)),
+    ((31, 1.0), (32, 1.0), (30, -1.0)),
+    ((3, 1.0), (6, -1.0), (0, -1.0)),
+    ((4, 1.0), (7, -1.0), (1, -1.0)),
+    ((5, 1.0), (8, -1.0), (2, -1.0)),
+    ((50, 1.0), (51, -1.0), (49, -1.0)),
+    ((55, 1.0), (56, -1.0), (54, -1.0)),
+)
+
+
+def conservation_matrix(n_states: int = 57) -> np.ndarray:
+    """
+    Returns the (8, n_states) matrix L of conserved state combinations.
+
+    L @ get_pka_signalling(y, c) is zero for every y and c.
+    """
+    L = np.zeros((len(CONSERVED_POOLS), n_states))
+    for k, pool in enumerate(CONSERVED_POOLS):
+        for i, w in pool:
+            L[k, i] = w
+    return L
+
+
+def state_jacobian(y: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """
+    Central finite-difference Jacobian of get_pka_signalling w.r.t. the state.
+
+    Args:
+        y (np.ndarray): Signaling state vector.
+        c (np.ndarray): A vector of model parameters.
+
+    Returns:
+        np.ndarray: The (57, 57) matrix d ydot / d y.
+    """
+    n = len(y)
+    if metrics.ENABLED:
+        metrics.count("rhs_calls", 2 * n)
+    J = np.empty((n, n))
+    yp = y.copy()
+    for j in range(n):
+        h = 6e-6 * max(abs(y[j]), 1e-9)
+        yp[j] = y[j] + h
+        fp = getPKASignalling.get_pka_signalling(yp, c)
+        yp[j] = y[j] - h
+        fm = getPKASignalling.get_pka_signalling(yp, c)
+        yp[j] = y[j]
+        J[:, j] = (fp - fm) / (2.0 * h)
+    return J
+
+
+def find_steady_state(
+    c: np.ndarray,
+    y0=None,
+    rtol: float = 1e-10,
+    atol: float = 1e-14,
+    max_iter: int = 500,
+    dt0: float = 1.0,
+) -> tuple:
+    """
+    Solves get_pka_signalling(y, c) = 0 by pseudo-transient continuation.
+
+    Each iteration takes a linearised backward Euler step in pseudo time,
+    (I / tau - J) dy = ydot, together with L dy = 0 so that the conserved
+    totals of y0 are kept exactly. tau is adapted to the relative change of
+    the state: it grows geometrically once the transient has died out, which
+    turns the iteration into Newton's method close to the steady state, and
+    shrinks when a step changes the state too much or is not finite.
+
+    Args:
+        c (np.ndarray): A vector of model parameters.
+        y0 (np.ndarray, optional): Initial state. Defaults to
+            get_starting_state_signalling().
+        rtol (float): Relative step size at which the solve has converged.
+        atol (float): Absolute floor used when scaling the step.
+        max_iter (int): Maximum number of accepted and rejected iterations.
+        dt0 (float): Initial pseudo time step in ms.
+
+    Returns:
+        tuple: The steady state vector and the number of iterations used.
+    """
+    if y0 is None:
+        y0 = get_starting_state.get_starting_state_signalling()
+    y = np.array(y0, dtype=np.float64)
+    n = len(y)
+    L = conservation_matrix(n)
+    eye = np.eye(n)
+    rhs = np.zeros(n + L.shape[0])
+
+    f = getPKASignalling.get_pka_signalling(y, c)
+    if metrics.ENABLED:
+        metrics.count("rhs_calls")
+    tau = dt0
+    change = np.inf
+    for it in range(max_iter):
+        J = state_jacobian(y, c)
+        A = np.vstack((eye / tau - J, L))
+        rhs[:n] = f
+        dy = np.linalg.lstsq(A, rhs, rcond=None)[0]
+        change = np.max(np.abs(dy) / (np.abs(y) + atol))
+        with np.errstate(all="ignore"):
+            f_new = getPKASignalling.get_pka_signalling(y + dy, c)
+        if metrics.ENABLED:
+            metrics.count("rhs_calls")
+        if change > 0.5 or not np.all(np.isfinite(f_new)):
+            tau *= 0.25
+            continue
+        y += dy
+        f = f_new
+        # Only a step taken with a very large tau is a full Newton step
+        if change < rtol and tau >= 1e10:
+            return y, it + 1
+        tau = min(tau * min(max(0.2 / change, 0.5), 4.0), 1e15)
+
+    raise RuntimeError(
+        f"Steady state not found after {max_iter} iterations "
+        f"(last relative step {change:.3e})."
+    )
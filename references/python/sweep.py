@@ -0,0 +1,271 @@
+"""
+Dose-response sweep driver.
+
+Fans (iso_conc, cell type) points out to a process pool. Each worker builds
+the constants with get_constants_pka_signalling, runs to steady state (or
+through a fixed-duration protocol) and returns the names_signalling
+fractions. Each finished point is appended to a CSV file straight away. A
+rerun of an interrupted sweep skips the points already in the file. A point
+that fails issues a RuntimeWarning and is left out of the file, so the
+other points still finish and a rerun retries it.
+
+If $GBAS_WARM_START_DIR names a warm_start.WarmStartCache, every point
+starts from the best cached state instead of
+get_starting_state_signalling(), and solved steady states are stored back.
+
+    python sweep.py results.csv --iso 0 0.001 0.01 0.1 1 --workers 4
+    python sweep.py results.csv --iso 0.1 1 --cell-types TW_endo TW_epi \\
+        --duration 60000
+"""
+
+import argparse
+import csv
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import getConstantsPKASignalling
+import metrics
+import steady_state
+import utils
+import warm_start
+
+COLUMNS = ("cell_type", "iso_conc", "duration") + utils.names_signalling + (
+    "elapsed",
+)
+
+
+def run_point(
+    iso_conc: float,
+    cell_type: str,
+    duration=None,
+    dt: float = 10.0,
+    integrator: str = "qssa",
+    cache=None,
+) -> tuple:
+    """
+    Fractions for one sweep point.
+
+    Args:
+        iso_conc (float): Isoproterenol concentration.
+        cell_type (str): Cell type label, recorded with the result.
+        duration (float, optional): Protocol length in ms starting from
+            warm_start.starting_state; None solves for the steady state.
+        dt (float): Time step of the protocol in ms.
+        integrator (str): Integrator passed to update_fraction_parameters.
+        cache (warm_start.WarmStartCache, optional): Warm-start cache;
+            defaults to warm_start.default_cache().
+
+    Returns:
+        tuple: The names_signalling fractions and the wall time in seconds.
+    """
+    start = time.perf_counter()
+    c = getConstantsPKASignalling.get_constants_pka_signalling(iso_conc)
+    if metrics.ENABLED:
+        metrics.count("constant_rebuilds")
+    if cache is None:
+        cache = warm_start.default_cache()
+    if duration is None:
+        if cache is not None:
+            y = cache.equilibrate(cell_type, c)
+        else:
+            y, _ = steady_state.find_steady_state(c)
+        fractions = utils.update_fraction_parameters(True, 0.0, y, c)
+    else:
+        y = warm_start.starting_state(cell_type, c, cache)
+        fractions = utils.update_fraction_parameters(True, 0.0, y, c)
+        t = 0.0
+        while t < duration:
+            step = min(dt, duration - t)
+            fractions = utils.update_fraction_parameters(True, step, y, c, integrator)
+            t += step
+    return fractions, time.perf_counter() - start
+
+
+def _run_point(args):
+    return run_point(*args)
+
+
+def _complete(row: dict) -> bool:
+    # A row cut short by an interrupted write lacks columns (None) or ends in
+    # an empty field; duration is legitimately empty for steady states
+    return all(
+        row.get(name) is not None and (row[name] != "" or name == "duration")
+        for name in COLUMNS
+    )
+
+
+def _read_rows(path) -> list:
+    with open(path, newline="") as f:
+        return [row for row in csv.DictReader(f) if _complete(row)]
+
+
+def completed_points(path) -> set:
+    """
+    (cell_type, iso_conc, duration) keys already present in a results file.
+
+    Incomplete rows, e.g. from an interrupted write, are not counted.
+    """
+    if not os.path.exists(path):
+        return set()
+    return {
+        (row["cell_type"], float(row["iso_conc"]), row["duration"])
+        for row in _read_rows(path)
+    }
+
+
+def _ends_with_newline(path) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def sweep(
+    path,
+    concentrations,
+    cell_types=("TW_endo",),
+    duration=None,
+    dt: float = 10.0,
+    integrator: str = "qssa",
+    n_workers: int = 1,
+    resume: bool = True,
+) -> int:
+    """
+    Runs a dose-response sweep and appends one CSV row per finished point.
+
+    Args:
+        path (str or os.PathLike): Results file; created with a header if
+            missing.
+        concentrations (iterable of float): Isoproterenol concentrations.
+        cell_types (iterable of str): Cell type labels; every concentration
+            is run for every cell type.
+        duration (float, optional): Protocol length in ms; None runs to
+            steady state.
+        dt (float): Time step of the protocol in ms.
+        integrator (str): Integrator passed to update_fraction_parameters.
+        n_workers (int): Number of worker processes; 1 runs serially.
+        resume (bool): Skip points already present in the results file.
+
+    Returns:
+        int: The number of points computed by this call. Failed points are
+            not counted; each issues a RuntimeWarning.
+    """
+    duration_key = "" if duration is None else repr(float(duration))
+    done = completed_points(path) if resume else set()
+    points = [
+        (float(iso_conc), cell_type)
+        for cell_type in cell_types
+        for iso_conc in concentrations
+        if (cell_type, float(iso_conc), duration_key) not in done
+    ]
+    if not points:
+        return 0
+
+    new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+    computed = 0
+    with open(path, "a", newline="") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(COLUMNS)
+            f.flush()
+        elif not _ends_with_newline(path):
+            # Start after a row cut short by an interrupted run
+            f.write("\r\n")
+
+        def fail(point, error):
+            iso_conc, cell_type = point
+            warnings.warn(
+                f"Sweep point ({cell_type}, iso_conc={iso_conc!r}) failed: {error}",
+                RuntimeWarning,
+                stacklevel=3,
+            )
+
+        def write(point, result):
+            nonlocal computed
+            fractions, elapsed = result
+            iso_conc, cell_type = point
+            writer.writerow(
+                [cell_type, repr(iso_conc), duration_key]
+                + [repr(float(v)) for v in fractions]
+                + [f"{elapsed:.6f}"]
+            )
+            f.flush()
+            computed += 1
+
+        tasks = [
+            (iso, cell_type, duration, dt, integrator) for iso, cell_type in points
+        ]
+        if n_workers > 1:
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                futures = {
+                    pool.submit(_run_point, task): point
+                    for task, point in zip(tasks, points)
+                }
+                for future in as_completed(futures):
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        fail(futures[future], e)
+                    else:
+                        write(futures[future], result)
+        else:
+            for task, point in zip(tasks, points):
+                try:
+                    result = _run_point(task)
+                except Exception as e:
+                    fail(point, e)
+                else:
+                    write(point, result)
+    return computed
+
+
+def load_results(path) -> dict:
+    """
+    Reads the complete rows of a results file.
+
+    Returns:
+        dict: Column name to np.ndarray (strings for cell_type).
+    """
+    rows = _read_rows(path)
+    out = {"cell_type": np.array([row["cell_type"] for row in rows])}
+    out["duration"] = np.array(
+        [float(row["duration"]) if row["duration"] else np.inf for row in rows]
+    )
+    for name in COLUMNS:
+        if name not in out:
+            out[name] = np.array([float(row[name]) for row in rows])
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", help="CSV results file")
+    parser.add_argument("--iso", type=float, nargs="+", required=True)
+    parser.add_argument("--cell-types", nargs="+", default=["TW_endo"])
+    parser.add_argument(
+        "--duration", type=float, help="Protocol length in ms (default: steady state)"
+    )
+    parser.add_argument("--dt", type=float, default=10.0)
+    parser.add_argument("--integrator", default="qssa")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--no-resume", action="store_true")
+    args = parser.parse_args()
+
+    n = sweep(
+        args.path,
+        args.iso,
+        args.cell_types,
+        args.duration,
+        args.dt,
+        args.integrator,
+        args.workers,
+        resume=not args.no_resume,
+    )
+    print(f"{n} points computed")
+
+
+if __name__ == "__main__":
+    main()
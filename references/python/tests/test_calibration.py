@@ -0,0 +1,21 @@
+import numpy as np
+
+import calibration
+
+
+class _RejectingCalibration(calibration.Calibration):
+    # Every trial step fails, so every iteration is rejected
+    def evaluate_log(self, x):
+        values = super().evaluate_log(x)
+        return values if len(np.atleast_2d(x)) == 1 else np.full(len(x), np.inf)
+
+
+def test_fit_counts_only_accepted_steps_as_iterations():
+    targets = {"fPLB_PKA": 0.5}
+    fit = _RejectingCalibration([131], targets, iso_conc=0.1).fit(max_iter=2)
+    assert fit["n_iterations"] == 0
+    assert fit["n_rejected"] == 2
+
+    fit = calibration.Calibration([131], targets, iso_conc=0.1).fit(max_iter=2)
+    assert fit["n_iterations"] + fit["n_rejected"] == 2
+    assert fit["n_iterations"] >= 1
@@ -0,0 +1,45 @@
+import numpy as np
+
+import checkpoint
+import get_starting_state
+import getConstantsPKASignalling
+
+
+def _fields(n):
+    y0 = get_starting_state.get_starting_state_signalling()
+    rng = np.random.default_rng(0)
+    return {
+        "signalling": y0 * rng.uniform(0.5, 1.5, (n, len(y0))),
+        "ep": np.tile(get_starting_state.get_state("TW_endo"), (n, 1)),
+        "constants": getConstantsPKASignalling.get_constants_pka_signalling(1.0),
+    }
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "state.ckpt"
+    fields = _fields(4)
+    checkpoint.save_checkpoint(path, 12.5, metadata={"iso": 1.0}, **fields)
+    time, restored, header = checkpoint.load_checkpoint(path, mmap=False)
+    assert time == 12.5
+    assert header["metadata"] == {"iso": 1.0}
+    assert header["fields"]["ep"]["names"] == list(get_starting_state.names)
+    for key, value in fields.items():
+        np.testing.assert_array_equal(restored[key], value)
+
+
+def test_cells_slice_only_per_cell_fields(tmp_path):
+    path = tmp_path / "state.ckpt"
+    fields = _fields(4)
+    checkpoint.save_checkpoint(path, 0.0, **fields)
+    _, restored, header = checkpoint.load_checkpoint(path, cells=[1, 3])
+    assert not header["fields"]["constants"]["per_cell"]
+    np.testing.assert_array_equal(restored["signalling"], fields["signalling"][[1, 3]])
+    np.testing.assert_array_equal(restored["constants"], fields["constants"])
+
+
+def test_explicit_per_cell_vector(tmp_path):
+    path = tmp_path / "state.ckpt"
+    iso = np.array([0.0, 0.1, 1.0])
+    checkpoint.save_checkpoint(path, 0.0, per_cell=["iso"], iso=iso)
+    _, restored, _ = checkpoint.load_checkpoint(path, cells=slice(1, None))
+    np.testing.assert_array_equal(restored["iso"], iso[1:])
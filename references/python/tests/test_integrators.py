@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+import get_starting_state
+import getConstantsPKASignalling
+import getPKASignalling
+import integrators
+import steady_state
+import utils
+
+
+def _run(c, dt, integrator, duration=20000.0):
+    y = get_starting_state.get_starting_state_signalling()
+    for _ in range(int(round(duration / dt))):
+        fraction = utils.update_fraction_parameters(True, dt, y, c, integrator)
+    return fraction
+
+
+def test_qssa_matches_euler_within_validated_step():
+    c = getConstantsPKASignalling.get_constants_pka_signalling(1.0)
+    reference = _run(c, 0.5, "euler")
+    fraction = _run(c, integrators.QSSA_MAX_DT, "qssa")
+    assert np.max(np.abs(fraction - reference)) < 1e-3
+
+
+def test_qssa_warns_above_validated_step():
+    c = getConstantsPKASignalling.get_constants_pka_signalling(1.0)
+    y = get_starting_state.get_starting_state_signalling()
+    dt = 2.0 * integrators.QSSA_MAX_DT
+    with pytest.warns(RuntimeWarning):
+        utils.update_fraction_parameters(True, dt, y, c, "qssa")
+
+
+@pytest.mark.parametrize("integrator", ["rush_larsen", "qssa_rush_larsen"])
+def test_removed_exponential_modes_are_rejected(integrator):
+    c = getConstantsPKASignalling.get_constants_pka_signalling(1.0)
+    y = get_starting_state.get_starting_state_signalling()
+    with pytest.raises(ValueError):
+        utils.update_fraction_parameters(True, 1.0, y, c, integrator)
+
+
+def test_stiffest_modes_are_the_qssa_fast_species():
+    c = getConstantsPKASignalling.get_constants_pka_signalling(1.0)
+    y = get_starting_state.get_starting_state_signalling()
+    f0 = getPKASignalling.get_pka_signalling(y, c)
+    jacobian = np.empty((len(y), len(y)))
+    for j in range(len(y)):
+        h = 1e-7 * max(abs(y[j]), 1e-6)
+        yp = y.copy()
+        yp[j] += h
+        jacobian[:, j] = (getPKASignalling.get_pka_signalling(yp, c) - f0) / h
+    rates, modes = np.linalg.eig(jacobian)
+    fast = {i for pool in integrators.QSSA_PKA_POOLS for i in pool[:4]}
+    for k in np.argsort(rates.real)[:3]:
+        assert int(np.argmax(np.abs(modes[:, k]))) in fast
+    # Forward Euler is only stable below 2 / |fastest rate|, i.e. under 1 ms
+    assert 0.5 < 2.0 / np.max(np.abs(rates.real)) < 1.0
+
+
+def test_euler_diverges_above_the_stable_step():
+    c = getConstantsPKASignalling.get_constants_pka_signalling(1.0)
+    with np.errstate(all="ignore"):
+        fraction = _run(c, 1.0, "euler")
+    assert not np.all(np.isfinite(fraction))
+
+
+def test_run_until_steady_defaults_to_a_stable_large_step():
+    c = getConstantsPKASignalling.get_constants_pka_signalling(1.0)
+    y, _ = steady_state.find_steady_state(c)
+    fraction, t, converged = utils.run_until_steady(10.0, y, c, max_time=60000.0)
+    assert converged and t < 60000.0
+    assert np.all(np.isfinite(fraction))
+
+
+def test_run_until_steady_warns_for_unstable_euler_steps():
+    c = getConstantsPKASignalling.get_constants_pka_signalling(1.0)
+    y = get_starting_state.get_starting_state_signalling()
+    with pytest.warns(RuntimeWarning), np.errstate(all="ignore"):
+        utils.run_until_steady(1.0, y, c, max_time=10.0, integrator="euler")
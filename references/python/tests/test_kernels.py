@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+import batched
+import generate_kernels
+import get_starting_state
+import getConstantsPKASignalling
+import getPKASignalling
+import signaling
+import utils
+
+try:
+    import utils_jit
+except ImportError:
+    utils_jit = None
+
+
+def _population(n=6):
+    rng = np.random.default_rng(1)
+    y0 = get_starting_state.get_starting_state_signalling()
+    X = y0 * rng.uniform(0.8, 1.2, (n, len(y0)))
+    C = np.array(
+        [
+            getConstantsPKASignalling.get_constants_pka_signalling(iso)
+            for iso in np.linspace(0.0, 1.0, n)
+        ]
+    )
+    return X, C
+
+
+def test_generated_kernels_are_current():
+    with open(generate_kernels.OUTPUT) as f:
+        assert f.read() == generate_kernels.generate()
+
+
+@pytest.mark.parametrize("name", signaling.BACKENDS)
+@pytest.mark.parametrize("shared", [False, True])
+def test_backend_batches_match_reference(name, shared):
+    backend = signaling.get_backend(name)
+    X, C = _population()
+    if shared:
+        C = C[-1]
+    rows = np.broadcast_to(C, (len(X), C.shape[-1]))
+    expected = [getPKASignalling.get_pka_signalling(x, c) for x, c in zip(X, rows)]
+    with np.errstate(all="raise"):
+        ydot = backend.get_pka_signalling_batch(X, C)
+    np.testing.assert_allclose(ydot, expected, rtol=1e-9, atol=1e-12)
+
+    states = X.copy()
+    reference = X.copy()
+    fractions = backend.update_fraction_parameters_batch(True, 0.5, states, C)
+    expected = [
+        utils.update_fraction_parameters(True, 0.5, x, c)
+        for x, c in zip(reference, rows)
+    ]
+    np.testing.assert_allclose(fractions, expected, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(states, reference, rtol=1e-9, atol=1e-12)
+
+
+@pytest.mark.parametrize("jit", [False, True])
+def test_qssa_batches_match_reference(jit):
+    if jit and utils_jit is None:
+        pytest.skip("requires numba")
+    if jit:
+        update = utils_jit.update_fraction_parameters_batch
+    else:
+        update = batched.update_fraction_parameters
+    X, C = _population()
+    dt = np.linspace(1.0, 10.0, len(X))
+    reference = X.copy()
+    expected = [
+        utils.update_fraction_parameters(True, h, x, c, "qssa")
+        for h, x, c in zip(dt, reference, C)
+    ]
+    with np.errstate(all="raise"):
+        fractions = update(True, dt, X, C, "qssa")
+    np.testing.assert_allclose(fractions, expected, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(X, reference, rtol=1e-9, atol=1e-12)
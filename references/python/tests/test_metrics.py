@@ -0,0 +1,123 @@
+import timeit
+
+import numpy as np
+import pytest
+
+import batched
+import dedup
+import get_starting_state
+import getConstantsPKASignalling
+import iso_field
+import metrics
+import service
+import steady_state
+import sweep
+import utils
+
+try:
+    import threaded
+    import transmural
+    import utils_jit
+except ImportError:
+    utils_jit = None
+
+
+@pytest.fixture
+def recording():
+    metrics.reset()
+    metrics.enable()
+    yield
+    metrics.disable()
+    metrics.reset()
+
+
+def _population(n=4):
+    y0 = get_starting_state.get_starting_state_signalling()
+    c = getConstantsPKASignalling.get_constants_pka_signalling(1.0)
+    return np.tile(y0, (n, 1)), np.tile(c, (n, 1))
+
+
+def _rhs_calls():
+    return metrics.snapshot()["counters"]["rhs_calls"]
+
+
+def _rebuilds():
+    return metrics.snapshot()["counters"]["constant_rebuilds"]
+
+
+def test_batched_update_counts_every_cell(recording):
+    X, C = _population()
+    batched.update_fraction_parameters(True, 0.5, X, C)
+    assert _rhs_calls() == 4
+    assert metrics.snapshot()["simulated_ms"] == 2.0
+
+
+def test_scalar_updates_are_counted_exactly(recording):
+    y, c = (a[0] for a in _population(1))
+    for _ in range(3):
+        utils.update_fraction_parameters(True, 0.5, y, c)
+    utils.update_fraction_parameters(False, 0.5, y, c)
+    data = metrics.snapshot()
+    assert data["counters"]["fraction_evaluations"] == 4
+    assert _rhs_calls() == 3
+    assert data["simulated_ms"] == 1.5
+    assert data["timers"]["update_fraction_parameters"]["calls"] == 4
+
+
+def test_scalar_hook_costs_under_one_percent_of_a_step(recording):
+    # Timed in isolation: the machine noise on a whole run exceeds 1%
+    y, c = (a[0] for a in _population(1))
+
+    def hook():
+        for _ in range(1000):
+            metrics.end_update(0.5, True, metrics.begin_update(y))
+
+    def steps():
+        x = y.copy()
+        metrics.disable()
+        for _ in range(100):
+            utils.update_fraction_parameters(True, 0.5, x, c)
+        metrics.enable()
+
+    per_hook = min(timeit.repeat(hook, number=1, repeat=7)) / 1000
+    per_step = min(timeit.repeat(steps, number=1, repeat=7)) / 100
+    assert per_hook < 0.01 * per_step
+
+
+def test_constant_rebuilds_are_counted(recording):
+    sweep.run_point(1.0, "endo", duration=1.0)
+    assert _rebuilds() == 1
+    evaluator = service.FractionEvaluator()
+    evaluator.constants(1.0)
+    evaluator.constants(1.0)
+    assert _rebuilds() == 2
+    manager = iso_field.IsoConstantsManager.uniform(4)
+    assert _rebuilds() == 3
+    manager.update(np.array([0.0, 0.0, 1.0, 1.0]))
+    assert _rebuilds() == 5
+
+
+def test_dedup_counts_unique_cells(recording):
+    X, C = _population()
+    dedup.DeduplicatedPopulation(C, X).step(0.5, n_steps=3, jit=False)
+    assert _rhs_calls() == 3
+
+
+def test_steady_state_counts_rhs_calls(recording):
+    c = getConstantsPKASignalling.get_constants_pka_signalling(1.0)
+    steady_state.find_steady_state(c)
+    assert _rhs_calls() > 0
+
+
+@pytest.mark.skipif(utils_jit is None, reason="requires numba")
+def test_compiled_drivers_count_every_step(recording):
+    X, C = _population()
+    utils_jit.update_fraction_parameters_batch(True, 0.5, X, C)
+    assert _rhs_calls() == 4
+    with threaded.ThreadedStepper(2) as stepper:
+        stepper.step(X, C, 0.5, n_steps=2)
+    assert _rhs_calls() == 12
+    driver = transmural.TransmuralDriver(transmural.strand_labels(3))
+    assert _rebuilds() == len(driver.types)
+    driver.step(0.5, n_steps=2)
+    assert _rhs_calls() == 18
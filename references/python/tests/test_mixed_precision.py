@@ -0,0 +1,25 @@
+import numpy as np
+
+import mixed_precision
+import population
+
+
+def test_reference_runs_on_unrounded_constants(monkeypatch):
+    seen = []
+    step_population = mixed_precision.step_population
+
+    def recording(states, constants, *args, **kwargs):
+        seen.append(constants)
+        return step_population(states, constants, *args, **kwargs)
+
+    monkeypatch.setattr(mixed_precision, "step_population", recording)
+    report = mixed_precision.precision_report(
+        n_cells=4, dt=0.5, n_steps=10, n_calls=2, rng=3
+    )
+    constants, _ = population.generate_population(
+        4, 1.0, sigma=0.1, rng=3, shared=False
+    )
+    float64 = [c for c in seen if c.dtype == np.float64 and len(c) == 4]
+    np.testing.assert_array_equal(float64[0], constants)
+    assert report["n_diverged"] == 0
+    assert report["max_fraction_error"] < 1e-4
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+import get_starting_state
+import getConstantsPKASignalling
+import utils
+
+ode_adapter = pytest.importorskip("ode_adapter")
+pytest.importorskip("scipy")
+
+
+def test_bdf_matches_euler_over_a_short_window():
+    c = getConstantsPKASignalling.get_constants_pka_signalling(1.0)
+    sol = ode_adapter.solve(c, t_span=(0.0, 1000.0), rtol=1e-8, atol=1e-12)
+    assert sol.success
+    y = get_starting_state.get_starting_state_signalling()
+    for _ in range(2000):
+        fraction = utils.update_fraction_parameters(True, 0.5, y, c)
+    np.testing.assert_allclose(sol.y[:, -1], y, rtol=1e-3, atol=1e-9)
+    np.testing.assert_allclose(
+        utils.get_fractions(sol.y[:, -1], c), fraction, rtol=0.0, atol=1e-5
+    )
+
+
+def test_cfuncs_are_compiled_once_per_constants():
+    c = getConstantsPKASignalling.get_constants_pka_signalling(1.0)
+    rhs = ode_adapter.rhs_cfunc(c)
+    assert ode_adapter.rhs_cfunc(c.copy()) is rhs
+    assert ode_adapter.rhs_cfunc(c * 1.01) is not rhs
+
+    ydot = np.empty(ode_adapter.N_STATES)
+    y = get_starting_state.get_starting_state_signalling()
+    pointer = rhs.ctypes.argtypes[1]
+    rhs.ctypes(0.0, y.ctypes.data_as(pointer), ydot.ctypes.data_as(pointer))
+    np.testing.assert_allclose(ydot, ode_adapter.bind_rhs(c)(0.0, y), rtol=1e-12)
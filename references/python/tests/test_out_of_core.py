@@ -0,0 +1,21 @@
+import numpy as np
+
+import get_starting_state
+import getConstantsPKASignalling
+import out_of_core
+
+
+def test_deduplicated_blocks_match_plain_stepping():
+    y0 = get_starting_state.get_starting_state_signalling()
+    c = getConstantsPKASignalling.get_constants_pka_signalling(1.0)
+    constants = np.tile(c, (6, 1))
+    constants[3:, 0] = 0.5
+    results = []
+    for deduplicate in (False, True):
+        states = np.tile(y0, (6, 1))
+        executor = out_of_core.ChunkedExecutor(
+            states, constants, chunk=4, deduplicate=deduplicate
+        )
+        executor.run(0.5, n_steps=3)
+        results.append(states)
+    np.testing.assert_array_equal(results[0], results[1])
@@ -0,0 +1,16 @@
+import os
+
+import pytest
+
+import parity
+
+GOLDEN = os.path.join(os.path.dirname(__file__), "..", "..", "..", "test", "golden")
+
+
+@pytest.mark.skipif(not os.path.isdir(GOLDEN), reason="no golden files")
+def test_reported_errors_are_within_their_deciding_tolerance():
+    report = parity.check_builds(GOLDEN, repeats=1)
+    for row in report.values():
+        assert row["passed"]
+        assert row["max_rel_error"] <= parity.RTOL
+        assert row["max_abs_error"] <= parity.ATOL
@@ -0,0 +1,112 @@
+import asyncio
+import json
+import threading
+
+import numpy as np
+import pytest
+
+import service
+
+
+def test_evaluate_returns_results_evicted_by_the_same_call():
+    evaluator = service.FractionEvaluator(cache_size=1)
+    results = evaluator.evaluate([(1.0, 100.0), (1.0, 200.0)])
+    assert len(results) == 2
+    assert len(evaluator.results) == 1
+
+
+def test_concurrent_batches_match_sequential():
+    queries = [[(1.0, 1000.0), (1.0, 3000.0)], [(1.0, 2000.0), (1.0, 4000.0)]]
+    reference = service.FractionEvaluator()
+    expected = [reference.evaluate(batch) for batch in queries]
+
+    evaluator = service.FractionEvaluator()
+    results = [None, None]
+
+    def run(k):
+        results[k] = evaluator.evaluate(queries[k])
+
+    threads = [threading.Thread(target=run, args=(k,)) for k in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for result, reference_result in zip(results, expected):
+        np.testing.assert_allclose(result, reference_result, rtol=1e-12)
+
+
+class _FailingEvaluator(service.FractionEvaluator):
+    def _integrate(self, requests):
+        if 2.0 in requests:
+            raise RuntimeError("integration failed")
+        return super()._integrate(requests)
+
+
+def test_stacked_doses_match_separate_evaluations():
+    queries = [(0.1, 3000.0), (1.0, 1000.0), (0.5, 2500.0), (1.0, 2000.0)]
+    stacked = service.FractionEvaluator().evaluate(queries)
+    for query, result in zip(queries, stacked):
+        alone = service.FractionEvaluator().evaluate([query])[0]
+        np.testing.assert_allclose(result, alone, rtol=1e-12)
+
+
+def test_failures_are_confined_to_their_dose():
+    evaluator = _FailingEvaluator()
+    results = evaluator.evaluate_each([(1.0, 100.0), (2.0, 100.0), (-1.0, 100.0)])
+    assert results[0].shape == (8,)
+    assert isinstance(results[1], RuntimeError)
+    assert isinstance(results[2], ValueError)
+    assert list(evaluator.results) == [(1.0, 100.0)]
+    with pytest.raises(ValueError):
+        evaluator.evaluate([(1.0, float("nan"))])
+
+
+async def _exchange(port: int, request: bytes) -> bytes:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(request)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return response
+
+
+def test_malformed_request_line_gets_an_error_response():
+    async def run():
+        server = await asyncio.start_server(
+            service.FractionService()._handle, "127.0.0.1", 0
+        )
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await _exchange(port, b"GARBAGE\r\n\r\n")
+
+    response = asyncio.run(run())
+    assert response.startswith(b"HTTP/1.1 400 Bad Request")
+
+
+def _post(queries) -> bytes:
+    body = json.dumps({"queries": queries}).encode()
+    return (
+        b"POST /fractions HTTP/1.1\r\nConnection: close\r\n"
+        + f"Content-Length: {len(body)}\r\n\r\n".encode()
+        + body
+    )
+
+
+def test_coalesced_clients_fail_independently():
+    async def run():
+        fraction_service = service.FractionService(_FailingEvaluator(), window=0.05)
+        server = await asyncio.start_server(fraction_service._handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await asyncio.gather(
+                _exchange(port, _post([{"iso_conc": 1.0, "time": 100.0}])),
+                _exchange(port, _post([{"iso_conc": 2.0, "time": 100.0}])),
+                _exchange(port, _post([{"iso_conc": -1.0, "time": 100.0}])),
+                _exchange(port, _post([{"iso_conc": 1.0, "time": float("inf")}])),
+            )
+
+    ok, failed, negative, infinite = asyncio.run(run())
+    assert ok.startswith(b"HTTP/1.1 200 OK")
+    assert failed.startswith(b"HTTP/1.1 500")
+    assert negative.startswith(b"HTTP/1.1 400 Bad Request")
+    assert infinite.startswith(b"HTTP/1.1 400 Bad Request")
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+import get_starting_state
+import getConstantsPKASignalling
+import sparse_constants
+
+
+def _population(n=3):
+    baseline = getConstantsPKASignalling.get_constants_pka_signalling(1.0)
+    constants = sparse_constants.SparseConstants.from_dense(
+        np.tile(baseline, (n, 1)), baseline
+    )
+    states = np.tile(get_starting_state.get_starting_state_signalling(), (n, 1))
+    return constants, states
+
+
+@pytest.mark.parametrize("n_steps", [0, -1])
+def test_step_population_rejects_fewer_than_one_step(n_steps):
+    constants, states = _population()
+    before = states.copy()
+    with pytest.raises(ValueError):
+        sparse_constants.step_population(constants, states, 0.5, n_steps=n_steps)
+    np.testing.assert_array_equal(states, before)
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+import getConstantsPKASignalling
+import service
+import steady_state
+import sweep
+import transmural
+import warm_start
+
+
+@pytest.fixture
+def solves(monkeypatch, tmp_path):
+    # Warm-start cache in tmp_path, and a count of the steady-state solves
+    monkeypatch.setenv("GBAS_WARM_START_DIR", str(tmp_path))
+    calls = []
+    find_steady_state = steady_state.find_steady_state
+
+    def counted(*args, **kwargs):
+        calls.append(args)
+        return find_steady_state(*args, **kwargs)
+
+    monkeypatch.setattr(steady_state, "find_steady_state", counted)
+    return calls
+
+
+def test_second_sweep_point_takes_the_warm_path(solves):
+    first, _ = sweep.run_point(0.1, "TW_endo")
+    assert len(solves) == 1
+    assert len(warm_start.default_cache()) == 1
+    second, _ = sweep.run_point(0.1, "TW_endo")
+    assert len(solves) == 1
+    np.testing.assert_array_equal(first, second)
+
+
+def test_service_stores_and_reuses_steady_states(solves):
+    first = service.FractionEvaluator().evaluate([(0.1, None)])[0]
+    assert len(solves) == 1
+    second = service.FractionEvaluator().evaluate([(0.1, None)])[0]
+    assert len(solves) == 1
+    np.testing.assert_array_equal(first, second)
+
+
+def test_transmural_starts_from_the_cached_state(solves):
+    c = getConstantsPKASignalling.get_constants_pka_signalling(0.1)
+    state = warm_start.default_cache().equilibrate("TW_endo", c)
+    driver = transmural.TransmuralDriver(["TW_endo", "TW_endo"], iso_conc=0.1)
+    np.testing.assert_array_equal(driver.states[0], state)
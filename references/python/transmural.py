@@ -0,0 +1,182 @@
+"""
+Multi-cell-type driver for transmural strands and generic node lists.
+
+Every node carries a cell type label ('TW_endo', 'TW_mid', 'TW_epi' or an
+EP state registered with get_starting_state.register_state). The driver
+groups the nodes by type once, at construction, and stores the signaling
+states of each group contiguously. Every step therefore advances a small
+number of contiguous blocks with one shared constants vector each, with no
+per-node branching. Constants and starting states are built once per type.
+The grouping, and with it the node order of every block, never changes
+between steps.
+"""
+
+import numpy as np
+
+import batched
+import get_starting_state
+import getConstantsPKASignalling
+import metrics
+import utils
+import warm_start
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Transmural order from the endocardium to the epicardium
+CELL_TYPES = ("TW_endo", "TW_mid", "TW_epi")
+
+
+def strand_labels(n_nodes: int, proportions=(1 / 3, 1 / 3, 1 / 3)) -> list:
+    """
+    Cell type labels of a 1-D transmural strand.
+
+    Args:
+        n_nodes (int): Number of nodes, from endocardium to epicardium.
+        proportions (tuple of float): Fractions of endo, mid and epi nodes.
+
+    Returns:
+        list: One label per node.
+    """
+    edges = np.cumsum(proportions) / np.sum(proportions) * n_nodes
+    position = np.arange(n_nodes) + 0.5
+    return [CELL_TYPES[k] for k in np.searchsorted(edges, position)]
+
+
+if numba is not None:
+    import utils_jit
+
+    @numba.njit(nogil=True)
+    def _step_shared(states, c, fractions, dt, n_steps, counts):
+        # Every row of the block uses the same constants vector
+        for i in range(states.shape[0]):
+            X = states[i]
+            for _ in range(n_steps):
+                fractions[i] = utils_jit.update_fraction_parameters_counted(
+                    True, dt, X, c, counts
+                )
+
+
+class TransmuralDriver:
+    """
+    Steps the signaling model of nodes grouped by cell type.
+
+    Args:
+        labels (sequence of str): Cell type of every node.
+        iso_conc (float): Isoproterenol concentration of the default
+            constants.
+        constants (dict, optional): Constants vector per cell type,
+            overriding get_constants_pka_signalling(iso_conc).
+        starting_states (dict, optional): Signaling starting state per cell
+            type. Types not given start from the best state of
+            warm_start.default_cache(), if $GBAS_WARM_START_DIR is set, and
+            from get_starting_state_signalling() otherwise.
+    """
+
+    def __init__(
+        self, labels, iso_conc: float = 0.0, constants=None, starting_states=None
+    ):
+        labels = list(labels)
+        # Cell types are EP states, which register_state keeps at 93 entries
+        known = get_starting_state.registered_states("ep")
+        for label in dict.fromkeys(labels):
+            if label not in known:
+                raise ValueError(f"Cell type '{label}' is not recognized.")
+        constants = constants or {}
+        starting_states = starting_states or {}
+
+        self.labels = labels
+        self.types = tuple(dict.fromkeys(labels))
+        label_array = np.array(labels, dtype=object)
+        # Nodes in type order, each type block in ascending node order
+        self.order = np.concatenate(
+            [np.flatnonzero(label_array == t) for t in self.types]
+        ).astype(np.intp)
+        self.position = np.empty_like(self.order)
+        self.position[self.order] = np.arange(len(labels))
+
+        self.blocks = {}
+        self.constants = {}
+        start = 0
+        for t in self.types:
+            stop = start + labels.count(t)
+            self.blocks[t] = slice(start, stop)
+            c = constants.get(t)
+            if c is None:
+                c = getConstantsPKASignalling.get_constants_pka_signalling(iso_conc)
+                if metrics.ENABLED:
+                    metrics.count("constant_rebuilds")
+            self.constants[t] = np.array(c, dtype=np.float64)
+            start = stop
+
+        n_states = len(get_starting_state.get_starting_state_signalling())
+        self._states = np.empty((len(labels), n_states))
+        self._fractions = np.full((len(labels), len(utils.names_signalling)), np.nan)
+        cache = warm_start.default_cache()
+        for t, block in self.blocks.items():
+            y0 = starting_states.get(t)
+            if y0 is None and cache is not None:
+                y0 = cache.starting_state(t, self.constants[t])
+            if y0 is None:
+                y0 = get_starting_state.get_state("signalling", copy=False)
+            self._states[block] = y0
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.labels)
+
+    def step(self, dt: float, n_steps: int = 1, jit: bool = True) -> np.ndarray:
+        """
+        Advances every node by n_steps of forward Euler.
+
+        Args:
+            dt (float): Time step in ms.
+            n_steps (int): Number of steps.
+            jit (bool): Use the compiled kernel if numba is installed,
+                otherwise batched.update_fraction_parameters.
+
+        Returns:
+            np.ndarray: (N, 8) fractions in node order.
+        """
+        for t, block in self.blocks.items():
+            X = self._states[block]
+            c = self.constants[t]
+            if jit and numba is not None:
+                counts = utils_jit.new_counts()
+                _step_shared(X, c, self._fractions[block], dt, n_steps, counts)
+                utils_jit.merge_counts(counts)
+            else:
+                for _ in range(n_steps):
+                    fraction = batched.update_fraction_parameters(True, dt, X, c)
+                    self._fractions[block] = fraction
+        return self.fractions
+
+    @property
+    def fractions(self) -> np.ndarray:
+        """(N, 8) fractions after the last step, in node order."""
+        return self._fractions[self.position]
+
+    @property
+    def states(self) -> np.ndarray:
+        """(N, 57) signaling states in node order."""
+        return self._states[self.position]
+
+    def group_states(self, cell_type: str) -> np.ndarray:
+        """Writable (n, 57) view of one type's states, in node order."""
+        return self._states[self.blocks[cell_type]]
+
+    def nodes(self, cell_type: str) -> np.ndarray:
+        """Node indices of one cell type, in ascending order."""
+        return self.order[self.blocks[cell_type]]
+
+    def initial_ep_states(self) -> np.ndarray:
+        """
+        (N, 93) EP initial states in node order, one shared vector per type.
+        """
+        states = np.array(
+            [get_starting_state.get_state(t, copy=False, kind="ep") for t in self.types]
+        )
+        type_index = {t: k for k, t in enumerate(self.types)}
+        return states[[type_index[label] for label in self.labels]]
@@ -0,0 +1,109 @@
+"""
+Generalized-ufunc builds of the signaling kernels (requires numba).
+
+    get_pka_signalling      (n),(m)->(n)
+    get_effective_fraction  (n),(m),(k)->(k)
+
+NumPy broadcasts the leading dimensions, so (..., 57) states can be paired
+with (167,) constants shared by all cells or with (..., 167) constants, and
+no loop driver is needed. A gufunc's output size must come from an input,
+so get_effective_fraction takes a length-k template whose length selects
+the output order like the reference function: 8 for the original MATLAB
+order, 7 for the model order. The get_effective_fraction wrapper below
+supplies the template.
+
+Each target ("cpu" or "parallel") is compiled on first use and cached.
+"""
+
+import numba
+import numpy as np
+
+import metrics
+import utils_jit
+
+_SIGNATURE = ["void(float64[:], float64[:], float64[:])"]
+_TEMPLATE = ["void(float64[:], float64[:], float64[:], float64[:])"]
+
+_kernels = {}
+
+
+def _build(name: str, target: str):
+    rhs = utils_jit.get_pka_signalling
+    fractions = utils_jit.get_effective_fraction
+    if name == "get_pka_signalling":
+
+        @numba.guvectorize(_SIGNATURE, "(n),(m)->(n)", target=target)
+        def kernel(y, c, ydot):
+            ydot[:] = rhs(y, c)
+
+    elif name == "get_effective_fraction":
+
+        @numba.guvectorize(_TEMPLATE, "(n),(m),(k)->(k)", target=target)
+        def kernel(y, c, template, output):
+            fractions(y, c, output, output.shape[0] == 8)
+
+    else:
+        raise ValueError(f"Kernel '{name}' is not recognized.")
+    return kernel
+
+
+def gufunc(name: str, target: str = "cpu"):
+    """
+    Returns a compiled gufunc.
+
+    Args:
+        name (str): "get_pka_signalling" or "get_effective_fraction".
+        target (str): "cpu" or "parallel".
+
+    Returns:
+        numba gufunc: The kernel, compiled on first request.
+    """
+    key = (name, target)
+    kernel = _kernels.get(key)
+    if kernel is None:
+        kernel = _build(name, target)
+        _kernels[key] = kernel
+    return kernel
+
+
+def get_pka_signalling(y, c, out=None, target: str = "cpu") -> np.ndarray:
+    """
+    Broadcasting get_pka_signalling.
+
+    Args:
+        y (np.ndarray): (..., 57) signaling states.
+        c (np.ndarray): (167,) or (..., 167) constants.
+        out (np.ndarray, optional): (..., 57) output array.
+        target (str): "cpu" or "parallel".
+
+    Returns:
+        np.ndarray: (..., 57) derivatives.
+    """
+    kernel = gufunc("get_pka_signalling", target)
+    if metrics.ENABLED:
+        y = np.asarray(y)
+        metrics.count("rhs_calls", y.size // y.shape[-1])
+        metrics.record_clamps(y)
+    return kernel(y, c) if out is None else kernel(y, c, out)
+
+
+def get_effective_fraction(
+    y, c, original_output=False, out=None, target: str = "cpu"
+) -> np.ndarray:
+    """
+    Broadcasting get_effective_fraction.
+
+    Args:
+        y (np.ndarray): (..., 57) signaling states.
+        c (np.ndarray): (167,) or (..., 167) constants.
+        original_output (bool): Use the original MATLAB output order (8
+            values) instead of the model order (7 values).
+        out (np.ndarray, optional): (..., 8) or (..., 7) output array.
+        target (str): "cpu" or "parallel".
+
+    Returns:
+        np.ndarray: The effective fractions.
+    """
+    template = np.empty(8 if original_output else 7)
+    kernel = gufunc("get_effective_fraction", target)
+    return kernel(y, c, template) if out is None else kernel(y, c, template, out)
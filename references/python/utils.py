@@ -1,7 +1,12 @@
+import collections
+import warnings
+
 import numpy as np
 
 import getEffectiveFraction
 import getPKASignalling
+import integrators
+import metrics
 
 names_signalling = (
     "fINa_PKA_in",
@@ -15,39 +20,139 @@ names_signalling = (
 )
 
 
+def get_fractions(X0: np.ndarray, const_signaling: np.ndarray, output=None):
+    """
+    The names_signalling fractions of a signaling state, without a step.
+
+    Args:
+        X0 (np.ndarray): Signaling state vector.
+        const_signaling (np.ndarray): A vector of model parameters.
+        output (np.ndarray, optional): Output array of the 8 fractions.
+
+    Returns:
+        np.ndarray: The fractions, as update_fraction_parameters returns them
+            for the signaling pathway after its step.
+    """
+    fraction = np.zeros(len(names_signalling)) if output is None else output
+    getEffectiveFraction.get_effective_fraction(
+        y=X0, c=const_signaling, output=fraction[:-1]
+    )
+    # Concentration of uninhibited PP1 in the cytosolic compartment
+    pp1_PP1f_cyt_sum = const_signaling[37] - const_signaling[36] + X0[38]
+    # Concentration of uninhibited PP1 in the cytosolic compartment
+    PP1f_cyt = 0.5 * (
+        np.sqrt(pp1_PP1f_cyt_sum**2.0 + 4.0 * const_signaling[37] * const_signaling[36])
+        - pp1_PP1f_cyt_sum
+    )
+    Whole_cell_PP1 = (
+        const_signaling[35] / const_signaling[4]
+        + const_signaling[34] / const_signaling[5]
+        + PP1f_cyt / const_signaling[6]
+    )
+    fraction[-1] = Whole_cell_PP1
+    return fraction
+
+
 def update_fraction_parameters(
     runSignalingPathway: bool,
     dt: float,
     X0: np.ndarray,
     const_signaling: np.ndarray,
+    integrator: str = "euler",
 ):
+    if metrics.ENABLED:
+        start = metrics.begin_update(X0 if runSignalingPathway else None)
     fraction = np.zeros(len(names_signalling))
     if runSignalingPathway:
-        # Use forward euler to solve the signaling pathway
         dX_Signaling = getPKASignalling.get_pka_signalling(X0, const_signaling)
-        X0 += dX_Signaling * dt
+        if integrator == "qssa":
+            # Forward euler on the slow states, fast binding at equilibrium
+            integrators.qssa_update(X0, dX_Signaling, const_signaling, dt)
+        elif integrator == "euler":
+            # Use forward euler to solve the signaling pathway
+            X0 += dX_Signaling * dt
+        else:
+            raise ValueError(f"Integrator '{integrator}' is not recognized.")
 
-        getEffectiveFraction.get_effective_fraction(
-            y=X0, c=const_signaling, output=fraction[:-1]
-        )
-        # Concentration of uninhibited PP1 in the cytosolic compartment
-        pp1_PP1f_cyt_sum = const_signaling[37] - const_signaling[36] + X0[38]
-        # Concentration of uninhibited PP1 in the cytosolic compartment
-        PP1f_cyt = 0.5 * (
-            np.sqrt(
-                pp1_PP1f_cyt_sum**2.0 + 4.0 * const_signaling[37] * const_signaling[36]
-            )
-            - pp1_PP1f_cyt_sum
-        )
-        Whole_cell_PP1 = (
-            const_signaling[35] / const_signaling[4]
-            + const_signaling[34] / const_signaling[5]
-            + PP1f_cyt / const_signaling[6]
-        )
-        fraction[-1] = Whole_cell_PP1
+        get_fractions(X0, const_signaling, output=fraction)
     else:
         getEffectiveFraction.get_effective_fraction(
             y=X0, c=const_signaling, output=fraction[:-1]
         )
         fraction[-1] = 0.13698
+    if metrics.ENABLED:
+        metrics.end_update(dt, runSignalingPathway, start)
     return fraction
+
+
+def run_until_steady(
+    dt: float,
+    X0: np.ndarray,
+    const_signaling: np.ndarray,
+    max_time: float,
+    window: float = 10000.0,
+    ftol: float = 1e-4,
+    dtol: float = 1e-6,
+    check_every: int = 10,
+    integrator: str = "qssa",
+) -> tuple:
+    """
+    Steps update_fraction_parameters until the signaling has settled.
+
+    Every check_every steps the relative derivative norm
+    max|ydot_i| / max(|y_i|, 1e-12) of get_pka_signalling and the fractions
+    are sampled. Integration stops once the derivative norm is below dtol
+    (in 1/ms) and no fraction has moved by more than ftol over the last
+    window ms, or at max_time.
+
+    Args:
+        dt (float): Time step in ms.
+        X0 (np.ndarray): Signaling state, updated in place.
+        const_signaling (np.ndarray): A vector of model parameters.
+        max_time (float): Integration horizon in ms.
+        window (float): Length of the sliding window in ms.
+        ftol (float): Tolerance on the change of the fractions.
+        dtol (float): Tolerance on the relative derivative norm.
+        check_every (int): Steps between two convergence checks.
+        integrator (str): Integrator passed to update_fraction_parameters.
+            Forward Euler ("euler") is only stable up to
+            integrators.EULER_MAX_DT and warns above it.
+
+    Returns:
+        tuple: The fractions at the final time, the final time in ms and
+            whether the tolerances were met before max_time.
+    """
+    if integrator == "euler" and dt > integrators.EULER_MAX_DT:
+        warnings.warn(
+            f"Forward Euler step dt={dt} ms exceeds the stable "
+            f"{integrators.EULER_MAX_DT} ms; use integrator='qssa'.",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+    history = collections.deque()
+    fraction = get_fractions(X0, const_signaling)
+    t = 0.0
+    n = 0
+    while t < max_time:
+        step = min(dt, max_time - t)
+        fraction = update_fraction_parameters(
+            True, step, X0, const_signaling, integrator
+        )
+        t += step
+        n += 1
+        if n % check_every:
+            continue
+
+        # Keep just enough samples to span the window
+        history.append((t, fraction))
+        while len(history) > 1 and history[1][0] <= t - window:
+            history.popleft()
+        if t - history[0][0] < window:
+            continue
+        change = max(np.max(np.abs(f - fraction)) for _, f in history)
+        if change > ftol:
+            continue
+        dX = getPKASignalling.get_pka_signalling(X0, const_signaling)
+        if np.max(np.abs(dX) / np.maximum(np.abs(X0), 1e-12)) < dtol:
+            return fraction, t, True
+    return fraction, t, False
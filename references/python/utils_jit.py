@@ -2,6 +2,8 @@ import numpy as np
 import numba
 import getEffectiveFraction
 import getPKASignalling
+import integrators
+import metrics
 
 names_signalling = (
     "fINa_PKA_in",
@@ -14,11 +16,36 @@ names_signalling = (
     "Whole_cell_PP1_in",
 )
 
-get_pka_signalling = numba.njit(getPKASignalling.get_pka_signalling)
-get_effective_fraction = numba.njit(getEffectiveFraction.get_effective_fraction)
+get_pka_signalling = numba.njit(nogil=True)(getPKASignalling.get_pka_signalling)
+get_effective_fraction = numba.njit(nogil=True)(
+    getEffectiveFraction.get_effective_fraction
+)
+qssa_step = numba.njit(nogil=True)(
+    integrators.make_qssa_step(
+        numba.njit(nogil=True)(integrators.solve_pka_equilibrium)
+    )
+)
+
 
+@numba.njit(nogil=True)
+def _get_fractions(X0: np.ndarray, const_signaling: np.ndarray, fraction):
+    get_effective_fraction(y=X0, c=const_signaling, output=fraction[:-1])
+    # Concentration of uninhibited PP1 in the cytosolic compartment
+    pp1_PP1f_cyt_sum = const_signaling[37] - const_signaling[36] + X0[38]
+    # Concentration of uninhibited PP1 in the cytosolic compartment
+    PP1f_cyt = 0.5 * (
+        np.sqrt(pp1_PP1f_cyt_sum**2.0 + 4.0 * const_signaling[37] * const_signaling[36])
+        - pp1_PP1f_cyt_sum
+    )
+    Whole_cell_PP1 = (
+        const_signaling[35] / const_signaling[4]
+        + const_signaling[34] / const_signaling[5]
+        + PP1f_cyt / const_signaling[6]
+    )
+    fraction[-1] = Whole_cell_PP1
 
-@numba.njit
+
+@numba.njit(nogil=True)
 def update_fraction_parameters(
     runSignalingPathway: bool,
     dt: float,
@@ -30,24 +57,147 @@ def update_fraction_parameters(
         # Use forward euler to solve the signaling pathway
         dX_Signaling = get_pka_signalling(X0, const_signaling)
         X0 += dX_Signaling * dt
-
-        get_effective_fraction(y=X0, c=const_signaling, output=fraction[:-1])
-        # Concentration of uninhibited PP1 in the cytosolic compartment
-        pp1_PP1f_cyt_sum = const_signaling[37] - const_signaling[36] + X0[38]
-        # Concentration of uninhibited PP1 in the cytosolic compartment
-        PP1f_cyt = 0.5 * (
-            np.sqrt(
-                pp1_PP1f_cyt_sum**2.0 + 4.0 * const_signaling[37] * const_signaling[36]
-            )
-            - pp1_PP1f_cyt_sum
-        )
-        Whole_cell_PP1 = (
-            const_signaling[35] / const_signaling[4]
-            + const_signaling[34] / const_signaling[5]
-            + PP1f_cyt / const_signaling[6]
-        )
-        fraction[-1] = Whole_cell_PP1
+        _get_fractions(X0, const_signaling, fraction)
     else:
         get_effective_fraction(y=X0, c=const_signaling, output=fraction[:-1])
         fraction[-1] = 0.13698
     return fraction
+
+
+_CLAMPED_STATES = tuple(i for _, i in metrics.CLAMPED_STATES)
+_N_CLAMPED = len(_CLAMPED_STATES)
+
+
+@numba.njit(nogil=True)
+def update_fraction_parameters_qssa(
+    dt: float, X0: np.ndarray, const_signaling: np.ndarray
+):
+    # update_fraction_parameters(True, ...) with integrators.qssa_update
+    fraction = np.zeros(len(names_signalling))
+    dX_Signaling = get_pka_signalling(X0, const_signaling)
+    qssa_step(X0, dX_Signaling, const_signaling, dt)
+    _get_fractions(X0, const_signaling, fraction)
+    return fraction
+
+
+@numba.njit(nogil=True)
+def _count(runSignalingPathway: bool, dt: float, X0: np.ndarray, counts):
+    # Records one step into a metrics.ARRAY_FIELDS array
+    counts[1] += 1.0
+    if runSignalingPathway:
+        counts[0] += 1.0
+        counts[2] += dt
+        for k in range(_N_CLAMPED):
+            value = X0[_CLAMPED_STATES[k]]
+            if value < 0.0:
+                counts[3 + k] += 1.0
+            elif value > 1.0:
+                counts[3 + _N_CLAMPED + k] += 1.0
+
+
+@numba.njit(nogil=True)
+def update_fraction_parameters_counted(
+    runSignalingPathway: bool,
+    dt: float,
+    X0: np.ndarray,
+    const_signaling: np.ndarray,
+    counts: np.ndarray,
+):
+    # update_fraction_parameters recording into a metrics.ARRAY_FIELDS array
+    _count(runSignalingPathway, dt, X0, counts)
+    return update_fraction_parameters(runSignalingPathway, dt, X0, const_signaling)
+
+
+def new_counts(n_blocks=None) -> np.ndarray:
+    """
+    Zeroed counter array for update_fraction_parameters_counted, or one row
+    per block for loops run on several threads.
+    """
+    shape = len(metrics.ARRAY_FIELDS)
+    return np.zeros(shape if n_blocks is None else (n_blocks, shape))
+
+
+def merge_counts(counts: np.ndarray):
+    """Adds counter arrays (see new_counts) to metrics, if recording is on."""
+    if metrics.ENABLED:
+        metrics.merge_array(np.sum(counts.reshape(-1, counts.shape[-1]), axis=0))
+
+
+@numba.njit(nogil=True)
+def _get_pka_signalling_batch(X: np.ndarray, const_signaling: np.ndarray):
+    # One row per cell; const_signaling is (N, 167)
+    out = np.empty_like(X)
+    for i in range(X.shape[0]):
+        out[i] = get_pka_signalling(X[i], const_signaling[i])
+    return out
+
+
+@numba.njit(nogil=True)
+def _update_fraction_parameters_batch(
+    runSignalingPathway: bool,
+    dt: np.ndarray,
+    X0: np.ndarray,
+    const_signaling: np.ndarray,
+    qssa: bool,
+    counts: np.ndarray,
+):
+    # dt holds one step per cell
+    fractions = np.empty((X0.shape[0], len(names_signalling)))
+    for i in range(X0.shape[0]):
+        _count(runSignalingPathway, dt[i], X0[i], counts)
+        if qssa and runSignalingPathway:
+            fractions[i] = update_fraction_parameters_qssa(
+                dt[i], X0[i], const_signaling[i]
+            )
+        else:
+            fractions[i] = update_fraction_parameters(
+                runSignalingPathway, dt[i], X0[i], const_signaling[i]
+            )
+    return fractions
+
+
+def _per_cell(const_signaling: np.ndarray, n: int) -> np.ndarray:
+    # A shared (167,) vector becomes a stride-0 (n, 167) view
+    const_signaling = np.asarray(const_signaling, dtype=np.float64)
+    return np.broadcast_to(const_signaling, (n, const_signaling.shape[-1]))
+
+
+def get_pka_signalling_batch(X: np.ndarray, const_signaling: np.ndarray) -> np.ndarray:
+    """
+    get_pka_signalling for (N, 57) states and (167,) or (N, 167) constants.
+    """
+    if metrics.ENABLED:
+        metrics.count("rhs_calls", X.shape[0])
+        metrics.record_clamps(X)
+    return _get_pka_signalling_batch(X, _per_cell(const_signaling, X.shape[0]))
+
+
+def update_fraction_parameters_batch(
+    runSignalingPathway: bool,
+    dt,
+    X0: np.ndarray,
+    const_signaling: np.ndarray,
+    integrator: str = "euler",
+) -> np.ndarray:
+    """
+    update_fraction_parameters for (N, 57) states, updated in place, and
+    (167,) or (N, 167) constants. dt is shared or (N,) per cell, and the
+    integrator is "euler" or "qssa".
+    """
+    if integrator not in ("euler", "qssa"):
+        raise ValueError(f"Integrator '{integrator}' is not recognized.")
+    n = X0.shape[0]
+    dt = np.ascontiguousarray(np.broadcast_to(np.asarray(dt, dtype=np.float64), (n,)))
+    if integrator == "qssa" and runSignalingPathway:
+        integrators.check_qssa_step(dt)
+    counts = new_counts()
+    fractions = _update_fraction_parameters_batch(
+        runSignalingPathway,
+        dt,
+        X0,
+        _per_cell(const_signaling, n),
+        integrator == "qssa",
+        counts,
+    )
+    merge_counts(counts)
+    return fractions
@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+import get_starting_state
+import steady_state
+
+_INDEX = "index.json"
+
+
+def constants_hash(c: np.ndarray) -> str:
+    """Hex digest identifying a constants vector bit for bit."""
+    c = np.ascontiguousarray(c, dtype="<f8")
+    return hashlib.sha1(c.tobytes()).hexdigest()
+
+
+def _distance(a: np.ndarray, b: np.ndarray) -> float:
+    # Log-ratio distance over the entries positive in both vectors; constants
+    # span many decades. Zero entries (e.g. iso_conc = 0) are skipped, the
+    # iso-dependent binding terms still tell such vectors apart.
+    positive = (a > 0) & (b > 0)
+    return float(np.linalg.norm(np.log(a[positive] / b[positive])))
+
+
+class WarmStartCache:
+    """
+    On-disk cache of equilibrated signaling states.
+
+    Entries are keyed by (cell type, iso_conc, hash of the constants). Each
+    entry stores the 57-state steady state together with the constants it
+    belongs to, so a lookup without an exact hit can fall back to the entry
+    whose constants are closest. All cached states derive from the same
+    initial state and therefore share its conserved totals, which makes any
+    of them a valid starting point for find_steady_state.
+
+    The least recently used entries are evicted once more than max_entries
+    are stored. The index, including every entry's constants, is kept in
+    memory and only written, atomically, when an entry is stored; recency
+    updates from lookups are persisted with the next put.
+
+    Args:
+        directory (str or os.PathLike): Cache directory; created if missing.
+        max_entries (int): Maximum number of cached states.
+    """
+
+    def __init__(self, directory, max_entries: int = 256):
+        self.directory = os.fspath(directory)
+        self.max_entries = max_entries
+        os.makedirs(self.directory, exist_ok=True)
+        self._index = {}
+        self._clock = 0
+        path = os.path.join(self.directory, _INDEX)
+        if os.path.exists(path):
+            with open(path) as f:
+                self._index = json.load(f)
+            self._clock = max(
+                (e["last_used"] for e in self._index.values()), default=0
+            )
+        for key, entry in self._index.items():
+            if "constants" not in entry:
+                entry["constants"] = self._load(key)[1].tolist()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @staticmethod
+    def key(cell_type: str, c: np.ndarray) -> str:
+        """Cache key of a cell type and constants vector."""
+        return f"{cell_type}-{float(c[0])!r}-{constants_hash(c)}"
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.directory, self._index[key]["file"])
+
+    def _touch(self, key: str):
+        self._clock += 1
+        self._index[key]["last_used"] = self._clock
+
+    def _write_index(self):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp, os.path.join(self.directory, _INDEX))
+
+    def _load(self, key: str) -> tuple:
+        with np.load(self._file(key), allow_pickle=False) as data:
+            return data["state"], data["constants"]
+
+    def get(self, cell_type: str, c: np.ndarray):
+        """
+        Returns the cached steady state for exactly these constants.
+
+        Args:
+            cell_type (str): Cell type label, e.g. 'TW_endo'.
+            c (np.ndarray): A vector of model parameters.
+
+        Returns:
+            np.ndarray or None: The steady state, or None if not cached.
+        """
+        key = self.key(cell_type, c)
+        if key not in self._index:
+            return None
+        self._touch(key)
+        return self._load(key)[0]
+
+    def nearest(self, cell_type: str, c: np.ndarray):
+        """
+        Returns the cached state whose constants are closest to c.
+
+        Entries of the same cell type are preferred; other cell types are
+        only considered if there are none.
+
+        Args:
+            cell_type (str): Cell type label.
+            c (np.ndarray): A vector of model parameters.
+
+        Returns:
+            tuple: The state and the key of the entry used, or (None, None)
+                if the cache is empty.
+        """
+        candidates = [k for k, e in self._index.items() if e["cell_type"] == cell_type]
+        if not candidates:
+            candidates = list(self._index)
+        if not candidates:
+            return None, None
+
+        c = np.asarray(c, dtype=np.float64)
+        best_key, best_distance = None, np.inf
+        for key in candidates:
+            constants = np.asarray(self._index[key]["constants"], dtype=np.float64)
+            distance = _distance(constants, c)
+            if best_key is None or distance < best_distance:
+                best_key, best_distance = key, distance
+        self._touch(best_key)
+        return self._load(best_key)[0], best_key
+
+    def put(self, cell_type: str, c: np.ndarray, state: np.ndarray) -> str:
+        """
+        Stores an equilibrated state, evicting least recently used entries.
+
+        Args:
+            cell_type (str): Cell type label.
+            c (np.ndarray): The constants the state is a steady state of.
+            state (np.ndarray): The 57-state steady state.
+
+        Returns:
+            str: The cache key of the entry.
+        """
+        c = np.asarray(c, dtype=np.float64)
+        key = self.key(cell_type, c)
+        file = f"{constants_hash(c)}-{cell_type}.npz"
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".npz")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, state=np.asarray(state, dtype=np.float64), constants=c)
+        os.replace(tmp, os.path.join(self.directory, file))
+        self._index[key] = {
+            "cell_type": cell_type,
+            "iso_conc": float(c[0]),
+            "file": file,
+            "constants": c.tolist(),
+            "last_used": 0,
+        }
+        self._touch(key)
+
+        while len(self._index) > self.max_entries:
+            oldest = min(self._index, key=lambda k: self._index[k]["last_used"])
+            os.remove(self._file(oldest))
+            del self._index[oldest]
+        self._write_index()
+        return key
+
+    def starting_state(self, cell_type: str, c: np.ndarray) -> np.ndarray:
+        """
+        Best available initial state for a new job.
+
+        Args:
+            cell_type (str): Cell type label.
+            c (np.ndarray): A vector of model parameters.
+
+        Returns:
+            np.ndarray: The cached steady state for c if present, else that of
+                the nearest cached neighbor, else
+                get_starting_state_signalling().
+        """
+        state = self.get(cell_type, c)
+        if state is None:
+            state, _ = self.nearest(cell_type, c)
+        if state is None:
+            state = get_starting_state.get_starting_state_signalling()
+        return np.array(state, dtype=np.float64)
+
+    def equilibrate(self, cell_type: str, c: np.ndarray, **kwargs) -> np.ndarray:
+        """
+        Steady state for c, solved from the best warm state and cached.
+
+        Args:
+            cell_type (str): Cell type label.
+            c (np.ndarray): A vector of model parameters.
+            **kwargs: Passed on to steady_state.find_steady_state.
+
+        Returns:
+            np.ndarray: The steady state vector.
+        """
+        state = self.get(cell_type, c)
+        if state is not None:
+            return np.array(state, dtype=np.float64)
+        y0 = self.starting_state(cell_type, c)
+        state, _ = steady_state.find_steady_state(c, y0, **kwargs)
+        self.put(cell_type, c, state)
+        return state
+
+
+def default_cache():
+    """
+    The cache in the directory named by $GBAS_WARM_START_DIR, or None.
+
+    Lets drivers pick up warm states automatically without extra arguments.
+    """
+    directory = os.environ.get("GBAS_WARM_START_DIR")
+    return WarmStartCache(directory) if directory else None
+
+
+def starting_state(cell_type: str, c: np.ndarray, cache=None) -> np.ndarray:
+    """
+    Initial signaling state for a new job.
+
+    Args:
+        cell_type (str): Cell type label.
+        c (np.ndarray): A vector of model parameters.
+        cache (WarmStartCache, optional): Defaults to default_cache().
+
+    Returns:
+        np.ndarray: The best warm state, or get_starting_state_signalling()
+            when no cache is configured.
+    """
+    if cache is None:
+        cache = default_cache()
+    if cache is None:
+        return get_starting_state.get_starting_state_signalling()
+    return cache.starting_state(cell_type, c)
@@ -127,3 +127,31 @@ end
     c1_mtk = prob_mtk.ps[sys.c1]
     @test isapprox(c1_mtk, iso_conc)
 end
+
+@testitem "RHS golden vectors" begin
+    using Test
+
+    # Golden derivatives written by references/python/parity.py
+    include("../references/julia/signaling.jl")
+    using .SignalingModel
+
+    golden_dir = joinpath(@__DIR__, "golden")
+    n_cases, n_states, n_params =
+        parse.(Int, split(read(joinpath(golden_dir, "rhs_manifest.txt"), String)))
+    @test n_states == SignalingModel.NUM_STATES
+    @test n_params == SignalingModel.NUM_PARAMS
+
+    # Files hold C-ordered (n_cases, n) arrays, i.e. one case per column here
+    read_golden(name, n) = ltoh.(
+        read!(joinpath(golden_dir, "rhs_$(name).bin"), Matrix{Float64}(undef, n, n_cases)),
+    )
+    states = read_golden("states", n_states)
+    constants = read_golden("constants", n_params)
+    derivatives = read_golden("derivatives", n_states)
+
+    du = zeros(Float64, n_states)
+    for k in 1:n_cases
+        SignalingModel.rhs_signaling!(du, states[:, k], constants[:, k], 0.0)
+        @test isapprox(du, derivatives[:, k]; rtol = 1.0e-8)
+    end
+end